@@ -14,6 +14,53 @@ load_dotenv(BASE_DIR / ".env")
 
 GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 
+# -------------------------------------------------------
+# Geocoding (see jobs/geocoding.py and jobs/gazetteer.py)
+# -------------------------------------------------------
+#   "gazetteer_first" – offline city/ZIP centroids; Google only for street addresses
+#   "gazetteer_only"  – never call Google
+#   "google"          – always Google (cached)
+GEOCODER_BACKEND = os.getenv("GEOCODER_BACKEND", "gazetteer_first")
+GAZETTEER_INDEX_PATH = BASE_DIR / "jobs" / "data" / "gazetteer.idx"   # manage.py build_gazetteer
+
+GEOCODE_CACHE_HIT_TTL = 60 * 60 * 24 * 90    # found addresses: 90 days
+GEOCODE_CACHE_MISS_TTL = 60 * 60 * 24        # "not found": retry after a day
+GEOCODE_CACHE_MEMORY_SIZE = 2048             # in-process LRU entries
+
+# Google HTTP client (jobs/geocoding_client.py)
+GEOCODING_CONNECT_TIMEOUT = 3.05             # seconds
+GEOCODING_READ_TIMEOUT = 5.0                 # seconds
+GEOCODING_MAX_RETRIES = 2                    # connection errors / 429 / 5xx
+GEOCODING_RETRY_BACKOFF = 0.5                # 0.5s, 1s, ... between retries
+GEOCODING_POOL_SIZE = 10                     # keep-alive connections (>= geocode_jobs --workers)
+GEOCODING_BREAKER_THRESHOLD = 5              # consecutive failures before skipping Google
+GEOCODING_BREAKER_RESET = 60                 # seconds before a trial request
+
+# -------------------------------------------------------
+# Job list & map
+# -------------------------------------------------------
+JOB_LIST_PAGE_SIZE = 20                      # jobs per page / infinite-scroll fetch
+JOB_MAP_MAX_PINS = 300                       # job map: individual pins below this, clusters above
+RECRUITER_MAP_CACHE_TIMEOUT = 60 * 60        # cached recruiter map pins (also invalidated on change)
+JOB_FACETS_CACHE_TIMEOUT = 5 * 60            # cached job_list facet counts, per filter set
+JOB_INDEX_ENABLED = os.getenv("JOB_INDEX_ENABLED", "0") == "1"   # in-memory filter index (jobs/job_index.py)
+JOB_INDEX_MAX_AGE = 5 * 60                   # seconds before the in-memory index is rebuilt from the DB
+JOB_PAGE_CACHE_TIMEOUT = 10 * 60             # cached job_list / job_detail pages (also retired on any job change)
+APPLIED_JOBS_CACHE_TIMEOUT = 15 * 60         # per-user applied-job ids (also patched on apply / withdraw)
+APPLICANT_KANBAN_PAGE_SIZE = 20              # cards per applicant Kanban column fetch (jobs/kanban.py)
+
+# -------------------------------------------------------
+# Recommendations (jobs/recommendations.py)
+# -------------------------------------------------------
+RECOMMENDATION_RADIUS_MILES = 50             # "nearby" = within this distance of the seeker's address
+RECOMMENDATIONS_PER_SEEKER = 10              # precomputed per seeker (the dashboard shows 3)
+RECOMMENDATION_MIN_SIMILARITY = 0.1          # skills matches below this cosine similarity are dropped
+RECOMMENDATION_CHAMPION_LIST_SIZE = 1000     # jobs scanned per skill term when rescoring a seeker
+
+# "People also applied to" on job_detail (jobs/similar_jobs.py)
+SIMILAR_JOBS_PER_JOB = 10                    # precomputed per job (job_detail shows 5)
+SIMILAR_JOBS_MIN_COAPPLICANTS = 2            # ignore pairs fewer seekers applied to together
+
 # -------------------------------------------------------
 # Paths
 # -------------------------------------------------------
@@ -111,6 +158,29 @@ DATABASES = {
     }
 }
 
+# -------------------------------------------------------
+# Cache
+# -------------------------------------------------------
+# Files on local disk by default, shared by every process on the host: the
+# geocoding worker's version bumps (jobs/response_cache.py) and recruiter pin
+# invalidations must reach the web workers, which a per-process LocMemCache
+# never would. With several hosts set REDIS_URL.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv("CACHE_DIR", str(BASE_DIR / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
 # -------------------------------------------------------
 # Password Validation
 # -------------------------------------------------------
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_jobseekerprofile_full_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='location_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255),
+        ),
+    ]
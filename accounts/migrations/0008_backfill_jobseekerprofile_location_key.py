@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from jobs.locations import location_key
+
+
+def backfill_location_key(apps, schema_editor):
+    """Fill the new location_key column for existing profiles, 1000 at a time."""
+    JobSeekerProfile = apps.get_model("accounts", "JobSeekerProfile")
+    qs = (
+        JobSeekerProfile.objects
+        .exclude(city="")
+        .only("id", "city", "state", "country")
+        .order_by("id")
+    )
+    batch = []
+    for profile in qs.iterator(chunk_size=1000):
+        profile.location_key = location_key(profile.city, profile.state, profile.country)
+        batch.append(profile)
+        if len(batch) >= 1000:
+            JobSeekerProfile.objects.bulk_update(batch, ["location_key"])
+            batch = []
+    if batch:
+        JobSeekerProfile.objects.bulk_update(batch, ["location_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_jobseekerprofile_location_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_location_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_backfill_jobseekerprofile_location_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='geocode_address',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='geocode_status',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='latitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobseekerprofile',
+            name='longitude',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='jobseekerprofile',
+            index=models.Index(fields=['latitude', 'longitude'], name='profile_lat_lng_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def queue_geocoding(apps, schema_editor):
+    """Mark existing profiles with an address as pending for `manage.py geocode_jobs`, 1000 at a time."""
+    JobSeekerProfile = apps.get_model("accounts", "JobSeekerProfile")
+    qs = (
+        JobSeekerProfile.objects
+        .only("id", "street_address", "city", "state", "zip_code", "country")
+        .order_by("id")
+    )
+    batch = []
+    for profile in qs.iterator(chunk_size=1000):
+        parts = [profile.street_address, profile.city, profile.state, profile.zip_code, profile.country]
+        address = ", ".join(p.strip() for p in parts if p and p.strip())
+        if not address:
+            continue
+        profile.geocode_address = address
+        profile.geocode_status = "pending"
+        batch.append(profile)
+        if len(batch) >= 1000:
+            JobSeekerProfile.objects.bulk_update(batch, ["geocode_address", "geocode_status"])
+            batch = []
+    if batch:
+        JobSeekerProfile.objects.bulk_update(batch, ["geocode_address", "geocode_status"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_jobseekerprofile_geocoding'),
+    ]
+
+    operations = [
+        migrations.RunPython(queue_geocoding, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from jobs.skills import link_profiles
+
+
+def link_existing_profiles(apps, schema_editor):
+    link_profiles(
+        apps.get_model("jobs", "Skill"),
+        apps.get_model("accounts", "JobSeekerProfile"),
+        apps.get_model("accounts", "ProfileSkill"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_queue_jobseekerprofile_geocoding'),
+        ('jobs', '0015_skills'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='accounts.jobseekerprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_links', to='jobs.skill')),
+            ],
+            options={
+                'unique_together': {('skill', 'profile')},
+            },
+        ),
+        migrations.RunPython(link_existing_profiles, migrations.RunPython.noop),
+    ]
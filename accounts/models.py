@@ -4,6 +4,8 @@ from django.conf import settings
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from jobs.locations import location_key
+
 
 # -------------------------------------------------------
 # Custom User model
@@ -25,6 +27,12 @@ class User(AbstractUser):
 # Job Seeker Profile (now with profile picture)
 # -------------------------------------------------------
 class JobSeekerProfile(models.Model):
+    # Geocoding status values (same as Job's; see jobs/geocoding.py)
+    GEOCODE_NONE = ""
+    GEOCODE_PENDING = "pending"
+    GEOCODE_OK = "ok"
+    GEOCODE_FAILED = "failed"
+
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -49,11 +57,67 @@ class JobSeekerProfile(models.Model):
     zip_code = models.CharField(max_length=20, blank=True)
     country = models.CharField(max_length=100, blank=True)
 
+    # Normalized "country|state|city" (see jobs/locations.py), kept in sync by save().
+    # Matches Job.location_key with one indexed equality lookup.
+    location_key = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
+
+    # Coordinates of the address, resolved in the background (`manage.py geocode_jobs`)
+    # and used for "jobs near you" recommendations (jobs/recommendations.py).
+    # `geocode_address` is the address they belong to (or are pending for).
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geocode_address = models.CharField(max_length=255, blank=True, editable=False)
+    geocode_status = models.CharField(max_length=10, blank=True, db_index=True, editable=False)
+
     is_public = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Bounding-box lookup of the seekers near a newly posted job
+            models.Index(fields=["latitude", "longitude"], name="profile_lat_lng_idx"),
+        ]
+
     def __str__(self):
         return f"JobSeekerProfile({self.user.username})"
 
+    def full_address(self):
+        parts = [self.street_address, self.city, self.state, self.zip_code, self.country]
+        return ", ".join(p.strip() for p in parts if p and p.strip())
+
+    def save(self, *args, **kwargs):
+        self.location_key = location_key(self.city, self.state, self.country)
+
+        # A new address waits for the geocoding worker; no address, no coordinates
+        address = self.full_address()
+        if address != self.geocode_address:
+            self.geocode_address = address
+            self.geocode_status = self.GEOCODE_PENDING if address else self.GEOCODE_NONE
+            if not address:
+                self.latitude = self.longitude = None
+
+        update_fields = kwargs.get("update_fields")
+        address_fields = {"street_address", "city", "state", "zip_code", "country"}
+        if update_fields is not None and address_fields & set(update_fields):
+            kwargs["update_fields"] = {
+                *update_fields, "location_key", "geocode_address", "geocode_status", "latitude", "longitude",
+            }
+        super().save(*args, **kwargs)
+
+
+class ProfileSkill(models.Model):
+    """
+    Skill -> job seeker profile link: the profiles side of the skills
+    inverted index (jobs/skills.py), kept in sync with `skills` on save.
+    """
+    skill = models.ForeignKey("jobs.Skill", on_delete=models.CASCADE, related_name="profile_links")
+    profile = models.ForeignKey(JobSeekerProfile, on_delete=models.CASCADE, related_name="skill_links")
+
+    class Meta:
+        unique_together = ("skill", "profile")
+
+    def __str__(self):
+        return f"{self.profile_id} → {self.skill_id}"
+
 
 # -------------------------------------------------------
 # Recruiter Profile (now with profile picture)
@@ -166,6 +230,17 @@ def create_role_profile(sender, instance, created, **kwargs):
         recruiter_profile = RecruiterProfile.objects.create(user=instance)
         RecruiterPreferences.objects.create(recruiter=instance)
 
+
+# -------------------------------------------------------
+# Signals: skills inverted index
+# -------------------------------------------------------
+@receiver(post_save, sender=JobSeekerProfile)
+def index_profile_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and "skills" not in update_fields):
+        return  # loaddata: run `manage.py rebuild_skills` afterwards
+    from jobs.skills import sync_profile_skills
+    sync_profile_skills(instance)
+
 class RecruiterPreferences(models.Model):
     """
     Stores what kind of candidates a recruiter is looking for.
@@ -24,6 +24,18 @@ urlpatterns = [
          views.recruiter_applicants_kanban,
          name="applicant_kanban"),
 
+    # Kanban data: column counts and pages of cards
+    path("dashboard/recruiter/manage_applicants/api/",
+         views.applicant_kanban_api,
+         name="applicant_kanban_api"),
+
+    # Move many applicants at once (Kanban multi-select drag & drop)
+    path(
+        "recruiter/applicants/update-status/",
+        views.update_applicant_statuses,
+        name="update_application_statuses"
+    ),
+
     # Update applicant status
     path(
         "recruiter/applicant/<int:app_id>/update-status/",
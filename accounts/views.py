@@ -9,6 +9,11 @@ from django.conf import settings
 from django import forms
 from django.db import models
 from jobs.models import Job, Application
+from jobs import kanban
+from jobs.funnel import funnel_summary
+from jobs.pagination import InvalidCursor
+from jobs.recommendations import dashboard_jobs
+from jobs.skills import profiles_with_skills_q
 from django.utils import timezone
 from urllib.parse import urlencode
 from django.core.exceptions import PermissionDenied
@@ -17,6 +22,7 @@ from .models import User, JobSeekerProfile, Education, Experience, RecruiterPref
 import datetime
 
 import csv
+import json
 from django.http import JsonResponse
 from django.contrib.auth.decorators import user_passes_test
 
@@ -78,8 +84,8 @@ def jobseeker_dashboard(request):
     # Jobs the user applied to
     applications = Application.objects.filter(applicant=user).select_related('job')
 
-    # Recommended jobs (example logic — nearby or unspecific for now)
-    recommended_jobs = Job.objects.exclude(applications__applicant=user)[:3]
+    # Recommended jobs: precomputed skills / nearby matches, newest jobs otherwise
+    recommended_jobs = dashboard_jobs(user)
 
     return render(request, "accounts/jobseeker_dashboard.html", {
         "applications": applications,
@@ -94,8 +100,9 @@ def recruiter_dashboard(request):
     # Jobs posted by this recruiter
     jobs = Job.objects.filter(recruiter=user)
 
-    # Applications to this recruiter's jobs
-    applications = Application.objects.filter(job__recruiter=user).select_related("applicant", "job")
+    # Most recent applications to this recruiter's jobs (per-job totals are
+    # the Job counter columns, jobs/application_counts.py)
+    applications = Application.objects.filter(job__recruiter=user).select_related("applicant", "job")[:5]
 
     # Saved candidate searches
     saved_searches = CandidateSavedSearch.objects.filter(owner=user)[:5]
@@ -103,6 +110,8 @@ def recruiter_dashboard(request):
     # Recommended candidates (example logic — latest public profiles)
     recommended_candidates = get_recommended_candidates_for_recruiter(request.user)
 
+    # Hiring funnel, precomputed from the status history (jobs/funnel.py)
+    funnel = funnel_summary(user.id)
 
     return render(request, "accounts/recruiter_dashboard.html", {
         "user": user,
@@ -110,6 +119,7 @@ def recruiter_dashboard(request):
         "applications": applications,
         "saved_searches": saved_searches,
         "recommended_candidates": recommended_candidates,
+        "funnel": funnel,
     })
 
 
@@ -262,27 +272,68 @@ def recruiter_applicants_kanban(request):
     if request.user.role != User.RECRUITER:
         return HttpResponseForbidden("Only recruiters can view this page.")
 
-    applications = Application.objects.filter(
-        job__recruiter=request.user
-    ).select_related("applicant", "job")
-
-    backlog = applications.filter(status="applied")
-    review = applications.filter(status="review")
+    # Column counts and each column's first page of cards; the rest is
+    # loaded by applicant_kanban_api as a column scrolls (jobs/kanban.py)
+    return render(request, "accounts/applicants_recruiter_view.html", {
+        "columns": kanban.board(request.user.id),
+        "Hired": Application.objects.none(),   # Will be empty so the HTML section will disappear
+    })
 
-    # All final decisions (hired/rejected) still remain under "closed"
-    Closed = applications.filter(status="closed")
 
-    # Remove hired column entirely
-    Hired = Application.objects.none()
+@login_required
+def applicant_kanban_api(request):
+    """
+    JSON for the Kanban board: `?status=<column>&cursor=<next_cursor>` is
+    the column's next page of cards; without `status`, the column counts.
+    """
+    if request.user.role != User.RECRUITER:
+        return JsonResponse({"error": "Not allowed"}, status=403)
 
-    return render(request, "accounts/applicants_recruiter_view.html", {
-        "backlog": backlog,
-        "review": review,
-        "Closed": Closed,
-        "Hired": Hired,   # Will be empty so the HTML section will disappear
+    status = request.GET.get("status")
+    if not status:
+        return JsonResponse({"counts": kanban.column_counts(request.user.id)})
+    if status not in kanban.COLUMN_STATUSES:
+        return JsonResponse({"error": "Invalid status"}, status=400)
+    try:
+        applications, next_cursor = kanban.column_page(request.user.id, status, request.GET.get("cursor"))
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+    return JsonResponse({
+        "cards": [kanban.card(app) for app in applications],
+        "next_cursor": next_cursor,
     })
 
 
+@login_required
+def update_applicant_statuses(request):
+    """
+    Batch moves for the Kanban (drag & drop of one or many selected cards):
+    a JSON body {"changes": [{"id", "status"?, "final_decision"?,
+    "expected_status"?, "expected_final_decision"?}, ...]}, applied all or
+    nothing (jobs.kanban.move_applications). 409 with the cards' current
+    state if any of them changed since the board was loaded.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST only"}, status=400)
+    if request.user.role != User.RECRUITER:
+        return JsonResponse({"error": "Not allowed"}, status=403)
+
+    try:
+        changes = json.loads(request.body)["changes"]
+        if not isinstance(changes, list):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Expected a JSON body with a list of changes"}, status=400)
+
+    try:
+        updated = kanban.move_applications(request.user.id, changes)
+    except kanban.InvalidMove as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    except kanban.MoveConflict as exc:
+        return JsonResponse({"error": "conflict", "conflicts": exc.current}, status=409)
+    return JsonResponse({"success": True, "updated": updated})
+
+
 @login_required
 def update_applicant_status(request, app_id):
     if request.method == "POST":
@@ -311,7 +362,7 @@ def extract_candidate_filters(query_dict):
     Take request.GET or request.POST and return a plain dict
     of the filter fields we care about.
     """
-    allowed_keys = ["name", "skills", "education", "location"]
+    allowed_keys = ["name", "skills", "skills_mode", "education", "location"]
 
     filters = {}
     for key in allowed_keys:
@@ -369,7 +420,10 @@ def candidate_list(request):
         candidates = candidates.filter(user__username__icontains=name)
 
     if skills:
-        candidates = candidates.filter(skills__icontains=skills)
+        # Indexed join on the normalized skills (jobs/skills.py): profiles
+        # with all of them, or any of them with ?skills_mode=any
+        match_all = request.GET.get("skills_mode") != "any"
+        candidates = candidates.filter(profiles_with_skills_q(skills, match_all=match_all))
 
     if education:
         candidates = candidates.filter(education__icontains=education)
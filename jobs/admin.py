@@ -1,6 +1,6 @@
 # jobs/admin.py
 from django.contrib import admin
-from .models import Job, Application
+from .models import Job, Application, GeocodeCacheEntry
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
@@ -13,6 +13,7 @@ class JobAdmin(admin.ModelAdmin):
         "visa_sponsorship",
         "is_active",
         "recruiter",
+        "applications_count",
         "created_at",
     )
     list_filter = (
@@ -29,3 +30,9 @@ class ApplicationAdmin(admin.ModelAdmin):
     list_display = ("job", "applicant", "status", "applied_at")
     list_filter = ("status", "applied_at")
     search_fields = ("job__title", "applicant__username")
+
+
+@admin.register(GeocodeCacheEntry)
+class GeocodeCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("address_key", "latitude", "longitude", "expires_at", "hit_count")
+    search_fields = ("address_key",)
@@ -0,0 +1,149 @@
+# jobs/application_counts.py
+"""
+Per-job application counters, stored on Job itself:
+
+    applications_count                                  every application,
+    applied_count / review_count / interview_count / closed_count   by status,
+    hired_count / rejected_count                        by final decision,
+
+so the recruiter map and dashboard read them with the job row instead of a
+JOIN + GROUP BY over Application on every request.
+
+They are kept exact incrementally, with atomic `F()` updates (no read, no
+lost increments under concurrent writes): from the Application signals
+(creates, status changes, withdrawals) and from batch Kanban moves
+(jobs/kanban.py), which write with `.update()`. `manage.py
+reconcile_application_counts` recounts everything a chunk of jobs at a
+time and repairs any drift (raw SQL, `loaddata`, other `.update()`s).
+"""
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Application, Job
+
+CHUNK_SIZE = 500   # ids per IN (...) list
+
+STATUS_COUNTERS = {
+    "applied": "applied_count",
+    "review": "review_count",
+    "interview": "interview_count",
+    "closed": "closed_count",
+}
+DECISION_COUNTERS = {
+    "hired": "hired_count",
+    "rejected": "rejected_count",
+}
+COUNTER_FIELDS = ("applications_count", *STATUS_COUNTERS.values(), *DECISION_COUNTERS.values())
+
+
+def counter_deltas(old, new):
+    """
+    Counter increments {field: delta} for an application going from `old`
+    to `new`, each a (status, final_decision) pair or None (not there).
+    """
+    deltas = Counter()
+    for state, sign in ((old, -1), (new, 1)):
+        if state is None:
+            continue
+        status, decision = state
+        deltas["applications_count"] += sign
+        if status in STATUS_COUNTERS:
+            deltas[STATUS_COUNTERS[status]] += sign
+        if decision in DECISION_COUNTERS:
+            deltas[DECISION_COUNTERS[decision]] += sign
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def adjust_counts(job_deltas):
+    """
+    Apply {job_id: {field: delta}}: one UPDATE per distinct set of deltas,
+    for all the jobs that share it.
+    """
+    groups = defaultdict(list)
+    for job_id, deltas in job_deltas.items():
+        if deltas:
+            groups[tuple(sorted(deltas.items()))].append(job_id)
+    for deltas, job_ids in groups.items():
+        updates = {field: F(field) + delta for field, delta in deltas}
+        for start in range(0, len(job_ids), CHUNK_SIZE):
+            Job.objects.filter(pk__in=job_ids[start:start + CHUNK_SIZE]).update(**updates)
+
+
+# ==============================
+# Application signals
+# ==============================
+def application_created(application):
+    adjust_counts({application.job_id: counter_deltas(None, (application.status, application.final_decision))})
+
+
+def application_changed(application, before):
+    """`before` is the (status, final_decision, ...) the row had before this save."""
+    adjust_counts({application.job_id: counter_deltas(
+        before[:2], (application.status, application.final_decision),
+    )})
+
+
+def application_removed(application):
+    adjust_counts({application.job_id: counter_deltas((application.status, application.final_decision), None)})
+
+
+def count_moves(moves):
+    """Batch Kanban moves: [(job_id, (old status, old decision), (new status, new decision)), ...]."""
+    job_deltas = defaultdict(Counter)
+    for job_id, old, new in moves:
+        job_deltas[job_id].update(counter_deltas(old, new))
+    adjust_counts({job_id: {f: d for f, d in deltas.items() if d} for job_id, deltas in job_deltas.items()})
+
+
+# ==============================
+# Reconciliation
+# ==============================
+def recount(job_ids, application_model=Application):
+    """
+    The true counters of `job_ids`, ascending and contiguous in id order:
+    {job_id: {field: count}} (zeros included).
+    """
+    counts = {job_id: dict.fromkeys(COUNTER_FIELDS, 0) for job_id in job_ids}
+    for field, counters in (("status", STATUS_COUNTERS), ("final_decision", DECISION_COUNTERS)):
+        rows = (
+            application_model.objects.filter(job_id__gte=job_ids[0], job_id__lte=job_ids[-1])
+            .values_list("job_id", field).annotate(n=Count("id")).order_by()
+        )
+        for job_id, value, n in rows:
+            if field == "status":
+                counts[job_id]["applications_count"] += n
+            if value in counters:
+                counts[job_id][counters[value]] += n
+    return counts
+
+
+def reconcile_counts(chunk_size=1000, job_model=Job, application_model=Application, progress=None):
+    """
+    Recount every job's counters, `chunk_size` jobs per transaction, and
+    write back the ones that drifted. Model classes are parameters so
+    migrations can pass theirs. Returns (jobs checked, jobs repaired);
+    `progress(checked, repaired)` is called after every chunk.
+    """
+    checked = repaired = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            stored = list(
+                job_model.objects.filter(pk__gt=last_id).order_by("pk")
+                .values_list("pk", *COUNTER_FIELDS)[:chunk_size]
+            )
+            if not stored:
+                break
+            true_counts = recount([row[0] for row in stored], application_model)
+            for job_id, *values in stored:
+                counts = true_counts[job_id]
+                if tuple(values) != tuple(counts[field] for field in COUNTER_FIELDS):
+                    job_model.objects.filter(pk=job_id).update(**counts)
+                    repaired += 1
+        checked += len(stored)
+        last_id = stored[-1][0]
+        if progress:
+            progress(checked, repaired)
+    return checked, repaired
@@ -0,0 +1,81 @@
+# jobs/applied_jobs.py
+"""
+Per-user cached set of the job ids a job seeker has applied to.
+
+job_list, job_detail and apply_to_job all need "has this user applied to
+job X?". The answer for every job is one sorted array of ids per user,
+kept in the cache as raw bytes (8 bytes per application) and looked up
+with a binary search, so the "Applied" badges cost no query once the
+array is loaded. Application post_save/post_delete signals patch the
+cached array in place (see jobs/models.py).
+"""
+from array import array
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Application
+
+CACHE_KEY = "applied_jobs:{}"
+
+
+def _timeout():
+    return getattr(settings, "APPLIED_JOBS_CACHE_TIMEOUT", 15 * 60)
+
+
+def _load(user_id):
+    ids = array("q", (
+        Application.objects
+        .filter(applicant_id=user_id)
+        .order_by("job_id")
+        .values_list("job_id", flat=True)
+    ))
+    cache.set(CACHE_KEY.format(user_id), ids.tobytes(), _timeout())
+    return ids
+
+
+def applied_job_ids(user_id):
+    """Sorted array of the job ids `user_id` has applied to (one query on a cache miss)."""
+    raw = cache.get(CACHE_KEY.format(user_id))
+    if raw is None:
+        return _load(user_id)
+    ids = array("q")
+    ids.frombytes(raw)
+    return ids
+
+
+def contains(ids, job_id):
+    pos = bisect_left(ids, job_id)
+    return pos < len(ids) and ids[pos] == job_id
+
+
+def has_applied(user_id, job_id):
+    return contains(applied_job_ids(user_id), job_id)
+
+
+def _update(user_id, job_id, add):
+    """Patch an already-cached array; without one, the next read loads it fresh."""
+    key = CACHE_KEY.format(user_id)
+    raw = cache.get(key)
+    if raw is None:
+        return
+    ids = array("q")
+    ids.frombytes(raw)
+    pos = bisect_left(ids, job_id)
+    present = pos < len(ids) and ids[pos] == job_id
+    if add and not present:
+        insort(ids, job_id)
+    elif not add and present:
+        del ids[pos]
+    else:
+        return
+    cache.set(key, ids.tobytes(), _timeout())
+
+
+def add_applied_job(user_id, job_id):
+    _update(user_id, job_id, add=True)
+
+
+def remove_applied_job(user_id, job_id):
+    _update(user_id, job_id, add=False)
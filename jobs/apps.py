@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        # SQL-side distance function used by Job.objects.within_radius()
+        from .geo import register_sqlite_functions
+        connection_created.connect(register_sqlite_functions, dispatch_uid="jobs_sqlite_functions")
@@ -0,0 +1,175 @@
+# jobs/facets.py
+"""
+Filter parsing and facet counts for job_list.
+
+Facet counts ("Remote (120)", "Full-time (340)", "$100k+ (85)") for the
+current filter set come from ONE query: a conditional aggregate,
+
+    SELECT COUNT(id) FILTER (WHERE remote AND ...),
+           COUNT(id) FILTER (WHERE employment_type = 'part_time' AND ...), ...
+    FROM jobs_job [JOIN jobs_job_fts ...] WHERE is_active
+
+over the jobs matching the title search and skill filters, so adding a facet adds a
+column, not a table scan. Each facet is counted as if its own filter were
+unset, so the other options of a select still show where they would lead.
+
+Results are cached per normalized filter signature (letter case, extra
+spaces, blank and invalid values don't make new cache entries) under the
+jobs version number that any Job save or delete bumps (jobs/response_cache.py).
+"""
+import hashlib
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Job
+from .response_cache import jobs_version
+from .skills import jobs_with_skills_q
+
+# "Salary" facet: jobs paying at least this much (max_salary >= bucket),
+# i.e. what the salary_min filter would return
+SALARY_BUCKETS = (50000, 100000, 150000, 200000)
+
+CACHE_KEY = "job_facets:{}:{}"
+
+# Facet/filter name (= job_list GET parameter) -> Q for one value
+FACET_FILTERS = {
+    "employment_type": lambda value: Q(employment_type=value),
+    "remote": lambda value: Q(remote=value),
+    "visa": lambda value: Q(visa_sponsorship=value),
+    "salary_min": lambda value: Q(max_salary__gte=value),
+    "salary_max": lambda value: Q(min_salary__lte=value),
+}
+
+
+# ==============================
+# Filters
+# ==============================
+def _flag(value):
+    """'true' / '1' / 'yes' -> True, any other non-blank value -> False, blank -> None."""
+    if value is None or value == "":
+        return None
+    return str(value).lower() in ["true", "1", "yes"]
+
+
+def _amount(value):
+    """A finite Decimal, or None for blank / unparsable / NaN / infinite input."""
+    if value in (None, ""):
+        return None
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+    return amount if amount.is_finite() else None
+
+
+def normalize_filters(params):
+    """
+    job_list GET parameters -> canonical dict of the active filters.
+    Blank and invalid values are dropped, search text is lowercased and
+    whitespace-collapsed.
+    """
+    filters = {}
+    for name in ("title", "skills"):
+        text = " ".join((params.get(name) or "").lower().split())
+        if text:
+            filters[name] = text
+    # Skills: jobs with all of them by default, any of them on request
+    if "skills" in filters and params.get("skills_mode") == "any":
+        filters["skills_mode"] = "any"
+
+    employment_type = params.get("employment_type")
+    if employment_type in dict(Job.EMPLOYMENT_TYPES):
+        filters["employment_type"] = employment_type
+
+    for name in ("remote", "visa"):
+        flag = _flag(params.get(name))
+        if flag is not None:
+            filters[name] = flag
+
+    for name in ("salary_min", "salary_max"):
+        amount = _amount(params.get(name))
+        if amount is not None:
+            filters[name] = amount
+    return filters
+
+
+def filter_signature(filters):
+    """Stable hash of normalized filters, used as the cache key."""
+    raw = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _facet_q(filters, exclude=None):
+    q = Q()
+    for name, make_q in FACET_FILTERS.items():
+        if name != exclude and name in filters:
+            q &= make_q(filters[name])
+    return q
+
+
+def text_matches(filters):
+    """
+    Active jobs matching the title search (full-text index, best match
+    first) and the skill filter (skills index, see jobs/skills.py).
+    """
+    qs = Job.objects.filter(is_active=True)
+    if "title" in filters:
+        qs = qs.search(title=filters["title"])
+    if "skills" in filters:
+        qs = qs.filter(jobs_with_skills_q(filters["skills"], match_all=filters.get("skills_mode") != "any"))
+    return qs
+
+
+def filtered_jobs(filters):
+    """Active jobs matching every filter in `filters` (see normalize_filters)."""
+    return text_matches(filters).filter(_facet_q(filters))
+
+
+# ==============================
+# Facet counts
+# ==============================
+def facet_options():
+    """(facet, value, GET value, label) for every option that gets a count."""
+    options = [("employment_type", code, code, label) for code, label in Job.EMPLOYMENT_TYPES]
+    options += [("remote", True, "true", "Remote"), ("remote", False, "false", "On-site")]
+    options += [("visa", True, "true", "Visa"), ("visa", False, "false", "No Visa")]
+    options += [("salary_min", Decimal(b), str(b), f"${b // 1000}k+") for b in SALARY_BUCKETS]
+    return options
+
+
+def compute_facets(filters):
+    """
+    All facet counts for `filters` in a single aggregate query:
+    {"total": n, "<facet>": [{"value", "label", "count", "selected"}, ...], ...}
+    """
+    options = facet_options()
+    aggregates = {"total": Count("id", filter=_facet_q(filters)) if filters else Count("id")}
+    for i, (facet, value, _, _) in enumerate(options):
+        aggregates[f"option_{i}"] = Count("id", filter=_facet_q(filters, exclude=facet) & FACET_FILTERS[facet](value))
+
+    row = text_matches(filters).order_by().aggregate(**aggregates)
+
+    facets = {"total": row["total"]}
+    for i, (facet, value, param, label) in enumerate(options):
+        facets.setdefault(facet, []).append({
+            "value": param,
+            "label": label,
+            "count": row[f"option_{i}"],
+            "selected": filters.get(facet) == value,
+        })
+    return facets
+
+
+def job_facets(params):
+    """Facet counts for job_list GET parameters, cached per normalized filter signature."""
+    filters = normalize_filters(params)
+    key = CACHE_KEY.format(jobs_version(), filter_signature(filters))
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_facets(filters)
+        cache.set(key, facets, getattr(settings, "JOB_FACETS_CACHE_TIMEOUT", 300))
+    return facets
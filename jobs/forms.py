@@ -86,3 +86,28 @@ class JobForm(forms.ModelForm):
                 attrs={"class": "form-select"},
             ),
         }
+
+
+class JobImportForm(forms.Form):
+    """Recruiter upload for the bulk importer (jobs/importer.py)."""
+    file = forms.FileField(
+        help_text="CSV with a header row, or JSONL (one JSON object per line); "
+                  "columns are the job form's field names.",
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.jsonl,.ndjson"}),
+    )
+    format = forms.ChoiceField(
+        choices=[("", "From the file name"), ("csv", "CSV"), ("jsonl", "JSONL")],
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def clean(self):
+        from .importer import format_for
+
+        cleaned = super().clean()
+        upload = cleaned.get("file")
+        if upload and not cleaned.get("format"):
+            cleaned["format"] = format_for(upload.name)
+            if cleaned["format"] is None:
+                self.add_error("format", "Can't tell the format from the file name; choose one.")
+        return cleaned
@@ -0,0 +1,319 @@
+# jobs/funnel.py
+"""
+Hiring funnel metrics from the application status history.
+
+Every change of an application's `status` or `final_decision` is appended
+to ApplicationStatusEvent (never updated), and folded at the same time
+into FunnelRollup counters, per job and per recruiter (job = null), one
+row per stage:
+
+- `current`  applications in the stage now,
+- `entered`  transitions into it (creation counts for the first stage),
+- `exited`   transitions out of it, with the total time of those stays,
+- a histogram of those stays (FunnelStageDuration) in half-octave
+  buckets — 1h, 1.4h, 2h, 2.8h, 4h, ... — which gives the median time in
+  a stage to within ~20% without keeping every duration.
+
+The recruiter dashboard then reads a handful of rollup rows
+(`funnel_summary()`) instead of aggregating raw events. Stays are timed
+from Application.status_changed_at; final decisions are counted but not
+timed.
+
+Updates come from the Application signals (saves, withdrawals) and from
+batch Kanban moves (jobs/kanban.py), which update rows with .update().
+`manage.py rebuild_funnels` recomputes every rollup from the event log
+and the applications table.
+"""
+import math
+from collections import Counter, defaultdict, namedtuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Application, ApplicationStatusEvent, FunnelRollup, FunnelStageDuration, Job
+
+STATUS_STAGES = ("applied", "review", "interview", "closed")
+DECISION_STAGES = ("hired", "rejected")
+STAGES = STATUS_STAGES + DECISION_STAGES
+STAGE_LABELS = {
+    "applied": "Applied",
+    "review": "In Review",
+    "interview": "Interview",
+    "closed": "Closed",
+    "hired": "Hired",
+    "rejected": "Rejected",
+}
+MAX_BUCKET = 30   # ~2.6 years and longer
+
+# One change: `since` is when the application entered `old` (status changes only)
+Transition = namedtuple("Transition", "application_id job_id recruiter_id field old new since at")
+
+
+# ==============================
+# Duration buckets (no database)
+# ==============================
+def duration_bucket(seconds):
+    """0 for under an hour, then half-octaves: bucket b covers [2^((b-1)/2), 2^(b/2)) hours."""
+    hours = max(seconds, 0) / 3600
+    if hours < 1:
+        return 0
+    return min(MAX_BUCKET, 1 + int(2 * math.log2(hours)))
+
+
+def bucket_seconds(bucket):
+    """A representative stay for `bucket`: the geometric middle of its range."""
+    if bucket == 0:
+        return 30 * 60
+    return 3600 * 2 ** ((2 * bucket - 1) / 4)
+
+
+def median_seconds(histogram):
+    """Approximate median of a {bucket: count} histogram, None if empty."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen * 2 >= total:
+            return bucket_seconds(bucket)
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "—"
+    if seconds < 3600:
+        return f"{max(1, round(seconds / 60))}m"
+    if seconds < 2 * 86400:
+        return f"{round(seconds / 3600)}h"
+    return f"{round(seconds / 86400)}d"
+
+
+# ==============================
+# Folding transitions into rollups
+# ==============================
+def _deltas(transitions):
+    """
+    ({(recruiter_id, job_id, stage): Counter of column increments},
+     {(recruiter_id, job_id, stage): Counter of bucket increments})
+    for every scope the transitions touch: the job and the recruiter.
+    """
+    counters = defaultdict(Counter)
+    buckets = defaultdict(Counter)
+    for t in transitions:
+        for scope in ((t.recruiter_id, t.job_id), (t.recruiter_id, None)):
+            if t.new in STAGES:
+                counters[(*scope, t.new)]["current"] += 1
+                counters[(*scope, t.new)]["entered"] += 1
+            if t.old in STAGES:
+                counters[(*scope, t.old)]["current"] -= 1
+                counters[(*scope, t.old)]["exited"] += 1
+                if t.since is not None:
+                    seconds = max((t.at - t.since).total_seconds(), 0)
+                    counters[(*scope, t.old)]["total_seconds"] += seconds
+                    buckets[(*scope, t.old)][duration_bucket(seconds)] += 1
+    return counters, buckets
+
+
+def _rollups(recruiter_id, job_id, stage):
+    if job_id is None:
+        return FunnelRollup.objects.filter(recruiter_id=recruiter_id, job__isnull=True, stage=stage)
+    return FunnelRollup.objects.filter(job_id=job_id, stage=stage)
+
+
+def _add(rows, create, increments):
+    """
+    Add `increments` to the row `rows` selects, creating it (from
+    `create`) if it doesn't exist yet. A change that only decrements a
+    missing row is dropped: its job is being deleted.
+    """
+    updates = {name: F(name) + value for name, value in increments.items() if value}
+    if not updates or rows.update(**updates):
+        return
+    if not any(value > 0 for value in increments.values()):
+        return
+    try:
+        with transaction.atomic():
+            rows.model.objects.create(**create, **increments)
+    except IntegrityError:
+        # Created concurrently since we looked: add ourselves in
+        rows.update(**updates)
+
+
+def _apply(counters, buckets):
+    for (recruiter_id, job_id, stage), increments in counters.items():
+        _add(_rollups(recruiter_id, job_id, stage),
+             {"recruiter_id": recruiter_id, "job_id": job_id, "stage": stage}, increments)
+
+    for key, histogram in buckets.items():
+        rollup_id = _rollups(*key).values_list("id", flat=True).first()
+        if rollup_id is None:
+            continue
+        for bucket, n in histogram.items():
+            _add(FunnelStageDuration.objects.filter(rollup_id=rollup_id, bucket=bucket),
+                 {"rollup_id": rollup_id, "bucket": bucket}, {"count": n})
+
+
+def record_transitions(transitions):
+    """Append `transitions` to the event log and fold them into the rollups, atomically."""
+    if not transitions:
+        return
+    with transaction.atomic():
+        ApplicationStatusEvent.objects.bulk_create([
+            ApplicationStatusEvent(
+                application_id=t.application_id, job_id=t.job_id, field=t.field,
+                old_value=t.old, new_value=t.new, created_at=t.at,
+            )
+            for t in transitions
+        ])
+        _apply(*_deltas(transitions))
+
+
+# ==============================
+# Application signals
+# ==============================
+def application_created(application, recruiter_id):
+    at = application.applied_at or timezone.now()
+    transitions = [Transition(application.pk, application.job_id, recruiter_id,
+                              ApplicationStatusEvent.STATUS, "", application.status, None, at)]
+    if application.final_decision in DECISION_STAGES:
+        transitions.append(Transition(application.pk, application.job_id, recruiter_id,
+                                      ApplicationStatusEvent.FINAL_DECISION, "", application.final_decision, None, at))
+    record_transitions(transitions)
+
+
+def application_changed(application, recruiter_id, before):
+    """`before` is the (status, final_decision, status_changed_at) the row had before this save."""
+    old_status, old_decision, since = before
+    transitions = []
+    if application.status != old_status:
+        transitions.append(Transition(application.pk, application.job_id, recruiter_id,
+                                      ApplicationStatusEvent.STATUS, old_status, application.status,
+                                      since, application.status_changed_at))
+    if application.final_decision != old_decision:
+        transitions.append(Transition(application.pk, application.job_id, recruiter_id,
+                                      ApplicationStatusEvent.FINAL_DECISION, old_decision,
+                                      application.final_decision, None, timezone.now()))
+    record_transitions(transitions)
+
+
+def application_removed(application, recruiter_id):
+    """A withdrawn (deleted) application leaves its stages; its history stays."""
+    decrements = defaultdict(Counter)
+    for scope in ((recruiter_id, application.job_id), (recruiter_id, None)):
+        for stage in (application.status, application.final_decision):
+            if stage in STAGES:
+                decrements[(*scope, stage)]["current"] -= 1
+    _apply(decrements, {})
+
+
+# ==============================
+# Reading
+# ==============================
+def _summary(rollups):
+    """Funnel numbers from one scope's rollup rows (durations prefetched)."""
+    by_stage = {rollup.stage: rollup for rollup in rollups}
+    started = by_stage["applied"].entered if "applied" in by_stage else 0
+    applications = sum(by_stage[s].current for s in STATUS_STAGES if s in by_stage)
+    stages = []
+    for stage in STAGES:
+        rollup = by_stage.get(stage)
+        histogram = {d.bucket: d.count for d in rollup.durations.all()} if rollup else {}
+        median = median_seconds(histogram)
+        stages.append({
+            "stage": stage,
+            "label": STAGE_LABELS[stage],
+            "current": rollup.current if rollup else 0,
+            "entered": rollup.entered if rollup else 0,
+            "conversion": round(100 * rollup.entered / started) if rollup and started else None,
+            "median_seconds": median,
+            "median": format_duration(median) if stage in STATUS_STAGES else "",
+        })
+    counts = {row["stage"]: row["current"] for row in stages}
+    return {
+        "stages": stages,
+        "applications": applications,
+        "hired": counts["hired"],
+        "rejected": counts["rejected"],
+        "hire_rate": round(100 * counts["hired"] / applications) if applications else None,
+        "reject_rate": round(100 * counts["rejected"] / applications) if applications else None,
+    }
+
+
+def funnel_summary(recruiter_id, job_id=None):
+    """The funnel of one job, or of all of a recruiter's jobs: two indexed queries."""
+    return _summary(_rollups_for(recruiter_id, job_id).prefetch_related("durations"))
+
+
+def _rollups_for(recruiter_id, job_id):
+    if job_id is None:
+        return FunnelRollup.objects.filter(recruiter_id=recruiter_id, job__isnull=True)
+    return FunnelRollup.objects.filter(recruiter_id=recruiter_id, job_id=job_id)
+
+
+# ==============================
+# Rebuild
+# ==============================
+def replay(events, recruiter_of):
+    """
+    Counters and histograms ((counters, buckets) as in `_deltas`, minus
+    `current`) from an event stream of (application_id, job_id, field,
+    old, new, created_at) ordered by application, then id.
+    """
+    transitions = []
+    last_application, entered_at = None, None
+    for application_id, job_id, field, old, new, at in events:
+        if application_id != last_application:
+            last_application, entered_at = application_id, None
+        since = None
+        if field == ApplicationStatusEvent.STATUS:
+            since = entered_at if old else None
+            entered_at = at
+        transitions.append(Transition(application_id, job_id, recruiter_of[job_id], field, old, new, since, at))
+    counters, buckets = _deltas(transitions)
+    for increments in counters.values():
+        increments.pop("current", None)
+    return counters, buckets
+
+
+def rebuild_funnels(job_model=Job, application_model=Application, event_model=ApplicationStatusEvent,
+                    rollup_model=FunnelRollup, duration_model=FunnelStageDuration):
+    """
+    Recompute every rollup: entered / exited / durations by replaying the
+    event log, `current` from the applications table. Model classes are
+    parameters so migrations can pass theirs. Returns the rollups written.
+    """
+    recruiter_of = dict(job_model.objects.values_list("id", "recruiter_id"))
+    events = (
+        event_model.objects
+        .order_by("application_id", "id")
+        .values_list("application_id", "job_id", "field", "old_value", "new_value", "created_at")
+    )
+    counters, buckets = replay(events.iterator(chunk_size=5000), recruiter_of)
+
+    for field in ("status", "final_decision"):
+        rows = (
+            application_model.objects.filter(**{f"{field}__in": STAGES})
+            .values_list("job_id", field).annotate(n=Count("id")).order_by()
+        )
+        for job_id, stage, n in rows:
+            recruiter_id = recruiter_of[job_id]
+            counters[recruiter_id, job_id, stage]["current"] += n
+            counters[recruiter_id, None, stage]["current"] += n
+
+    with transaction.atomic():
+        rollup_model.objects.all().delete()
+        rollups = rollup_model.objects.bulk_create([
+            rollup_model(recruiter_id=recruiter_id, job_id=job_id, stage=stage,
+                         current=c["current"], entered=c["entered"], exited=c["exited"],
+                         total_seconds=c["total_seconds"])
+            for (recruiter_id, job_id, stage), c in counters.items()
+        ], batch_size=1000)
+        ids = {(r.recruiter_id, r.job_id, r.stage): r.pk for r in rollups}
+        duration_model.objects.bulk_create([
+            duration_model(rollup_id=ids[key], bucket=bucket, count=n)
+            for key, histogram in buckets.items()
+            for bucket, n in histogram.items()
+        ], batch_size=1000)
+    return len(rollups)
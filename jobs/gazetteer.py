@@ -0,0 +1,189 @@
+# jobs/gazetteer.py
+"""
+Offline geocoder: city / ZIP centroids from a local dataset.
+
+The dataset (jobs/data/gazetteer.csv, or the US Census Gazetteer files —
+see `manage.py build_gazetteer`) is compiled into a compact binary index:
+
+    header  : b"CHGZ", version (u32), record count (u32)
+    records : count x (key hash u64, latitude f32, longitude f32), sorted by hash
+
+Keys are normalized strings ("zip|us|30332", "city|us|ga|atlanta",
+"city|gb||london") hashed with BLAKE2b, so a lookup is a binary search over
+16-byte records — microseconds, no network. The index file is
+memory-mapped, so every worker process shares the same pages; without a
+built index the bundled CSV is compiled in memory on first use.
+"""
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .locations import (
+    normalize_city, normalize_country, normalize_state, normalize_zip, parse_address,
+)
+
+MAGIC = b"CHGZ"
+VERSION = 1
+_HEADER = struct.Struct("<4sII")
+_RECORD = struct.Struct("<Qff")
+_HASH = struct.Struct("<Q")
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DEFAULT_CSV = DATA_DIR / "gazetteer.csv"
+DEFAULT_INDEX = DATA_DIR / "gazetteer.idx"
+
+
+# ===============================================================
+# Keys
+# ===============================================================
+def _key_hash(key):
+    return _HASH.unpack(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest())[0]
+
+
+def zip_key(zip_code, country="us"):
+    return f"zip|{normalize_country(country) or 'us'}|{normalize_zip(zip_code)}"
+
+
+def city_key(city, state="", country="us"):
+    country = normalize_country(country) or "us"
+    return f"city|{country}|{normalize_state(state, country)}|{normalize_city(city)}"
+
+
+# ===============================================================
+# Index build
+# ===============================================================
+def read_csv_rows(path):
+    """Yield (key, lat, lng) from the bundled CSV format."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            lat, lng = float(row["latitude"]), float(row["longitude"])
+            if row["kind"] == "zip":
+                yield zip_key(row["name"], row["country"]), lat, lng
+            else:
+                yield city_key(row["name"], row["state"], row["country"]), lat, lng
+                # Also reachable without a state ("London, UK"); first row wins
+                yield city_key(row["name"], "", row["country"]), lat, lng
+
+
+def build_index(rows):
+    """Compile (key, lat, lng) rows into index bytes. Earlier duplicates win."""
+    records = {}
+    for key, lat, lng in rows:
+        records.setdefault(_key_hash(key), (lat, lng))
+
+    out = bytearray(_HEADER.size + _RECORD.size * len(records))
+    _HEADER.pack_into(out, 0, MAGIC, VERSION, len(records))
+    offset = _HEADER.size
+    for key_hash in sorted(records):
+        lat, lng = records[key_hash]
+        _RECORD.pack_into(out, offset, key_hash, lat, lng)
+        offset += _RECORD.size
+    return bytes(out)
+
+
+def write_index(rows, path):
+    """Build the index and atomically replace `path`. Returns the record count."""
+    data = build_index(rows)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return _HEADER.unpack_from(data, 0)[2]
+
+
+# ===============================================================
+# Lookup
+# ===============================================================
+class Gazetteer:
+    """Binary search over a (possibly memory-mapped) index buffer."""
+
+    def __init__(self, buffer):
+        magic, version, count = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a CareerHub gazetteer index (rebuild with manage.py build_gazetteer)")
+        self._buf = buffer
+        self._count = count
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as fh:
+            return cls(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key):
+        """(lat, lng) for a normalized key, or None."""
+        target = _key_hash(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _HEADER.size + mid * _RECORD.size
+            h = _HASH.unpack_from(self._buf, offset)[0]
+            if h < target:
+                lo = mid + 1
+            elif h > target:
+                hi = mid
+            else:
+                _, lat, lng = _RECORD.unpack_from(self._buf, offset)
+                return round(lat, 5), round(lng, 5)
+        return None
+
+    def lookup(self, city="", state="", zip_code="", country=""):
+        """
+        Resolve structured address fields (as stored on Job and
+        JobSeekerProfile): ZIP centroid first, then city+state, then
+        city+country. Returns (lat, lng) or None.
+        """
+        country = normalize_country(country)
+        if country in ("", "us") and zip_code:
+            hit = self.get(zip_key(zip_code))
+            if hit:
+                return hit
+        if city:
+            if state:
+                hit = self.get(city_key(city, state, country))
+                if hit:
+                    return hit
+            return self.get(city_key(city, "", country))
+        return None
+
+    def lookup_address(self, address):
+        """Same as lookup() for a one-line "street, city, state, zip, country" string."""
+        parts = parse_address(address)
+        return self.lookup(parts["city"], parts["state"], parts["zip_code"], parts["country"])
+
+
+_instance = None
+_instance_lock = threading.Lock()
+
+
+def get_gazetteer():
+    """
+    Process-wide Gazetteer: the memory-mapped index at
+    settings.GAZETTEER_INDEX_PATH when it exists, otherwise the bundled CSV
+    compiled in memory.
+    """
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                path = Path(getattr(settings, "GAZETTEER_INDEX_PATH", DEFAULT_INDEX))
+                if path.exists():
+                    _instance = Gazetteer.open(path)
+                else:
+                    _instance = Gazetteer(build_index(read_csv_rows(DEFAULT_CSV)))
+    return _instance
+
+
+def reset_gazetteer():
+    """Forget the loaded index (after rebuilding it, and in tests)."""
+    global _instance
+    with _instance_lock:
+        _instance = None
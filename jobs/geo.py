@@ -0,0 +1,259 @@
+# jobs/geo.py
+"""
+Spatial helpers for job search.
+
+- `haversine_distance` gives the exact great-circle distance in miles.
+- Every geocoded Job stores a short **geohash** (a base32 grid-cell id).
+  A radius query turns the search circle into a bounding box, lists the
+  grid cells that cover that box and only looks at jobs sitting in those
+  cells.
+- `HaversineMiles` computes the exact distance inside the database so
+  filtering, ORDER BY and LIMIT happen in SQL (see JobQuerySet.within_radius).
+"""
+import math
+
+from django.db.models import FloatField, Func, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_MILES = 3958.8  # Earth’s radius in miles
+MILES_PER_DEGREE_LAT = EARTH_RADIUS_MILES * math.pi / 180
+
+# 5 characters ≈ 4.9 km x 4.9 km cells: small enough that a 10–50 mile
+# search only touches a few dozen/hundred cells.
+GEOHASH_PRECISION = 5
+
+# Above this many cells an IN (...) list stops paying off (and old SQLite
+# builds cap bound parameters at 999), so we fall back to the bbox alone.
+MAX_COVER_CELLS = 400
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+# ===============================================================
+# Distance
+# ===============================================================
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great-circle distance between two points
+    on the Earth's surface (in miles) using the Haversine formula.
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    c = 2 * math.asin(math.sqrt(a))
+    return EARTH_RADIUS_MILES * c
+
+
+def _sqlite_haversine_miles(lat1, lon1, lat2, lon2):
+    """SQLite user function: NULL in, NULL out (like any SQL function)."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    return haversine_distance(lat1, lon1, lat2, lon2)
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    """
+    `connection_created` receiver (wired in JobsConfig.ready): registers
+    HAVERSINE_MILES on every new SQLite connection. One Python call per row
+    is much cheaper than the ~10 nested trig callbacks the generic formula
+    would need on SQLite.
+    """
+    if connection.vendor == "sqlite":
+        connection.connection.create_function(
+            "HAVERSINE_MILES", 4, _sqlite_haversine_miles, deterministic=True
+        )
+
+
+class HaversineMiles(Func):
+    """
+    Great-circle distance in miles between two (lat, lng) pairs:
+
+        HaversineMiles("latitude", "longitude", Value(lat), Value(lng))
+
+    SQLite uses the registered HAVERSINE_MILES function; other databases get
+    the same formula built from their native trig functions.
+    """
+    function = "HAVERSINE_MILES"
+    arity = 4
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, **extra_context)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        lat1, lng1, lat2, lng2 = (Radians(e) for e in self.get_source_expressions())
+        a = (
+            Power(Sin((lat2 - lat1) / 2), 2)
+            + Cos(lat1) * Cos(lat2) * Power(Sin((lng2 - lng1) / 2), 2)
+        )
+        # LEAST guards ASIN against rounding pushing sqrt(a) just past 1
+        expr = Value(2 * EARTH_RADIUS_MILES) * ASin(Least(Sqrt(a), Value(1.0)))
+        return compiler.compile(expr.resolve_expression(compiler.query))
+
+
+# ===============================================================
+# Geohash
+# ===============================================================
+def encode_geohash(lat, lng, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string of `precision` characters."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    ch = 0
+    even = True  # geohash interleaves bits starting with longitude
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                ch = (ch << 1) | 1
+                lng_lo = mid
+            else:
+                ch = ch << 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch = ch << 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits = 0
+            ch = 0
+
+    return "".join(chars)
+
+
+def decode_geohash_center(geohash):
+    """Return the (lat, lng) center of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                if bit:
+                    lng_lo = mid
+                else:
+                    lng_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return (lat_lo + lat_hi) / 2, (lng_lo + lng_hi) / 2
+
+
+def geohash_cell_size(precision=GEOHASH_PRECISION):
+    """Return (lat_degrees, lng_degrees) covered by one cell."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+# ===============================================================
+# Bounding boxes
+# ===============================================================
+def bounding_box(lat, lng, miles):
+    """
+    Return (south, north, west, east) enclosing the circle of `miles`
+    around (lat, lng).
+
+    `west > east` means the box wraps across the antimeridian (±180°).
+    Near the poles the box simply spans every longitude.
+    """
+    dlat = miles / MILES_PER_DEGREE_LAT
+    south = max(-90.0, lat - dlat)
+    north = min(90.0, lat + dlat)
+
+    cos_lat = math.cos(math.radians(lat))
+    if south <= -90.0 or north >= 90.0 or cos_lat < 1e-6:
+        return south, north, -180.0, 180.0
+
+    # Widest longitude the circle reaches (at the meridians' tangent points,
+    # poleward of `lat`), not `miles` measured along the parallel
+    ratio = math.sin(miles / EARTH_RADIUS_MILES) / cos_lat
+    if ratio >= 1.0:
+        return south, north, -180.0, 180.0
+    dlng = math.degrees(math.asin(ratio))
+
+    west = lng - dlng
+    east = lng + dlng
+    if west < -180.0:
+        west += 360.0
+    if east > 180.0:
+        east -= 360.0
+    return south, north, west, east
+
+
+def bbox_q(south, north, west, east, lat_field="latitude", lng_field="longitude"):
+    """Build a Q object matching coordinates inside the box (index friendly)."""
+    q = Q(**{f"{lat_field}__gte": south, f"{lat_field}__lte": north})
+    if west <= east:
+        return q & Q(**{f"{lng_field}__gte": west, f"{lng_field}__lte": east})
+    # Box wraps across ±180°: two longitude ranges
+    return q & (Q(**{f"{lng_field}__gte": west}) | Q(**{f"{lng_field}__lte": east}))
+
+
+def covering_geohashes(south, north, west, east, precision=GEOHASH_PRECISION,
+                       max_cells=MAX_COVER_CELLS):
+    """
+    List every geohash cell that overlaps the box, or None when that would
+    take more than `max_cells` cells (callers then rely on the bbox only).
+    """
+    cell_lat, cell_lng = geohash_cell_size(precision)
+
+    if west <= east:
+        lng_spans = [(west, east)]
+    else:
+        lng_spans = [(west, 180.0), (-180.0, east)]
+
+    rows = int(math.floor((north + 90.0) / cell_lat) - math.floor((south + 90.0) / cell_lat)) + 1
+    cols = 0
+    for lo, hi in lng_spans:
+        cols += int(math.floor((hi + 180.0) / cell_lng) - math.floor((lo + 180.0) / cell_lng)) + 1
+    if rows * cols > max_cells:
+        return None
+
+    cells = set()
+    first_row = math.floor((south + 90.0) / cell_lat)
+    for r in range(rows):
+        # Probe the centre of each cell so float edges never miss a cell
+        c_lat = min(89.999999, -90.0 + (first_row + r + 0.5) * cell_lat)
+        for lo, hi in lng_spans:
+            first_col = math.floor((lo + 180.0) / cell_lng)
+            last_col = math.floor((hi + 180.0) / cell_lng)
+            for c in range(int(first_col), int(last_col) + 1):
+                c_lng = min(179.999999, -180.0 + (c + 0.5) * cell_lng)
+                cells.add(encode_geohash(c_lat, c_lng, precision))
+    return sorted(cells)
+
+
+# ===============================================================
+# Radius search
+# ===============================================================
+def radius_prefilter(queryset, lat, lng, miles):
+    """
+    Narrow `queryset` to jobs whose coordinates may lie within `miles`:
+    indexed latitude/longitude bounding box + covering geohash cells.
+    """
+    south, north, west, east = bounding_box(lat, lng, miles)
+    qs = queryset.filter(bbox_q(south, north, west, east))
+    cells = covering_geohashes(south, north, west, east)
+    if cells is not None:
+        qs = qs.filter(geohash__in=cells)
+    return qs
+
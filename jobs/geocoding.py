@@ -0,0 +1,465 @@
+# jobs/geocoding.py
+"""
+Geocoding for jobs: Google lookups, the geocode cache and the background
+pipeline that resolves pending jobs.
+
+Lookup order for an address (`geocode()` / `Job.geocode_address`):
+
+0. the offline gazetteer (jobs/gazetteer.py) for city/ZIP-level
+   addresses, depending on settings.GEOCODER_BACKEND:
+     "gazetteer_first" – answer city/ZIP addresses locally, use Google only
+                         for street-level precision (and fall back to the
+                         city/ZIP centroid if Google can't find the street),
+     "gazetteer_only"  – never call Google,
+     "google"          – skip the gazetteer.
+   Without GOOGLE_MAPS_API_KEY "gazetteer_first" behaves like "gazetteer_only".
+1. in-process LRU (per worker process, no I/O),
+2. the GeocodeCacheEntry table (shared by every process),
+3. the Google Maps Geocoding API (pooled client with timeouts and a
+   circuit breaker, jobs/geocoding_client.py) — the result is written
+   back to both.
+
+Hits and misses ("Google found nothing") are both cached, with separate
+TTLs (settings.GEOCODE_CACHE_HIT_TTL / GEOCODE_CACHE_MISS_TTL, seconds).
+
+Background pipeline: `Job.save()` never talks to Google, it only marks the
+job `geocode_status="pending"`. `resolve_pending_jobs()` then:
+
+1. reads a batch of pending (id, location) rows (keyset on id),
+2. answers what it can offline and from the cache, geocodes the remaining
+   *distinct* addresses concurrently on a small thread pool,
+3. writes coordinates back with a conditional UPDATE per job (only if the
+   address didn't change in the meantime — otherwise it stays pending).
+
+Job seeker addresses (JobSeekerProfile) go through the same pipeline,
+`resolve_pending_profiles()`, for "jobs near you" recommendations.
+
+Run it with `python manage.py geocode_jobs` (add `--loop` to keep polling).
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import JobSeekerProfile
+
+from .gazetteer import get_gazetteer
+from .geo import encode_geohash
+from .geocoding_client import GeocodingError, get_client
+from .job_index import refresh_job_id
+from .locations import parse_address
+from .map_clusters import move_job
+from .models import GeocodeCacheEntry, Job
+from .recommendations import job_point_changed, refresh_nearby_for_seeker
+from .recruiter_pins import invalidate_recruiter_pins
+from .response_cache import bump_jobs_version
+
+logger = logging.getLogger(__name__)
+
+
+# ===============================================================
+# Google Maps Geocoding API
+# ===============================================================
+def google_geocode(address):
+    """
+    Google lookup through the shared pooled client (timeouts, retries,
+    circuit breaker — see jobs/geocoding_client.py), including the
+    simplified "City, State" second query.
+
+    Returns (lat, lng) or (None, None); raises GeocodingError when the
+    provider is unavailable.
+    """
+    return get_client().geocode(address)
+
+
+# ===============================================================
+# Offline gazetteer
+# ===============================================================
+def _backend():
+    return getattr(settings, "GEOCODER_BACKEND", "gazetteer_first")
+
+
+def _google_enabled():
+    return _backend() == "google" or (
+        _backend() == "gazetteer_first" and bool(settings.GOOGLE_MAPS_API_KEY)
+    )
+
+
+def local_geocode(address):
+    """
+    Answer `address` without the network when the backend allows it.
+
+    Returns (lat, lng), (None, None) for a definite "not found", or None
+    when the address should go to Google.
+    """
+    if _backend() == "google":
+        return None
+    hit = get_gazetteer().lookup_address(address)
+    if not _google_enabled():
+        return hit or (None, None)
+    # City/ZIP-level addresses are as precise as Google would be
+    if hit and not parse_address(address)["street"]:
+        return hit
+    return None
+
+
+def _with_fallback(address, result):
+    """Google missed a street address: use the city/ZIP centroid instead."""
+    if result[0] is None and _backend() != "google":
+        return get_gazetteer().lookup_address(address) or (None, None)
+    return result
+
+
+# ===============================================================
+# Geocode Cache (LRU -> GeocodeCacheEntry -> provider)
+# ===============================================================
+def normalize_address(address):
+    """Cache key: lowercase, single spaces, uniform ", " separators."""
+    key = " ".join((address or "").lower().split())
+    key = re.sub(r"\s*,\s*", ", ", key).strip(", ")
+    return key[:255]
+
+
+def _hit_ttl():
+    return getattr(settings, "GEOCODE_CACHE_HIT_TTL", 60 * 60 * 24 * 90)
+
+
+def _miss_ttl():
+    return getattr(settings, "GEOCODE_CACHE_MISS_TTL", 60 * 60 * 24)
+
+
+class _LRU:
+    """Small thread-safe LRU of key -> (lat, lng, expires_at)."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[2] <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[0], item[1]
+
+    def put(self, key, lat, lng, expires_at):
+        with self._lock:
+            self._data[key] = (lat, lng, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_memory = _LRU(getattr(settings, "GEOCODE_CACHE_MEMORY_SIZE", 2048))
+
+_stats_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "negative_hits": 0, "misses": 0}
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def cache_stats():
+    """
+    Counters since process start:
+    memory_hits / db_hits (answered from cache, misses included),
+    negative_hits (of those, cached "not found"), misses (went to the API).
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+
+def clear_memory_cache():
+    """Drop the in-process LRU (the database cache is untouched)."""
+    _memory.clear()
+
+
+def lookup_cached(addresses):
+    """
+    Resolve as many `addresses` as possible from the cache.
+
+    Returns {address: (lat, lng)} for fresh entries; a cached miss is
+    (None, None). Addresses missing from the result must be geocoded.
+    The database tier is one query for the whole batch.
+    """
+    now = timezone.now()
+    found = {}
+    db_keys = {}
+    for address in addresses:
+        key = normalize_address(address)
+        if not key:
+            continue
+        cached = _memory.get(key, now)
+        if cached is not None:
+            found[address] = cached
+            _count("memory_hits")
+            if cached[0] is None:
+                _count("negative_hits")
+        else:
+            db_keys.setdefault(key, []).append(address)
+
+    if db_keys:
+        entries = GeocodeCacheEntry.objects.filter(address_key__in=list(db_keys), expires_at__gt=now)
+        hit_ids = []
+        for entry in entries:
+            _memory.put(entry.address_key, entry.latitude, entry.longitude, entry.expires_at)
+            hit_ids.append(entry.id)
+            for address in db_keys[entry.address_key]:
+                found[address] = (entry.latitude, entry.longitude)
+                _count("db_hits")
+                if entry.is_miss:
+                    _count("negative_hits")
+        if hit_ids:
+            GeocodeCacheEntry.objects.filter(id__in=hit_ids).update(hit_count=F("hit_count") + 1)
+
+    return found
+
+
+def store_result(address, lat, lng):
+    """Cache a provider answer (hit or miss) in both tiers."""
+    key = normalize_address(address)
+    if not key:
+        return
+    if lat is None or lng is None:
+        lat = lng = None
+        ttl = _miss_ttl()
+    else:
+        ttl = _hit_ttl()
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    GeocodeCacheEntry.objects.update_or_create(
+        address_key=key,
+        defaults={"latitude": lat, "longitude": lng, "expires_at": expires_at},
+    )
+    _memory.put(key, lat, lng, expires_at)
+
+
+def geocode(address, provider=None):
+    """Single-address lookup (gazetteer, cache, provider): (lat, lng) or (None, None)."""
+    if not normalize_address(address):
+        return None, None
+    local = local_geocode(address)
+    if local is not None:
+        return local
+
+    cached = lookup_cached([address])
+    if address in cached:
+        return _with_fallback(address, cached[address])
+
+    _count("misses")
+    try:
+        lat, lng = (provider or google_geocode)(address)
+    except GeocodingError as exc:
+        # Provider down: answer what we can, but don't cache it as a miss
+        logger.warning("Geocoding unavailable for %r: %s", address, exc)
+        return _with_fallback(address, (None, None))
+    store_result(address, lat, lng)
+    return _with_fallback(address, (lat, lng))
+
+
+# ===============================================================
+# Background pipeline
+# ===============================================================
+def resolve_pending_jobs(batch_size=100, workers=4, geocoder=None, limit=None):
+    """
+    Geocode every job currently pending and return counters:
+    {"jobs", "geocoded", "failed", "errors", "skipped", "offline", "cached", "api_calls", "seconds"}
+
+    `geocoder(address) -> (lat, lng)` is the uncached provider (defaults to
+    google_geocode); `(None, None)` marks the job failed. If it *raises*
+    (network trouble) the job stays pending so the next run retries it and
+    nothing is cached. All database work stays on the calling thread; only
+    the provider calls run on the pool.
+    """
+    geocoder = geocoder or google_geocode
+    stats = {"jobs": 0, "geocoded": 0, "failed": 0, "errors": 0, "skipped": 0,
+             "offline": 0, "cached": 0, "api_calls": 0}
+    started = time.monotonic()
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while limit is None or stats["jobs"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["jobs"])
+            batch = list(
+                Job.objects
+                .filter(geocode_status=Job.GEOCODE_PENDING, id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "location")[:size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            stats["jobs"] += len(batch)
+
+            # Many postings share an address: look each one up only once
+            results = resolve_addresses({location for _, location in batch if location}, geocoder, pool, stats)
+
+            for job_id, location in batch:
+                result = results.get(location)
+                if result is None:
+                    stats["errors"] += 1
+                    continue
+                stats[_write_result(job_id, location, *result)] += 1
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    return stats
+
+
+def resolve_pending_profiles(batch_size=100, workers=4, geocoder=None, limit=None):
+    """
+    Same pipeline for job seeker addresses (JobSeekerProfile.geocode_status
+    "pending"); a geocoded seeker's "nearby" recommendations are recomputed.
+    Returns {"profiles", "geocoded", "failed", "errors", "skipped", "offline", "cached", "api_calls", "seconds"}.
+    """
+    geocoder = geocoder or google_geocode
+    stats = {"profiles": 0, "geocoded": 0, "failed": 0, "errors": 0, "skipped": 0,
+             "offline": 0, "cached": 0, "api_calls": 0}
+    started = time.monotonic()
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while limit is None or stats["profiles"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["profiles"])
+            batch = list(
+                JobSeekerProfile.objects
+                .filter(geocode_status=JobSeekerProfile.GEOCODE_PENDING, id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "geocode_address")[:size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            stats["profiles"] += len(batch)
+
+            results = resolve_addresses({address for _, address in batch if address}, geocoder, pool, stats)
+            for profile_id, address in batch:
+                result = results.get(address)
+                if result is None:
+                    stats["errors"] += 1
+                    continue
+                stats[_write_profile_result(profile_id, address, *result)] += 1
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    return stats
+
+
+def resolve_addresses(addresses, geocoder=None, pool=None, stats=None):
+    """
+    Batch geocoding: {address: (lat, lng)} for distinct `addresses`, the
+    gazetteer and the cache first, the provider (concurrently, on the
+    ThreadPoolExecutor `pool`, else one at a time) only for the rest.
+    Addresses whose lookup errored are left out. `geocoder` defaults to
+    google_geocode; `stats`, if given, gets its "offline", "cached" and
+    "api_calls" counters incremented.
+    """
+    geocoder = geocoder or google_geocode
+    stats = stats if stats is not None else {"offline": 0, "cached": 0, "api_calls": 0}
+    lookup = pool.map if pool is not None else map
+    addresses = sorted(addresses)
+    results = {}
+    for address in addresses:
+        local = local_geocode(address)
+        if local is not None:
+            results[address] = local
+    stats["offline"] += len(results)
+
+    remote = [a for a in addresses if a not in results]
+    cached = lookup_cached(remote)
+    stats["cached"] += len(cached)
+
+    to_fetch = [a for a in remote if a not in cached]
+    stats["api_calls"] += len(to_fetch)
+    _count("misses", len(to_fetch))
+    for address, result in zip(to_fetch, lookup(lambda a: _safe_geocode(geocoder, a), to_fetch)):
+        if result is not None:
+            store_result(address, *result)
+            cached[address] = result
+    for address, result in cached.items():
+        results[address] = _with_fallback(address, result)
+    return results
+
+
+def _safe_geocode(geocoder, address):
+    """Run one lookup; None means "error, try again later"."""
+    try:
+        return geocoder(address)
+    except GeocodingError as exc:
+        logger.warning("Geocoding unavailable for %r: %s", address, exc)
+        return None
+    except Exception:
+        logger.exception("Geocoding failed for %r", address)
+        return None
+
+
+def _write_result(job_id, location, lat, lng):
+    """
+    Store one result, guarded against concurrent address edits. A failed
+    lookup clears the coordinates too: a job whose address changed must not
+    stay pinned at the old one.
+    """
+    pending = Job.objects.filter(
+        pk=job_id, location=location, geocode_status=Job.GEOCODE_PENDING,
+    )
+    failed = lat is None or lng is None
+    if failed:
+        fields = {"latitude": None, "longitude": None, "geohash": "", "geocode_status": Job.GEOCODE_FAILED}
+    else:
+        fields = {"latitude": lat, "longitude": lng, "geohash": encode_geohash(lat, lng),
+                  "geocode_status": Job.GEOCODE_OK}
+    new_point = None if failed else (lat, lng)
+
+    # .update() skips the Job signals, so move the job's map cluster, drop
+    # the recruiter's cached map pins, refresh the in-memory index and
+    # expire the cached job pages here
+    with transaction.atomic():
+        before = pending.values("recruiter_id", "is_active", "latitude", "longitude").first()
+        updated = pending.update(**fields)
+        if updated and before["is_active"]:
+            old_point = None
+            if before["latitude"] is not None and before["longitude"] is not None:
+                old_point = (before["latitude"], before["longitude"])
+            move_job(old_point, new_point)
+            job_point_changed(job_id, old_point, new_point)
+        if updated:
+            invalidate_recruiter_pins(before["recruiter_id"])
+    if not updated:
+        return "skipped"
+    bump_jobs_version()
+    refresh_job_id(job_id)
+    return "failed" if failed else "geocoded"
+
+
+def _write_profile_result(profile_id, address, lat, lng):
+    """Store one seeker's coordinates (unless the address changed meanwhile)."""
+    pending = JobSeekerProfile.objects.filter(
+        pk=profile_id, geocode_address=address, geocode_status=JobSeekerProfile.GEOCODE_PENDING,
+    )
+    if lat is None or lng is None:
+        updated = pending.update(geocode_status=JobSeekerProfile.GEOCODE_FAILED, latitude=None, longitude=None)
+        status = "failed"
+    else:
+        updated = pending.update(latitude=lat, longitude=lng, geocode_status=JobSeekerProfile.GEOCODE_OK)
+        status = "geocoded"
+    if not updated:
+        return "skipped"
+    user_id = JobSeekerProfile.objects.filter(pk=profile_id).values_list("user_id", flat=True).first()
+    refresh_nearby_for_seeker(user_id)
+    return status
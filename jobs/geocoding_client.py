@@ -0,0 +1,244 @@
+# jobs/geocoding_client.py
+"""
+HTTP client for the Google Maps Geocoding API.
+
+- One pooled `requests.Session` per process (keep-alive, no new TCP/TLS
+  handshake per lookup), shared by the worker threads.
+- Connect/read timeouts on every request, bounded retries with
+  exponential backoff for connection errors and 429/5xx responses.
+- A circuit breaker: after `GEOCODING_BREAKER_THRESHOLD` consecutive
+  failures the provider is skipped for `GEOCODING_BREAKER_RESET` seconds,
+  then a single trial request decides whether to close it again.
+- Latency and error counters (`get_client().stats()`).
+
+"ZERO_RESULTS" is a normal answer ((None, None)); provider trouble
+(timeouts, 5xx, OVER_QUERY_LIMIT, an open circuit...) raises
+GeocodingError so callers can retry later instead of caching a miss.
+"""
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+
+class GeocodingError(Exception):
+    """The provider could not answer (as opposed to "address not found")."""
+
+
+class CircuitOpenError(GeocodingError):
+    """The circuit breaker is open: the provider is being skipped."""
+
+
+# ===============================================================
+# Circuit breaker
+# ===============================================================
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """May a request go out now? Half-open lets exactly one trial through."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+
+# ===============================================================
+# Client
+# ===============================================================
+def _parse_body(data):
+    """
+    (status, (lat, lng) or None) from a decoded response body; ValueError
+    if it isn't the shape the API documents (a proxy's error page, a
+    truncated body...).
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    status = data.get("status")
+    results = data.get("results")
+    if status != "OK" or not results:
+        return status, None
+    try:
+        location = results[0]["geometry"]["location"]
+        return status, (float(location["lat"]), float(location["lng"]))
+    except (KeyError, IndexError, TypeError) as exc:
+        raise ValueError(f"malformed result: {exc!r}") from exc
+
+
+class GeocodingClient:
+    def __init__(self, api_key, connect_timeout=3.05, read_timeout=5.0, max_retries=2,
+                 backoff_factor=0.5, pool_size=10, breaker=None, session=None):
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+
+        if session is None:
+            session = requests.Session()
+            retry = Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+            session.mount("https://", adapter)
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "ok": 0, "zero_results": 0, "errors": 0, "timeouts": 0,
+            "short_circuited": 0, "latency_ms_total": 0.0, "latency_ms_max": 0.0,
+        }
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                self._stats[name] += value
+
+    def stats(self):
+        """Counters since process start plus the breaker state and mean latency."""
+        with self._lock:
+            stats = dict(self._stats)
+        answered = stats["ok"] + stats["zero_results"] + stats["errors"]
+        stats["latency_ms_avg"] = round(stats["latency_ms_total"] / answered, 1) if answered else 0.0
+        stats["breaker"] = self.breaker.state
+        return stats
+
+    def _query(self, address):
+        """One API call: (lat, lng), (None, None) for ZERO_RESULTS, or raise."""
+        if not self.breaker.allow():
+            self._count(short_circuited=1)
+            raise CircuitOpenError("Geocoding provider temporarily disabled after repeated failures")
+
+        self._count(requests=1)
+        started = time.monotonic()
+        try:
+            resp = self.session.get(
+                GEOCODE_URL,
+                params={"address": address, "key": self.api_key},
+                timeout=self.timeout,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            status, location = _parse_body(data)
+        except requests.Timeout as exc:
+            self._count(timeouts=1, errors=1)
+            self.breaker.record_failure()
+            raise GeocodingError(f"Geocoding request timed out: {exc}") from exc
+        except (requests.RequestException, ValueError) as exc:
+            self._count(errors=1)
+            self.breaker.record_failure()
+            raise GeocodingError(f"Geocoding request failed: {exc}") from exc
+        finally:
+            elapsed = (time.monotonic() - started) * 1000
+            with self._lock:
+                self._stats["latency_ms_total"] += elapsed
+                self._stats["latency_ms_max"] = max(self._stats["latency_ms_max"], elapsed)
+
+        if location is not None:
+            self._count(ok=1)
+            self.breaker.record_success()
+            return location
+        if status in ("ZERO_RESULTS", "OK"):
+            self._count(zero_results=1)
+            self.breaker.record_success()
+            return None, None
+
+        # OVER_QUERY_LIMIT, REQUEST_DENIED, UNKNOWN_ERROR, ...
+        self._count(errors=1)
+        self.breaker.record_failure()
+        raise GeocodingError(f"Geocoding API returned {status}: {data.get('error_message', '')}")
+
+    def geocode(self, address):
+        """
+        Convert a human‑readable address into latitude/longitude, with a
+        **fallback** strategy for tricky/ambiguous addresses.
+
+        Strategy:
+        1) Try the full address as-is.
+        2) If that finds nothing, retry with a **simplified** query composed
+           of the last two comma-separated parts (e.g., "City, State"),
+           which often succeeds when street-level data is incomplete or
+           uses abbreviations like "Rd" vs "Road".
+        Both queries go through the same pooled session and breaker.
+        """
+        lat, lng = self._query(address.strip())
+        if lat is not None:
+            return lat, lng
+
+        # Example: "4 Birch Rd, New Milford, CT, 06776, USA" -> "New Milford, CT"
+        parts = [p.strip() for p in address.split(",") if p.strip()]
+        if len(parts) >= 2:
+            return self._query(", ".join(parts[-2:]))
+        return None, None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client, configured from settings.GEOCODING_*."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeocodingClient(
+                    api_key=settings.GOOGLE_MAPS_API_KEY,
+                    connect_timeout=getattr(settings, "GEOCODING_CONNECT_TIMEOUT", 3.05),
+                    read_timeout=getattr(settings, "GEOCODING_READ_TIMEOUT", 5.0),
+                    max_retries=getattr(settings, "GEOCODING_MAX_RETRIES", 2),
+                    backoff_factor=getattr(settings, "GEOCODING_RETRY_BACKOFF", 0.5),
+                    pool_size=getattr(settings, "GEOCODING_POOL_SIZE", 10),
+                    breaker=CircuitBreaker(
+                        failure_threshold=getattr(settings, "GEOCODING_BREAKER_THRESHOLD", 5),
+                        reset_timeout=getattr(settings, "GEOCODING_BREAKER_RESET", 60.0),
+                    ),
+                )
+    return _client
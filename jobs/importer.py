@@ -0,0 +1,216 @@
+# jobs/importer.py
+"""
+Bulk job import from CSV or JSONL (`manage.py import_jobs`, and the
+recruiter upload page at jobs:import).
+
+Posting jobs one at a time runs Job.save() and its signals per row: an
+INSERT, the search index, map cells, skills, recommendations... Here
+the file streams through a generator pipeline instead:
+
+1. `read_rows()` parses the file a row at a time (csv.DictReader, or one
+   JSON object per line),
+2. `build_jobs()` validates each row with JobForm (column names are its
+   field names) and derives the location fields like Job.save() does;
+   bad rows are reported by line number and skipped,
+3. `chunked()` groups the jobs, and per chunk:
+   - the chunk's *distinct* addresses not seen earlier in the file are
+     geocoded: gazetteer and cache first, the rest concurrently on a
+     bounded thread pool (`resolve_addresses`, jobs/geocoding.py);
+     addresses whose lookup errored stay "pending" for the background
+     worker (`manage.py geocode_jobs`),
+   - the jobs are inserted with one bulk_create, and what the Job signals
+     would have done is done once for the chunk: search index, skill
+     links, map cells, recruiter pins, "nearby" recommendations,
+     notification fan-outs, the job index and the cached-pages version.
+
+Only the current chunk is held in memory, whatever the file size.
+"""
+import csv
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.db import transaction
+
+from messaging.fanout import queue_many_job_notifications
+
+from .forms import JobForm
+from .geo import encode_geohash
+from .geocoding import google_geocode, resolve_addresses
+from .job_index import refresh_job
+from .map_clusters import add_points, map_point
+from .models import Job
+from .recommendations import add_nearby_jobs
+from .recruiter_pins import invalidate_recruiter_pins
+from .response_cache import bump_jobs_version
+from .search import index_jobs_by_id
+from .skills import Vocabulary, link_new_jobs
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 100
+
+# Rows may leave these out
+DEFAULTS = {
+    "employment_type": Job.FULL_TIME,
+    "remote": False,
+    "visa_sponsorship": False,
+    "is_active": True,
+}
+BOOLEAN_FIELDS = ("remote", "visa_sponsorship", "is_active")
+FALSE_WORDS = {"0", "false", "no", "n", "off"}
+
+
+class JobImportError(ValueError):
+    """The file as a whole can't be imported (unknown format, no header...)."""
+
+
+def format_for(filename):
+    """'openings.CSV' -> 'csv', 'feed.ndjson' -> 'jsonl'; None if unknown."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(extension)
+
+
+def _reject(stats, line, message):
+    stats["invalid"] += 1
+    if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+        stats["errors"].append((line, message))
+
+
+# ==============================
+# Pipeline stages
+# ==============================
+def read_rows(stream, fmt, stats):
+    """Yield (line number, {column: value}) for each row of a text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if not reader.fieldnames:
+            raise JobImportError("The CSV file has no header row.")
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+        for row in reader:
+            stats["rows"] += 1
+            yield reader.line_num, {k: (v or "").strip() for k, v in row.items() if k}
+    elif fmt == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            stats["rows"] += 1
+            try:
+                row = json.loads(text)
+            except ValueError as exc:
+                _reject(stats, line, f"Invalid JSON: {exc}")
+                continue
+            if not isinstance(row, dict):
+                _reject(stats, line, "Expected a JSON object.")
+                continue
+            yield line, row
+    else:
+        raise JobImportError(f"Unknown format {fmt!r} (expected one of: {', '.join(FORMATS)}).")
+
+
+def build_jobs(rows, recruiter, stats):
+    """Yield an unsaved, validated Job for each good row."""
+    for line, row in rows:
+        data = {**DEFAULTS, **{k: v for k, v in row.items() if v not in ("", None)}}
+        for field in BOOLEAN_FIELDS:
+            if isinstance(data[field], str):
+                data[field] = data[field].lower() not in FALSE_WORDS
+        form = JobForm(data=data)
+        if not form.is_valid():
+            _reject(stats, line, "; ".join(
+                f"{field}: {' '.join(messages)}" for field, messages in form.errors.items()
+            ))
+            continue
+        job = form.save(commit=False)
+        job.recruiter = recruiter
+        job.normalize_location()
+        yield job
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def geocode_chunk(jobs, resolved, geocoder, pool, stats):
+    """
+    Set the coordinates of `jobs` from `resolved` ({address: (lat, lng),
+    or None for "lookup errored"}), geocoding the addresses it doesn't
+    have yet first.
+    """
+    new = {job.location for job in jobs if job.location and job.location not in resolved}
+    if new:
+        stats["addresses"] += len(new)
+        results = resolve_addresses(new, geocoder, pool, stats)
+        for address in new:
+            resolved[address] = results.get(address)
+
+    for job in jobs:
+        if job.geocode_status != Job.GEOCODE_PENDING:
+            continue
+        result = resolved.get(job.location)
+        if result is None:
+            stats["pending"] += 1
+        elif result[0] is None or result[1] is None:
+            job.geocode_status = Job.GEOCODE_FAILED
+            stats["failed"] += 1
+        else:
+            job.latitude, job.longitude = result
+            job.geohash = encode_geohash(*result)
+            job.geocode_status = Job.GEOCODE_OK
+            stats["geocoded"] += 1
+
+
+def insert_chunk(jobs, vocabulary):
+    """bulk_create `jobs`, then bring every structure the Job signals maintain up to date."""
+    with transaction.atomic():
+        Job.objects.bulk_create(jobs)
+        index_jobs_by_id([job.pk for job in jobs])
+        link_new_jobs(jobs, vocabulary)
+        points = [(job.pk, map_point(job)) for job in jobs]
+        add_points([point for _, point in points if point is not None])
+        queue_many_job_notifications(jobs)
+
+    add_nearby_jobs({job_id: point for job_id, point in points if point is not None})
+    bump_jobs_version()
+    for job in jobs:
+        refresh_job(job)   # after the bump, which the index adopts
+    for recruiter_id in {job.recruiter_id for job in jobs}:
+        invalidate_recruiter_pins(recruiter_id)
+
+
+# ==============================
+# Entry point
+# ==============================
+def import_jobs(stream, recruiter, fmt="csv", chunk_size=500, workers=4, geocoder=None, progress=None):
+    """
+    Import every valid row of `stream` (text) as a job posted by
+    `recruiter`. Returns counters:
+    {"rows", "created", "invalid", "addresses", "geocoded", "failed", "pending",
+     "offline", "cached", "api_calls", "seconds", "rows_per_second", "errors"}
+    where "errors" lists the first MAX_REPORTED_ERRORS (line, message)
+    pairs. `geocoder` is the uncached provider (defaults to
+    google_geocode); `progress(stats)` is called after every chunk.
+    """
+    if fmt not in FORMATS:
+        raise JobImportError(f"Unknown format {fmt!r} (expected one of: {', '.join(FORMATS)}).")
+    geocoder = geocoder or google_geocode
+    stats = {"rows": 0, "created": 0, "invalid": 0, "addresses": 0, "geocoded": 0, "failed": 0,
+             "pending": 0, "offline": 0, "cached": 0, "api_calls": 0, "errors": []}
+    started = time.monotonic()
+    vocabulary = Vocabulary(preload=True)
+    resolved = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = build_jobs(read_rows(stream, fmt, stats), recruiter, stats)
+        for chunk in chunked(jobs, chunk_size):
+            geocode_chunk(chunk, resolved, geocoder, pool, stats)
+            insert_chunk(chunk, vocabulary)
+            stats["created"] += len(chunk)
+            if progress:
+                progress(stats)
+
+    stats["seconds"] = round(time.monotonic() - started, 3)
+    stats["rows_per_second"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
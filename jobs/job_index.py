@@ -0,0 +1,384 @@
+# jobs/job_index.py
+"""
+Optional in-process, columnar index of jobs for job_list.
+
+Every job is a row position; rows are kept sorted by (created_at, id) so
+"newest first" is simply "highest position first". Per row we keep compact
+`array` columns (id, created_at in microseconds, salary bounds, lat/lng —
+8 bytes each, NaN for NULL) and, per filterable value, a bitset (a Python
+int, bit i = row i): active, remote, visa, one per employment type.
+
+Range filters (salary_min -> max_salary >= x, salary_max -> min_salary <= x)
+use binned bitsets: each range column is cut into BINS quantile bins, and
+`>= x` is the OR of the bins above x's bin, plus x's own bin whose rows are
+checked exactly against the column while the page is read.
+
+So any filter combination is a handful of big-int AND/ORs (C loops over
+machine words, microseconds at 100k jobs); the database is only asked to
+hydrate the 20 jobs on screen. Searches (title/skills) still go to the
+full-text index — `supports()` says which filter sets this can answer.
+
+The index lives in one process and remembers the shared jobs version
+(jobs/response_cache.py) it was built at. Changes made in this process are
+applied in place by the post_save/post_delete hooks, which then adopt the
+version their own bump produced; any other bump (another web worker, the
+geocoding worker, the importer) leaves the index behind the shared version
+and it is rebuilt on next use. It is also rebuilt when a change can't be
+applied in place, and after JOB_INDEX_MAX_AGE seconds as a safety net for
+writes that don't bump the version. Enable with JOB_INDEX_ENABLED.
+"""
+import math
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+
+from .models import Job
+from .pagination import JOB_LIST_ORDERING, InvalidCursor, decode_cursor, encode_cursor
+from .response_cache import jobs_version
+
+BINS = 32
+NAN = float("nan")
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Filters (see jobs/facets.normalize_filters) this index can evaluate
+SUPPORTED_FILTERS = {"employment_type", "remote", "visa", "salary_min", "salary_max"}
+# filter -> (range column, ">=" or "<=")
+RANGE_FILTERS = {
+    "salary_min": ("max_salary", ">="),
+    "salary_max": ("min_salary", "<="),
+}
+RANGE_COLUMNS = ("min_salary", "max_salary", "latitude", "longitude")
+
+_FIELDS = ("id", "created_at", "is_active", "remote", "visa_sponsorship", "employment_type",
+           "min_salary", "max_salary", "latitude", "longitude")
+
+
+def _micros(dt):
+    return (dt - EPOCH) // ONE_MICROSECOND
+
+
+def _float(value):
+    return NAN if value is None else float(value)
+
+
+def _bit_positions(bits):
+    """Positions of the set bits, highest first."""
+    while bits:
+        pos = bits.bit_length() - 1
+        bits ^= 1 << pos
+        yield pos
+
+
+class RangeBins:
+    """Quantile-binned bitsets for one float column."""
+
+    def __init__(self, values, bins=BINS):
+        present = sorted(v for v in values if not math.isnan(v))
+        if present:
+            step = max(1, len(present) // bins)
+            self.edges = sorted(set(present[::step]))
+        else:
+            self.edges = [0.0]
+        self.bits = [0] * len(self.edges)
+        for pos, value in enumerate(values):
+            self.add(pos, value)
+
+    def _bin(self, value):
+        return max(0, bisect_right(self.edges, value) - 1)
+
+    def add(self, pos, value):
+        if not math.isnan(value):
+            self.bits[self._bin(value)] |= 1 << pos
+
+    def discard(self, pos, value):
+        if not math.isnan(value):
+            self.bits[self._bin(value)] &= ~(1 << pos)
+
+    def select(self, op, value):
+        """
+        (sure, maybe): rows certainly matching `column op value`, and rows
+        in the boundary bin that must be checked against the column.
+        """
+        b = self._bin(value)
+        sure = 0
+        if op == ">=":
+            for bits in self.bits[b + 1:]:
+                sure |= bits
+        else:
+            for bits in self.bits[:b]:
+                sure |= bits
+        return sure, self.bits[b]
+
+    def nbytes(self):
+        return sum(sys.getsizeof(bits) for bits in self.bits) + sys.getsizeof(self.edges) + 24 * len(self.edges)
+
+
+class JobIndex:
+    def __init__(self, rows, bins=BINS, version=None):
+        """`rows`: value tuples in _FIELDS order, sorted by (created_at, id); `version`: the jobs version they reflect."""
+        self.lock = threading.RLock()
+        self.built_at = time.monotonic()
+        self.version = version
+        self.stale = False
+
+        self.ids = array("q")
+        self.created = array("q")
+        self.columns = {name: array("d") for name in RANGE_COLUMNS}
+        self.active = self.remote = self.visa = 0
+        self.employment_type = {code: 0 for code, _ in Job.EMPLOYMENT_TYPES}
+        self._positions = None  # id -> position, only when ids aren't ascending
+
+        for pos, row in enumerate(rows):
+            (job_id, created_at, is_active, remote, visa, etype,
+             min_salary, max_salary, lat, lng) = row
+            self.ids.append(job_id)
+            self.created.append(_micros(created_at))
+            for name, value in zip(RANGE_COLUMNS, (min_salary, max_salary, lat, lng)):
+                self.columns[name].append(_float(value))
+            self._set_flags(pos, is_active, remote, visa, etype)
+
+        self.ids_ascending = all(a < b for a, b in zip(self.ids, self.ids[1:]))
+        self.ranges = {name: RangeBins(self.columns[name], bins) for name in RANGE_COLUMNS}
+
+    @classmethod
+    def build(cls, bins=BINS):
+        # Read the version first: a write that lands during the build bumps past it
+        version = jobs_version()
+        rows = Job.objects.order_by("created_at", "id").values_list(*_FIELDS)
+        return cls(rows.iterator(chunk_size=5000), bins=bins, version=version)
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------
+    # Row positions / bits
+    # ------------------------------
+    def _set_flags(self, pos, is_active, remote, visa, etype):
+        bit = 1 << pos
+        if is_active:
+            self.active |= bit
+        if remote:
+            self.remote |= bit
+        if visa:
+            self.visa |= bit
+        if etype in self.employment_type:
+            self.employment_type[etype] |= bit
+
+    def _clear_flags(self, pos):
+        mask = ~(1 << pos)
+        self.active &= mask
+        self.remote &= mask
+        self.visa &= mask
+        for code in self.employment_type:
+            self.employment_type[code] &= mask
+
+    def position(self, job_id):
+        if self.ids_ascending:
+            pos = bisect_left(self.ids, job_id)
+            return pos if pos < len(self.ids) and self.ids[pos] == job_id else None
+        if self._positions is None:
+            self._positions = {job_id: pos for pos, job_id in enumerate(self.ids)}
+        return self._positions.get(job_id)
+
+    # ------------------------------
+    # Incremental updates (signals)
+    # ------------------------------
+    def upsert(self, job):
+        with self.lock:
+            pos = self.position(job.id)
+            if pos is None:
+                created = _micros(job.created_at)
+                if self.ids and (created, job.id) < (self.created[-1], self.ids[-1]):
+                    self.stale = True  # would break the sort order: rebuild on next use
+                    return
+                pos = len(self.ids)
+                self.ids.append(job.id)
+                self.created.append(created)
+                for name in RANGE_COLUMNS:
+                    self.columns[name].append(NAN)
+                if self._positions is not None:
+                    self._positions[job.id] = pos
+            else:
+                self._clear_flags(pos)
+                for name in RANGE_COLUMNS:
+                    self.ranges[name].discard(pos, self.columns[name][pos])
+
+            self._set_flags(pos, job.is_active, job.remote, job.visa_sponsorship, job.employment_type)
+            for name in RANGE_COLUMNS:
+                value = _float(getattr(job, name))
+                self.columns[name][pos] = value
+                self.ranges[name].add(pos, value)
+
+    def remove(self, job_id):
+        """Deleted rows just lose their bits; the next rebuild drops them."""
+        with self.lock:
+            pos = self.position(job_id)
+            if pos is not None:
+                self._clear_flags(pos)
+                for name in RANGE_COLUMNS:
+                    self.ranges[name].discard(pos, self.columns[name][pos])
+                    self.columns[name][pos] = NAN
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+    @staticmethod
+    def supports(filters):
+        return set(filters) <= SUPPORTED_FILTERS
+
+    def match(self, filters):
+        """(bits, checks) for active jobs matching `filters`; `checks` are exact range tests."""
+        bits = self.active
+        if "employment_type" in filters:
+            bits &= self.employment_type.get(filters["employment_type"], 0)
+        if "remote" in filters:
+            bits &= self.remote if filters["remote"] else ~self.remote
+        if "visa" in filters:
+            bits &= self.visa if filters["visa"] else ~self.visa
+
+        checks = []
+        for name, (column, op) in RANGE_FILTERS.items():
+            if name in filters:
+                value = float(filters[name])
+                sure, maybe = self.ranges[column].select(op, value)
+                bits &= sure | maybe
+                checks.append((self.columns[column], op, value))
+        return bits, checks
+
+    def _cursor_position(self, cursor):
+        """Number of rows sorting before the cursor's (created_at, id)."""
+        created_at, job_id = decode_cursor(cursor, JOB_LIST_ORDERING)
+        try:
+            created = _micros(Job._meta.get_field("created_at").to_python(created_at))
+            job_id = int(job_id)
+        except Exception as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+        lo = bisect_left(self.created, created)
+        hi = bisect_right(self.created, created, lo)
+        return lo + bisect_left(self.ids[lo:hi], job_id)
+
+    def page_ids(self, filters, cursor=None, exclude_ids=(), size=20):
+        """Ids of up to `size + 1` matching jobs, newest first, after `cursor`."""
+        with self.lock:
+            bits, checks = self.match(filters)
+            if cursor:
+                bits &= (1 << self._cursor_position(cursor)) - 1
+            for job_id in exclude_ids:
+                pos = self.position(job_id)
+                if pos is not None:
+                    bits &= ~(1 << pos)
+
+            ids = []
+            for pos in _bit_positions(bits):
+                if all(col[pos] >= v if op == ">=" else col[pos] <= v for col, op, v in checks):
+                    ids.append(self.ids[pos])
+                    if len(ids) > size:
+                        break
+            return ids
+
+    def page(self, filters, cursor=None, exclude_ids=(), size=20):
+        """Same contract as pagination.keyset_page over JOB_LIST_ORDERING: (jobs, next_cursor)."""
+        ids = self.page_ids(filters, cursor=cursor, exclude_ids=exclude_ids, size=size)
+        by_id = Job.objects.in_bulk(ids[:size])
+        jobs = [by_id[job_id] for job_id in ids[:size] if job_id in by_id]
+        next_cursor = None
+        if len(ids) > size and jobs:
+            last = jobs[-1]
+            next_cursor = encode_cursor([last.created_at.isoformat(), last.id])
+        return jobs, next_cursor
+
+    def nbytes(self):
+        """Approximate memory held by the index."""
+        total = sum(a.buffer_info()[1] * a.itemsize for a in (self.ids, self.created, *self.columns.values()))
+        total += sum(sys.getsizeof(b) for b in (self.active, self.remote, self.visa, *self.employment_type.values()))
+        total += sum(r.nbytes() for r in self.ranges.values())
+        if self._positions is not None:
+            total += sys.getsizeof(self._positions) + 32 * len(self._positions)
+        return total
+
+
+# ==============================
+# Process-wide instance
+# ==============================
+_index = None
+_index_lock = threading.Lock()
+
+
+def enabled():
+    return getattr(settings, "JOB_INDEX_ENABLED", False)
+
+
+def _outdated(index, max_age):
+    return (index is None or index.stale or index.version != jobs_version()
+            or time.monotonic() - index.built_at > max_age)
+
+
+def get_job_index():
+    """
+    The process's JobIndex (built on first use, rebuilt when stale or behind
+    the shared jobs version), or None when disabled.
+    """
+    global _index
+    if not enabled():
+        return None
+    max_age = getattr(settings, "JOB_INDEX_MAX_AGE", 300)
+    index = _index
+    if _outdated(index, max_age):
+        with _index_lock:
+            index = _index
+            if _outdated(index, max_age):
+                index = _index = JobIndex.build()
+    return index
+
+
+def reset_job_index():
+    global _index
+    _index = None
+
+
+def _adopt_own_bump(index):
+    """
+    Called right after a change was applied in place, and after the caller
+    bumped the jobs version for it: if that bump is the only one since the
+    index's version, the index is current at the new version. Any other
+    bump in between leaves it behind, to be rebuilt.
+    """
+    with index.lock:
+        if index.version is not None and jobs_version() == index.version + 1:
+            index.version += 1
+
+
+def refresh_job(job):
+    """post_save hook (runs after the version bump): apply the change to an already-built index."""
+    index = _index
+    if index is not None:
+        index.upsert(job)
+        _adopt_own_bump(index)
+
+
+def refresh_job_id(job_id):
+    """
+    For writes that skip post_save (`.update()`, e.g. the geocoding worker),
+    after bumping the jobs version: reload the row. Other processes pick the
+    write up from the bump.
+    """
+    index = _index
+    if index is not None:
+        job = Job.objects.filter(pk=job_id).first()
+        if job is not None:
+            index.upsert(job)
+            _adopt_own_bump(index)
+
+
+def forget_job(job_id):
+    """post_delete hook (runs after the version bump)."""
+    index = _index
+    if index is not None:
+        index.remove(job_id)
+        _adopt_own_bump(index)
@@ -0,0 +1,238 @@
+# jobs/kanban.py
+"""
+Data for the recruiter's applicant Kanban (accounts.views
+recruiter_applicants_kanban / applicant_kanban_api).
+
+The board never loads a whole pipeline: the column headers come from one
+grouped COUNT over the recruiter's applications (`column_counts()`), and
+each column's cards are keyset pages (jobs/pagination.py), newest
+application first, fetched as the column is scrolled (`column_page()`).
+The first render costs the same for 10 applicants or 10,000.
+
+Moves go through `move_applications()`, a whole multi-select drag in one
+request: one query checks ownership and reads the cards' current state,
+then one conditional UPDATE per kind of move, all in one transaction
+together with the status history (jobs/funnel.py) and the per-job
+counters (jobs/application_counts.py).
+Each change names the state the board showed ("expected_status" /
+"expected_final_decision"); if any card changed since (another tab,
+another recruiter), nothing is written and the conflicts are returned
+(optimistic concurrency).
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.urls import reverse
+from django.utils import timezone
+
+from .application_counts import count_moves
+from .funnel import Transition, record_transitions
+from .models import Application, ApplicationStatusEvent
+from .pagination import keyset_page
+
+# (status, column title), left to right
+COLUMNS = (
+    ("applied", "Backlog"),
+    ("review", "In Review"),
+    ("closed", "Closed"),
+)
+COLUMN_STATUSES = tuple(status for status, _ in COLUMNS)
+FINAL_DECISIONS = ("hired", "rejected")
+STATE_FIELDS = ("status", "final_decision")
+CHUNK_SIZE = 500   # ids per IN (...) list
+
+# Newest application first; `id` breaks ties
+KANBAN_ORDERING = ("-applied_at", "-id")
+
+
+def page_size():
+    return getattr(settings, "APPLICANT_KANBAN_PAGE_SIZE", 20)
+
+
+def recruiter_applications(recruiter_id):
+    return Application.objects.filter(job__recruiter_id=recruiter_id)
+
+
+def column_counts(recruiter_id):
+    """{status: applications} for every column, in one GROUP BY query."""
+    counts = dict.fromkeys(COLUMN_STATUSES, 0)
+    rows = (
+        recruiter_applications(recruiter_id)
+        .filter(status__in=COLUMN_STATUSES)
+        .values_list("status")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    counts.update(rows)
+    return counts
+
+
+def column_page(recruiter_id, status, cursor=None, size=None):
+    """
+    One page of a column's cards: (applications, next_cursor). Applicant,
+    job and profile come in the same query. Raises InvalidCursor.
+    """
+    queryset = (
+        recruiter_applications(recruiter_id)
+        .filter(status=status)
+        .select_related("applicant", "applicant__jobseeker", "job")
+    )
+    return keyset_page(queryset, KANBAN_ORDERING, cursor, size or page_size())
+
+
+def card(application):
+    """JSON for one card, as rendered by the board's script."""
+    applicant = application.applicant
+    profile = getattr(applicant, "jobseeker", None)
+    return {
+        "id": application.id,
+        "status": application.status,
+        "final_decision": application.final_decision,
+        "applicant": applicant.username,
+        "name": profile.full_name if profile else "",
+        "headline": profile.headline if profile else "",
+        "job": application.job.title,
+        "applied_at": application.applied_at.isoformat(),
+        "profileUrl": reverse("candidate_profile", args=[applicant.id]),
+    }
+
+
+def board(recruiter_id):
+    """The columns with their counts and first page of cards, for the initial render."""
+    counts = column_counts(recruiter_id)
+    columns = []
+    for status, title in COLUMNS:
+        applications, next_cursor = column_page(recruiter_id, status) if counts[status] else ([], None)
+        columns.append({
+            "status": status,
+            "title": title,
+            "count": counts[status],
+            "applications": applications,
+            "next_cursor": next_cursor,
+        })
+    return columns
+
+
+# ==============================
+# Batch moves
+# ==============================
+class InvalidMove(ValueError):
+    """A malformed change, or an application that isn't the recruiter's."""
+
+
+class MoveConflict(Exception):
+    """Some cards changed since the board was loaded; `current` is their state now."""
+
+    def __init__(self, current):
+        super().__init__(f"{len(current)} application(s) changed meanwhile")
+        self.current = current   # [{"id", "status", "final_decision"}, ...]
+
+
+def _parse_change(change):
+    if not isinstance(change, dict) or not isinstance(change.get("id"), int):
+        raise InvalidMove("Each change needs an integer id.")
+    status = change.get("status")
+    decision = change.get("final_decision")
+    if status is None and decision is None:
+        raise InvalidMove(f"Change for {change['id']} sets neither status nor final_decision.")
+    if status is not None and status not in COLUMN_STATUSES:
+        raise InvalidMove(f"Invalid status {status!r}.")
+    if decision is not None and decision not in FINAL_DECISIONS:
+        raise InvalidMove(f"Invalid final_decision {decision!r}.")
+    return (
+        change["id"],
+        (status, decision),
+        (change.get("expected_status"), change.get("expected_final_decision")),
+    )
+
+
+def _current_states(recruiter_id, ids):
+    """{id: (status, final_decision, status_changed_at, job_id)} of the recruiter's applications among `ids`."""
+    states = {}
+    for start in range(0, len(ids), CHUNK_SIZE):
+        states.update(
+            (app_id, rest)
+            for app_id, *rest in recruiter_applications(recruiter_id)
+            .filter(id__in=ids[start:start + CHUNK_SIZE])
+            .values_list("id", "status", "final_decision", "status_changed_at", "job_id")
+            .order_by()
+        )
+    return states
+
+
+def _apply_moves(groups, now):
+    """
+    One conditional UPDATE per (new state, expected state) group. Returns
+    the ids of the first chunk that didn't fully apply (a card changed
+    between our read and this write), else [].
+    """
+    for (new, expected), group_ids in groups.items():
+        fields = {name: value for name, value in zip(STATE_FIELDS, new) if value is not None}
+        guard = {name: value for name, value in zip(STATE_FIELDS, expected) if value is not None}
+        if "status" in fields:
+            fields["status_changed_at"] = now
+        for start in range(0, len(group_ids), CHUNK_SIZE):
+            chunk = group_ids[start:start + CHUNK_SIZE]
+            if Application.objects.filter(id__in=chunk, **guard).update(**fields) < len(chunk):
+                return chunk
+    return []
+
+
+def move_applications(recruiter_id, changes):
+    """
+    Apply a batch of Kanban changes ([{"id", "status"?, "final_decision"?,
+    "expected_status"?, "expected_final_decision"?}, ...]) all or nothing,
+    logging them to the status history (jobs/funnel.py) and the Job
+    counters (jobs/application_counts.py). Returns the number of
+    applications changed; raises InvalidMove or MoveConflict.
+    """
+    parsed = [_parse_change(change) for change in changes]
+    ids = [app_id for app_id, _, _ in parsed]
+    if len(set(ids)) != len(ids):
+        raise InvalidMove("An application appears twice in the batch.")
+
+    now = timezone.now()
+    with transaction.atomic():
+        states = _current_states(recruiter_id, ids)
+        if len(states) < len(ids):
+            raise InvalidMove("Unknown application, or not one of your applicants.")
+        stale = [
+            app_id for app_id, _, expected in parsed
+            if any(want is not None and want != have for want, have in zip(expected, states[app_id]))
+        ]
+
+        groups = defaultdict(list)   # (new state, expected state) -> ids
+        transitions = []
+        moves = []                   # (job_id, old state, new state), for the Job counters
+        for app_id, new, expected in parsed:
+            # Only what actually changes: dropping a card where it already is is a no-op
+            new = tuple(value if value != have else None for value, have in zip(new, states[app_id]))
+            if new == (None, None):
+                continue
+            groups[new, expected].append(app_id)
+            status, decision, since, job_id = states[app_id]
+            if new[0] is not None:
+                transitions.append(Transition(app_id, job_id, recruiter_id,
+                                              ApplicationStatusEvent.STATUS, status, new[0], since, now))
+            if new[1] is not None:
+                transitions.append(Transition(app_id, job_id, recruiter_id,
+                                              ApplicationStatusEvent.FINAL_DECISION, decision, new[1], None, now))
+            moves.append((job_id, (status, decision), (new[0] or status, new[1] or decision)))
+
+        if not stale:
+            stale = _apply_moves(groups, now)
+            if stale:
+                transaction.set_rollback(True)
+            else:
+                record_transitions(transitions)
+                count_moves(moves)
+
+    if stale:
+        current = _current_states(recruiter_id, stale)
+        raise MoveConflict([
+            {"id": app_id, "status": status, "final_decision": decision}
+            for app_id, (status, decision, _, _) in sorted(current.items())
+        ])
+    return sum(len(group_ids) for group_ids in groups.values())
@@ -0,0 +1,161 @@
+# jobs/locations.py
+"""
+Normalization of the free-text address fields shared by Job and
+JobSeekerProfile (city / state / zip_code / country).
+
+Recruiters and job seekers type "GA", "Georgia" or " georgia ", and
+"USA", "US" or "United States" — these helpers map all of them to one
+canonical lowercase form so lookups can use plain equality.
+"""
+import re
+
+# Country names/aliases -> ISO 3166-1 alpha-2 (lowercase)
+COUNTRY_ALIASES = {
+    "us": "us", "usa": "us", "u.s.": "us", "u.s.a.": "us", "united states": "us",
+    "united states of america": "us", "america": "us",
+    "ca": "ca", "can": "ca", "canada": "ca",
+    "mx": "mx", "mex": "mx", "mexico": "mx",
+    "gb": "gb", "uk": "gb", "u.k.": "gb", "united kingdom": "gb", "great britain": "gb",
+    "england": "gb", "scotland": "gb", "wales": "gb",
+    "ie": "ie", "ireland": "ie",
+    "fr": "fr", "france": "fr",
+    "de": "de", "germany": "de", "deutschland": "de",
+    "nl": "nl", "netherlands": "nl", "the netherlands": "nl", "holland": "nl",
+    "es": "es", "spain": "es",
+    "it": "it", "italy": "it",
+    "pt": "pt", "portugal": "pt",
+    "ch": "ch", "switzerland": "ch",
+    "se": "se", "sweden": "se",
+    "pl": "pl", "poland": "pl",
+    "in": "in", "ind": "in", "india": "in",
+    "cn": "cn", "china": "cn",
+    "jp": "jp", "japan": "jp",
+    "kr": "kr", "south korea": "kr", "korea": "kr",
+    "sg": "sg", "singapore": "sg",
+    "au": "au", "aus": "au", "australia": "au",
+    "nz": "nz", "new zealand": "nz",
+    "br": "br", "brazil": "br",
+    "ar": "ar", "argentina": "ar",
+    "il": "il", "israel": "il",
+    "ae": "ae", "uae": "ae", "united arab emirates": "ae",
+    "ng": "ng", "nigeria": "ng",
+    "za": "za", "south africa": "za",
+}
+
+# US states (+ DC, PR) -> USPS abbreviation (lowercase)
+US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "florida": "fl", "georgia": "ga",
+    "hawaii": "hi", "idaho": "id", "illinois": "il", "indiana": "in", "iowa": "ia",
+    "kansas": "ks", "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn", "mississippi": "ms",
+    "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv", "new hampshire": "nh",
+    "new jersey": "nj", "new mexico": "nm", "new york": "ny", "north carolina": "nc",
+    "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or", "pennsylvania": "pa",
+    "rhode island": "ri", "south carolina": "sc", "south dakota": "sd", "tennessee": "tn",
+    "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va", "washington": "wa",
+    "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+    "district of columbia": "dc", "washington dc": "dc", "washington d.c.": "dc",
+    "puerto rico": "pr",
+}
+US_STATE_CODES = set(US_STATES.values())
+
+ZIP_RE = re.compile(r"^\d{5}(?:-\d{4})?$")
+STATE_ZIP_RE = re.compile(r"^(?P<state>[A-Za-z .]+?)\s+(?P<zip>\d{5}(?:-\d{4})?)$")
+
+
+def _squash(value):
+    """Lowercase, trim and collapse inner whitespace."""
+    return " ".join((value or "").lower().split())
+
+
+def normalize_country(country):
+    """'USA' / 'United States' / 'us' -> 'us'; unknown names are just squashed."""
+    value = _squash(country)
+    return COUNTRY_ALIASES.get(value, value)
+
+
+def normalize_state(state, country=""):
+    """
+    'Georgia' / 'GA' -> 'ga' for US addresses (or when no country is given);
+    other countries' regions are just squashed.
+    """
+    value = _squash(state).rstrip(".")
+    if normalize_country(country) in ("", "us"):
+        if value in US_STATE_CODES:
+            return value
+        return US_STATES.get(value, value)
+    return value
+
+
+def normalize_city(city):
+    """'  St.  Louis ' -> 'saint louis'."""
+    value = _squash(city).replace(".", "")
+    value = re.sub(r"^(st|ste)\s", lambda m: "saint " if m.group(1) == "st" else "sainte ", value)
+    return value
+
+
+def normalize_zip(zip_code):
+    """Keep the 5-digit US ZIP ('30332-0001' -> '30332'); otherwise squash."""
+    value = _squash(zip_code).replace(" ", "")
+    if ZIP_RE.match(value):
+        return value[:5]
+    return value
+
+
+def is_us_state(value):
+    squashed = _squash(value).rstrip(".")
+    return squashed in US_STATE_CODES or squashed in US_STATES
+
+
+def parse_address(address):
+    """
+    Split a comma-separated address (the format Job.save builds for
+    `location`: "street, city, state, zip, country") into its parts.
+    Works from the right, so "Atlanta, GA" and "Atlanta, GA 30332, USA"
+    parse too. Returns a dict with street/city/state/zip_code/country.
+    """
+    parts = [p.strip() for p in (address or "").split(",") if p.strip()]
+    parsed = {"street": "", "city": "", "state": "", "zip_code": "", "country": ""}
+
+    # Country -- unless it's really a state code ("Los Angeles, CA", "Springfield, IL")
+    if parts and _squash(parts[-1]) in COUNTRY_ALIASES:
+        looks_like_state = len(parts) >= 2 and is_us_state(parts[-1]) and not is_us_state(parts[-2])
+        if not looks_like_state:
+            parsed["country"] = parts.pop()
+
+    # ZIP, alone or as "GA 30332"
+    if parts and ZIP_RE.match(parts[-1].replace(" ", "")):
+        parsed["zip_code"] = parts.pop()
+    elif parts:
+        m = STATE_ZIP_RE.match(parts[-1])
+        if m and is_us_state(m.group("state")):
+            parts.pop()
+            parsed["state"], parsed["zip_code"] = m.group("state"), m.group("zip")
+
+    # State / region
+    if not parsed["state"] and len(parts) >= 2:
+        is_us = normalize_country(parsed["country"]) in ("", "us")
+        last = parts[-1]
+        if (is_us and is_us_state(last)) or (not is_us and len(last) <= 3 and last.isalpha()):
+            parsed["state"] = parts.pop()
+
+    if parts:
+        parsed["city"] = parts.pop()
+    parsed["street"] = ", ".join(parts)
+    return parsed
+
+
+def location_key(city, state, country):
+    """
+    Canonical "country|state|city" key, e.g. ("Atlanta", "Georgia", "USA")
+    and (" atlanta", "GA", "United States") both -> "us|ga|atlanta".
+
+    Stored (indexed) on Job and JobSeekerProfile so "same city" matching is
+    a single equality lookup. Blank unless all three parts are present.
+    """
+    city = normalize_city(city)
+    country_code = normalize_country(country)
+    if not (city and country_code and _squash(state)):
+        return ""
+    return f"{country_code}|{normalize_state(state, country)}|{city}"
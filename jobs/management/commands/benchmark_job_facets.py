@@ -0,0 +1,114 @@
+"""
+Time job_list facet counts (jobs/facets.py): one COUNT query per facet
+option vs. the single conditional-aggregate query vs. a cache hit.
+
+    python manage.py benchmark_job_facets --sizes 10000,100000
+
+Synthetic jobs are inserted inside a transaction that is rolled back at the
+end, so the database is left untouched (but it is write-locked meanwhile,
+so don't point this at a live database).
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.facets import (
+    FACET_FILTERS, _facet_q, compute_facets, facet_options, job_facets, normalize_filters, text_matches,
+)
+from jobs.models import Job
+from jobs.search import rebuild_index
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "Backend Developer",
+          "Frontend Developer", "DevOps Engineer", "QA Analyst", "Nurse", "Accountant",
+          "Sales Associate", "Mechanical Engineer", "Teacher", "Graphic Designer"]
+
+# job_list GET parameters as a job seeker would submit them
+FILTER_SETS = [
+    {},
+    {"remote": "true"},
+    {"title": "engineer"},
+    {"title": "developer", "visa": "true", "salary_min": "100000"},
+    {"employment_type": "part_time", "remote": "false"},
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark job_list facet counts (per-option COUNTs vs. one aggregate vs. cache) on synthetic jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000",
+                            help="Comma-separated job counts to test.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per filter set.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        sizes = sorted(int(s) for s in opts["sizes"].split(",") if s.strip())
+        rng = random.Random(opts["seed"])
+        options = facet_options()
+
+        def per_option(filters):
+            # What the page would cost with one COUNT query per facet option
+            base = text_matches(filters).order_by()
+            for facet, value, _, _ in options:
+                base.filter(_facet_q(filters, exclude=facet) & FACET_FILTERS[facet](value)).count()
+
+        self.stdout.write(
+            f"{'jobs':>10} {'options':>8} {'per-option ms':>14} {'aggregate ms':>13} {'cached ms':>10} {'speedup':>8}"
+        )
+        with transaction.atomic():
+            User = get_user_model()
+            recruiter = User.objects.create(username="__bench_recruiter__", role="recruiter")
+            inserted = 0
+            for size in sizes:
+                inserted += self._insert_jobs(recruiter, size - inserted, rng)
+                rebuild_index()
+                parsed = [normalize_filters(params) for params in FILTER_SETS]
+
+                naive_ms = self._time(per_option, parsed, opts["repeat"])
+                aggregate_ms = self._time(compute_facets, parsed, opts["repeat"])
+                cache.clear()
+                cached_ms = self._time(job_facets, FILTER_SETS, opts["repeat"])
+
+                self.stdout.write(
+                    f"{size:>10} {len(options):>8} {naive_ms:>14.1f} {aggregate_ms:>13.1f} "
+                    f"{cached_ms:>10.2f} {naive_ms / aggregate_ms:>7.1f}x"
+                )
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+    def _time(self, run, filter_sets, repeat):
+        """Mean ms per filter set (after one warm-up pass)."""
+        for filters in filter_sets:
+            run(filters)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for filters in filter_sets:
+                run(filters)
+        return (time.perf_counter() - start) * 1000 / (repeat * len(filter_sets))
+
+    def _insert_jobs(self, recruiter, count, rng, batch_size=5000):
+        """bulk_create skips the post_save signals; the search index is rebuilt afterwards."""
+        created = 0
+        types = [code for code, _ in Job.EMPLOYMENT_TYPES]
+        while created < count:
+            batch = []
+            for _ in range(min(batch_size, count - created)):
+                max_salary = rng.choice([None, rng.randrange(30000, 250000, 1000)])
+                batch.append(Job(
+                    recruiter=recruiter,
+                    title=rng.choice(TITLES),
+                    description="synthetic",
+                    employment_type=rng.choice(types),
+                    remote=rng.random() < 0.3,
+                    visa_sponsorship=rng.random() < 0.2,
+                    max_salary=max_salary,
+                    min_salary=max_salary - 20000 if max_salary else None,
+                ))
+            Job.objects.bulk_create(batch)
+            created += len(batch)
+        return created
@@ -0,0 +1,114 @@
+"""
+Measure the in-memory job index (jobs/job_index.py): build time, memory
+footprint, and the time to pick one job_list page of ids for a filter set,
+against the same page from the database (keyset pagination).
+
+    python manage.py benchmark_job_index --sizes 10000,100000
+
+Synthetic jobs are inserted inside a transaction that is rolled back at the
+end, so the database is left untouched (but it is write-locked meanwhile,
+so don't point this at a live database).
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.facets import filtered_jobs, normalize_filters
+from jobs.job_index import JobIndex
+from jobs.models import Job
+from jobs.pagination import JOB_LIST_ORDERING, keyset_page
+
+# job_list GET parameters as a job seeker would submit them
+FILTER_SETS = [
+    {},
+    {"remote": "true"},
+    {"visa": "true", "employment_type": "contract"},
+    {"salary_min": "120000"},
+    {"remote": "false", "visa": "true", "salary_min": "80000", "salary_max": "150000"},
+    {"employment_type": "intern", "remote": "true", "visa": "true", "salary_min": "240000"},
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the in-memory job index (memory, filter latency) against database keyset pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000",
+                            help="Comma-separated job counts to test.")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per filter set.")
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        sizes = sorted(int(s) for s in opts["sizes"].split(",") if s.strip())
+        rng = random.Random(opts["seed"])
+        size = opts["page_size"]
+        parsed = [normalize_filters(params) for params in FILTER_SETS]
+
+        self.stdout.write(
+            f"{'jobs':>10} {'build s':>8} {'MB':>7} {'MB/100k':>8} {'index µs':>9} {'db ms':>7} {'speedup':>8}"
+        )
+        with transaction.atomic():
+            User = get_user_model()
+            recruiter = User.objects.create(username="__bench_recruiter__", role="recruiter")
+            inserted = 0
+            for total in sizes:
+                inserted += self._insert_jobs(recruiter, total - inserted, rng)
+
+                start = time.perf_counter()
+                index = JobIndex.build()
+                build_s = time.perf_counter() - start
+                mb = index.nbytes() / 1e6
+
+                for filters in parsed:   # the two paths must agree
+                    expected = [j.id for j in keyset_page(filtered_jobs(filters), JOB_LIST_ORDERING, size=size)[0]]
+                    if index.page_ids(filters, size=size)[:size] != expected:
+                        self.stderr.write(f"  index and database disagree for {filters}")
+
+                index_ms = self._time(lambda f: index.page_ids(f, size=size), parsed, opts["repeat"])
+                db_ms = self._time(
+                    lambda f: list(keyset_page(filtered_jobs(f), JOB_LIST_ORDERING, size=size)[0]),
+                    parsed, max(1, opts["repeat"] // 5))
+
+                self.stdout.write(
+                    f"{total:>10} {build_s:>8.2f} {mb:>7.2f} {mb * 100000 / len(index):>8.2f} "
+                    f"{index_ms * 1000:>9.0f} {db_ms:>7.1f} {db_ms / index_ms:>7.0f}x"
+                )
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+    def _time(self, run, filter_sets, repeat):
+        """Mean ms per filter set (after one warm-up pass)."""
+        for filters in filter_sets:
+            run(filters)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for filters in filter_sets:
+                run(filters)
+        return (time.perf_counter() - start) * 1000 / (repeat * len(filter_sets))
+
+    def _insert_jobs(self, recruiter, count, rng, batch_size=5000):
+        created = 0
+        types = [code for code, _ in Job.EMPLOYMENT_TYPES]
+        while created < count:
+            batch = []
+            for _ in range(min(batch_size, count - created)):
+                max_salary = rng.choice([None, rng.randrange(30000, 250000, 1000)])
+                batch.append(Job(
+                    recruiter=recruiter,
+                    title="Synthetic job",
+                    description="synthetic",
+                    employment_type=rng.choice(types),
+                    remote=rng.random() < 0.3,
+                    visa_sponsorship=rng.random() < 0.2,
+                    max_salary=max_salary,
+                    min_salary=max_salary - 20000 if max_salary else None,
+                    is_active=rng.random() < 0.95,
+                ))
+            Job.objects.bulk_create(batch)
+            created += len(batch)
+        return created
@@ -0,0 +1,112 @@
+"""
+Compare job_list's title/skills search through the FTS5 index
+(Job.objects.search) against the old `icontains` filters.
+
+    python manage.py benchmark_job_search --sizes 10000,100000
+
+Synthetic jobs are inserted inside a transaction that is rolled back at the
+end, so the database is left untouched (but it is write-locked meanwhile,
+so don't point this at a live database).
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import Job
+from jobs.search import rebuild_index
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "Backend Developer",
+          "Frontend Developer", "DevOps Engineer", "QA Analyst", "Nurse", "Accountant",
+          "Sales Associate", "Mechanical Engineer", "Teacher", "Graphic Designer"]
+SKILLS = ["python", "django", "javascript", "react", "sql", "aws", "docker", "kubernetes",
+          "excel", "java", "golang", "rust", "figma", "salesforce", "tableau", "linux"]
+FILLER = ("team collaborate build ship customers growth remote office benefits culture "
+          "mission scale reliable modern stack mentor learn fast paced startup enterprise").split()
+
+# (title, skills) pairs as a job seeker would type them into job_list
+QUERIES = [("engineer", ""), ("developer", "python"), ("", "kubernetes"),
+           ("data scientist", "sql"), ("nurse", ""), ("", "react")]
+
+
+class Command(BaseCommand):
+    help = "Benchmark job_list title/skills search (FTS5 vs. icontains) on synthetic jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000",
+                            help="Comma-separated job counts to test.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per query.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        sizes = sorted(int(s) for s in opts["sizes"].split(",") if s.strip())
+        rng = random.Random(opts["seed"])
+
+        self.stdout.write(
+            f"{'jobs':>10} {'icontains ms':>13} {'fts ms':>9} {'ranked top50 ms':>16} {'speedup':>8} {'hits':>7}"
+        )
+        with transaction.atomic():
+            User = get_user_model()
+            recruiter = User.objects.create(username="__bench_recruiter__", role="recruiter")
+            inserted = 0
+            for size in sizes:
+                inserted += self._insert_jobs(recruiter, size - inserted, rng)
+                rebuild_index()
+                base_qs = Job.objects.filter(is_active=True)
+
+                def icontains(title, skills):
+                    qs = base_qs
+                    if title:
+                        qs = qs.filter(title__icontains=title)
+                    if skills:
+                        qs = qs.filter(requirements__icontains=skills)
+                    return qs
+
+                legacy_ms, legacy_hits = self._time(
+                    lambda t, s: list(icontains(t, s).values_list("id", flat=True)), opts["repeat"])
+                fts_ms, fts_hits = self._time(
+                    lambda t, s: list(base_qs.search(title=t, requirements=s).order_by().values_list("id", flat=True)),
+                    opts["repeat"])
+                top_ms, _ = self._time(
+                    lambda t, s: list(base_qs.search(title=t, requirements=s)[:50]),
+                    opts["repeat"])
+
+                # Prefix matching finds a superset of the substring matches here
+                if fts_hits < legacy_hits:
+                    self.stderr.write(f"  fewer FTS hits than icontains: {fts_hits} < {legacy_hits}")
+
+                self.stdout.write(
+                    f"{size:>10} {legacy_ms:>13.1f} {fts_ms:>9.1f} {top_ms:>16.1f} "
+                    f"{legacy_ms / fts_ms:>7.1f}x {fts_hits // len(QUERIES):>7}"
+                )
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+    def _time(self, run, repeat):
+        """Mean ms per query over QUERIES, and the total hit count of one pass."""
+        hits = sum(len(run(t, s)) for t, s in QUERIES)   # warm-up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for title, skills in QUERIES:
+                run(title, skills)
+        return (time.perf_counter() - start) * 1000 / (repeat * len(QUERIES)), hits
+
+    def _insert_jobs(self, recruiter, count, rng, batch_size=5000):
+        """bulk_create skips the post_save signal; the index is rebuilt afterwards."""
+        created = 0
+        while created < count:
+            batch = []
+            for _ in range(min(batch_size, count - created)):
+                batch.append(Job(
+                    recruiter=recruiter,
+                    title=rng.choice(TITLES),
+                    company=f"Company {rng.randint(1, 2000)}",
+                    description=" ".join(rng.choices(FILLER, k=120)),
+                    requirements=", ".join(rng.sample(SKILLS, 4)),
+                ))
+            Job.objects.bulk_create(batch)
+            created += len(batch)
+        return created
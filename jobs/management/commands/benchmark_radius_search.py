@@ -0,0 +1,121 @@
+"""
+Compare the spatial-index radius search (Job.objects.within_radius) against
+the old "load every job and loop in Python" approach.
+
+    python manage.py benchmark_radius_search --sizes 10000,100000,1000000
+
+Synthetic jobs are inserted inside a transaction that is rolled back at the
+end, so the database is left untouched (but it is write-locked meanwhile,
+so don't point this at a live database).
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.geo import encode_geohash, haversine_distance
+from jobs.models import Job
+
+
+def legacy_radius_search(queryset, lat, lng, miles):
+    """The pre-index job_list loop: every job with coordinates is loaded."""
+    nearby = []
+    for job in queryset.exclude(latitude__isnull=True, longitude__isnull=True):
+        dist = haversine_distance(lat, lng, job.latitude, job.longitude)
+        if dist <= miles:
+            job.distance_miles = round(dist, 1)
+            nearby.append(job)
+    nearby.sort(key=lambda j: j.distance_miles)
+    return nearby
+
+
+class Command(BaseCommand):
+    help = "Benchmark radius search (spatial index vs. Python loop) on synthetic jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000",
+                            help="Comma-separated job counts to test.")
+        parser.add_argument("--radius", type=float, default=25.0, help="Search radius in miles.")
+        parser.add_argument("--queries", type=int, default=5, help="Queries per size.")
+        parser.add_argument("--skip-legacy-above", type=int, default=None,
+                            help="Don't time the legacy loop above this many jobs.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        sizes = sorted(int(s) for s in opts["sizes"].split(",") if s.strip())
+        rng = random.Random(opts["seed"])
+        radius = opts["radius"]
+
+        # Points spread over the continental US, queries from random spots in it
+        def random_point():
+            return rng.uniform(25.0, 49.0), rng.uniform(-124.0, -67.0)
+
+        queries = [random_point() for _ in range(opts["queries"])]
+
+        self.stdout.write(
+            f"{'jobs':>10} {'legacy ms':>12} {'indexed ms':>12} {'nearest50 ms':>13} {'speedup':>9} {'hits':>6}"
+        )
+        with transaction.atomic():
+            User = get_user_model()
+            recruiter = User.objects.create(username="__bench_recruiter__", role="recruiter")
+            inserted = 0
+            for size in sizes:
+                inserted += self._insert_jobs(recruiter, size - inserted, random_point)
+                base_qs = Job.objects.filter(is_active=True)
+
+                # Correctness check + timing for the indexed path
+                start = time.perf_counter()
+                hits = 0
+                for lat, lng in queries:
+                    hits += len(base_qs.within_radius(lat, lng, radius))
+                indexed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+                # What job_list / jobs_map_api actually run: nearest 50 only
+                start = time.perf_counter()
+                for lat, lng in queries:
+                    list(base_qs.within_radius(lat, lng, radius)[:50])
+                nearest_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+                legacy_ms = None
+                limit = opts["skip_legacy_above"]
+                if limit is None or size <= limit:
+                    start = time.perf_counter()
+                    legacy_hits = 0
+                    for lat, lng in queries:
+                        legacy_hits += len(legacy_radius_search(base_qs, lat, lng, radius))
+                    legacy_ms = (time.perf_counter() - start) * 1000 / len(queries)
+                    if legacy_hits != hits:
+                        self.stderr.write(f"  result mismatch: legacy={legacy_hits} indexed={hits}")
+
+                self.stdout.write(
+                    f"{size:>10} "
+                    f"{(f'{legacy_ms:.1f}' if legacy_ms is not None else '-'):>12} "
+                    f"{indexed_ms:>12.1f} "
+                    f"{nearest_ms:>13.1f} "
+                    f"{(f'{legacy_ms / indexed_ms:.0f}x' if legacy_ms else '-'):>9} "
+                    f"{hits // len(queries):>6}"
+                )
+
+            # Never keep the synthetic rows
+            transaction.set_rollback(True)
+
+    def _insert_jobs(self, recruiter, count, random_point, batch_size=5000):
+        """bulk_create skips Job.save(), so the geohash is filled in here."""
+        created = 0
+        while created < count:
+            batch = []
+            for _ in range(min(batch_size, count - created)):
+                lat, lng = random_point()
+                batch.append(Job(
+                    recruiter=recruiter,
+                    title="Benchmark job",
+                    description="Synthetic row",
+                    latitude=lat,
+                    longitude=lng,
+                    geohash=encode_geohash(lat, lng),
+                ))
+            Job.objects.bulk_create(batch)
+            created += len(batch)
+        return created
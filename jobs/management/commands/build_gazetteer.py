@@ -0,0 +1,71 @@
+"""
+Compile the offline gazetteer index (see jobs/gazetteer.py).
+
+    python manage.py build_gazetteer
+    python manage.py build_gazetteer --census-places 2023_Gaz_place_national.txt \
+                                     --census-zcta 2023_Gaz_zcta_national.txt
+
+The bundled jobs/data/gazetteer.csv (major cities) is always included;
+the US Census Gazetteer files add every US place and ZIP (ZCTA) centroid.
+"""
+import csv
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.gazetteer import DEFAULT_CSV, DEFAULT_INDEX, city_key, read_csv_rows, reset_gazetteer, write_index, zip_key
+
+# "Atlanta city" -> "Atlanta", "Salt Lake City city" -> "Salt Lake City", "Redmond CDP" -> "Redmond"
+_PLACE_SUFFIX_RE = re.compile(r"\s+(?:CDP\b|[a-z(]).*$")
+
+
+def _census_rows(path):
+    """Census Gazetteer files are tab-separated with padded header names."""
+    with open(path, newline="", encoding="latin-1") as fh:
+        reader = csv.reader(fh, delimiter="\t")
+        header = [h.strip() for h in next(reader)]
+        for values in reader:
+            yield dict(zip(header, (v.strip() for v in values)))
+
+
+def census_place_rows(path):
+    for row in _census_rows(path):
+        name = _PLACE_SUFFIX_RE.sub("", row["NAME"])
+        lat, lng = float(row["INTPTLAT"]), float(row["INTPTLONG"])
+        yield city_key(name, row["USPS"], "us"), lat, lng
+        yield city_key(name, "", "us"), lat, lng
+
+
+def census_zcta_rows(path):
+    for row in _census_rows(path):
+        yield zip_key(row["GEOID"]), float(row["INTPTLAT"]), float(row["INTPTLONG"])
+
+
+class Command(BaseCommand):
+    help = "Build the memory-mapped offline gazetteer index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", action="append", default=[],
+                            help="Extra CSV in the bundled format (kind,country,state,name,latitude,longitude).")
+        parser.add_argument("--census-places", help="US Census Gazetteer places file.")
+        parser.add_argument("--census-zcta", help="US Census Gazetteer ZCTA (ZIP) file.")
+        parser.add_argument("--output", default=None, help="Index path (default: settings.GAZETTEER_INDEX_PATH).")
+
+    def handle(self, *args, **opts):
+        output = Path(opts["output"] or getattr(settings, "GAZETTEER_INDEX_PATH", DEFAULT_INDEX))
+
+        def rows():
+            # Earlier sources win on duplicate keys: curated data first
+            yield from read_csv_rows(DEFAULT_CSV)
+            for path in opts["csv"]:
+                yield from read_csv_rows(path)
+            if opts["census_zcta"]:
+                yield from census_zcta_rows(opts["census_zcta"])
+            if opts["census_places"]:
+                yield from census_place_rows(opts["census_places"])
+
+        count = write_index(rows(), output)
+        reset_gazetteer()
+        self.stdout.write(f"Wrote {count} entries ({output.stat().st_size / 1024:.0f} KB) to {output}")
@@ -0,0 +1,60 @@
+"""
+Background worker that geocodes jobs (and job seeker profiles) saved with
+geocode_status="pending", then offers the jobs that appeared on the map
+to the seekers around them (queued "nearby" recommendations).
+
+    python manage.py geocode_jobs                 # one pass, then exit
+    python manage.py geocode_jobs --loop          # keep polling (e.g. under systemd/supervisor)
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.geocoding import cache_stats, resolve_pending_jobs, resolve_pending_profiles
+from jobs.geocoding_client import get_client
+from jobs.recommendations import offer_pending_nearby_jobs
+
+
+class Command(BaseCommand):
+    help = "Resolve coordinates for jobs and job seeker profiles waiting on geocoding."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent geocoding requests.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many jobs.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new pending jobs.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **opts):
+        while True:
+            stats = resolve_pending_jobs(
+                batch_size=opts["batch_size"],
+                workers=opts["workers"],
+                limit=opts["limit"],
+            )
+            profile_stats = resolve_pending_profiles(
+                batch_size=opts["batch_size"],
+                workers=opts["workers"],
+                limit=opts["limit"],
+            )
+            start = time.perf_counter()
+            offered, rows = offer_pending_nearby_jobs()
+            if offered:
+                self.stdout.write(
+                    f"{offered} jobs offered to nearby seekers ({rows} recommendations) "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
+            if stats["jobs"] or profile_stats["profiles"] or not opts["loop"]:
+                for name, counts in (("jobs", stats), ("profiles", profile_stats)):
+                    self.stdout.write(
+                        f"{counts[name]} {name} in {counts['seconds']}s: "
+                        f"{counts['geocoded']} geocoded, {counts['failed']} failed, "
+                        f"{counts['errors']} errors (retry later), {counts['skipped']} skipped; "
+                        f"addresses: {counts['offline']} offline, {counts['cached']} from cache, "
+                        f"{counts['api_calls']} API lookups"
+                    )
+                self.stdout.write(f"geocode cache counters: {cache_stats()}")
+                self.stdout.write(f"geocoding client: {get_client().stats()}")
+            if not opts["loop"]:
+                break
+            time.sleep(opts["interval"])
@@ -0,0 +1,65 @@
+"""
+Bulk-import job postings from a CSV or JSONL file (jobs/importer.py).
+
+    python manage.py import_jobs openings.csv --recruiter acme_hr
+    python manage.py import_jobs feed.jsonl --recruiter acme_hr --workers 8 -v 2
+
+Columns / keys are JobForm's field names (title, company, street_address,
+city, state, zip_code, country, employment_type, description,
+requirements, remote, visa_sponsorship, min_salary, max_salary,
+is_active). Invalid rows are reported and skipped; jobs whose address
+couldn't be looked up stay pending for `manage.py geocode_jobs`.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from jobs.importer import FORMATS, JobImportError, format_for, import_jobs
+
+
+class Command(BaseCommand):
+    help = "Import job postings from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file.")
+        parser.add_argument("--recruiter", required=True, help="Username of the recruiter posting the jobs.")
+        parser.add_argument("--format", choices=FORMATS, help="File format (default: from the file extension).")
+        parser.add_argument("--chunk-size", type=int, default=500, help="Jobs inserted per transaction.")
+        parser.add_argument("--workers", type=int, default=4, help="Concurrent geocoding requests.")
+
+    def handle(self, *args, **opts):
+        fmt = opts["format"] or format_for(opts["path"])
+        if fmt is None:
+            raise CommandError("Can't tell the file format from its name; pass --format.")
+        try:
+            recruiter = User.objects.get(username=opts["recruiter"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {opts['recruiter']!r}.")
+        if recruiter.role != User.RECRUITER:
+            raise CommandError(f"{recruiter.username} is not a recruiter.")
+
+        verbosity = opts["verbosity"]
+
+        def progress(stats):
+            if verbosity >= 2:
+                self.stdout.write(f"  {stats['rows']} rows read, {stats['created']} jobs created")
+
+        try:
+            with open(opts["path"], newline="", encoding="utf-8-sig") as stream:
+                stats = import_jobs(
+                    stream, recruiter, fmt=fmt, chunk_size=opts["chunk_size"],
+                    workers=opts["workers"], progress=progress,
+                )
+        except (OSError, UnicodeDecodeError, JobImportError) as exc:
+            raise CommandError(str(exc))
+
+        for line, message in stats["errors"]:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(
+            f"{stats['created']} jobs created from {stats['rows']} rows ({stats['invalid']} invalid) "
+            f"in {stats['seconds']:.2f}s, {stats['rows_per_second']:.0f} rows/s"
+        )
+        self.stdout.write(
+            f"Geocoding: {stats['addresses']} distinct addresses ({stats['offline']} offline, "
+            f"{stats['cached']} cached, {stats['api_calls']} API calls); {stats['geocoded']} jobs geocoded, "
+            f"{stats['failed']} not found, {stats['pending']} left pending"
+        )
@@ -0,0 +1,24 @@
+"""
+Recompute the hiring funnel rollups (jobs/funnel.py) from the application
+status history and the applications table.
+
+    python manage.py rebuild_funnels
+
+They are maintained incrementally; run this after writes that skip the
+Application signals (raw SQL, `QuerySet.update()` outside the Kanban,
+`loaddata`).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.funnel import rebuild_funnels
+
+
+class Command(BaseCommand):
+    help = "Recompute the hiring funnel rollups from the status history."
+
+    def handle(self, *args, **opts):
+        start = time.perf_counter()
+        rollups = rebuild_funnels()
+        self.stdout.write(f"Rebuilt {rollups} funnel rollups in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,23 @@
+"""
+Recompute the job map's cluster table (JobMapCell) from the jobs table.
+
+    python manage.py rebuild_map_cells
+
+The table is maintained incrementally; run this after writes that skip
+Job's signals (raw SQL, `QuerySet.update()`, `bulk_create`, `loaddata`) or
+to reset floating-point drift in the centroid sums.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.map_clusters import rebuild_cells
+
+
+class Command(BaseCommand):
+    help = "Rebuild the pre-aggregated job map clusters."
+
+    def handle(self, *args, **opts):
+        start = time.perf_counter()
+        cells = rebuild_cells()
+        self.stdout.write(f"Rebuilt map clusters ({cells} finest cells) in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,27 @@
+"""
+Recreate the full-text search index (jobs/search.py) from the jobs table.
+
+    python manage.py rebuild_search_index
+
+Needed after writes that skip Job's post_save signal (raw SQL,
+`QuerySet.update()`, `bulk_create`, `loaddata`).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 job search index."
+
+    def handle(self, *args, **opts):
+        if not fts_available():
+            self.stdout.write("Full-text index is SQLite-only; nothing to rebuild.")
+            return
+        start = time.perf_counter()
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(f"Indexed {count} jobs in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,29 @@
+"""
+Recompute every job's and job seeker profile's skill links (JobSkill /
+ProfileSkill) from their text.
+
+    python manage.py rebuild_skills
+
+The links are maintained on save; run this after writes that skip the
+post_save signals (raw SQL, `QuerySet.update()`, `bulk_create`,
+`loaddata`), or so that older jobs pick up skills that joined the
+vocabulary after they were posted.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import Skill
+from jobs.skills import rebuild_skills
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized skills index of jobs and job seeker profiles."
+
+    def handle(self, *args, **opts):
+        start = time.perf_counter()
+        profile_links, job_links = rebuild_skills()
+        self.stdout.write(
+            f"Linked {profile_links} profile skills and {job_links} job skills "
+            f"({Skill.objects.count()} skills) in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,37 @@
+"""
+Recount the per-job application counters (Job.applications_count and the
+per-status / per-decision breakdown, jobs/application_counts.py) and
+repair the ones that drifted.
+
+    python manage.py reconcile_application_counts
+    python manage.py reconcile_application_counts --chunk-size 5000 -v 2
+
+They are maintained incrementally; run this after writes that skip the
+Application signals (raw SQL, `QuerySet.update()` outside the Kanban,
+`loaddata`), or periodically as a safety net.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.application_counts import reconcile_counts
+
+
+class Command(BaseCommand):
+    help = "Recount the per-job application counters and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Jobs recounted per transaction.")
+
+    def handle(self, *args, **opts):
+        verbosity = opts["verbosity"]
+        start = time.perf_counter()
+
+        def progress(checked, repaired):
+            if verbosity >= 2:
+                self.stdout.write(f"  {checked} jobs checked, {repaired} repaired")
+
+        checked, repaired = reconcile_counts(chunk_size=opts["chunk_size"], progress=progress)
+        self.stdout.write(
+            f"{checked} jobs checked, {repaired} repaired in {time.perf_counter() - start:.2f}s"
+        )
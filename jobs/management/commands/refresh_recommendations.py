@@ -0,0 +1,49 @@
+"""
+Refresh job seekers' precomputed recommendations (JobRecommendation).
+
+    python manage.py refresh_recommendations            # both kinds
+    python manage.py refresh_recommendations --only skills
+    python manage.py refresh_recommendations --full     # rescore every skills list
+
+"nearby" lists are maintained incrementally (new jobs are offered by the
+`geocode_jobs` worker); this rebuilds them, queued offers included, e.g.
+after writes that skip the Job / Application signals (raw SQL,
+`QuerySet.update()`, `bulk_create`, `loaddata`) or to top up lists that
+shrank as jobs were deactivated.
+
+"skills" lists are only updated here: run it periodically (cron). Each run
+rescores only the seekers and jobs whose text changed; use --full now and
+then so every list follows the drifting idf weights.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.recommendations import refresh_all_nearby, refresh_skill_matches
+
+
+class Command(BaseCommand):
+    help = "Refresh the precomputed job recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=["nearby", "skills"], help="Refresh one kind only.")
+        parser.add_argument("--full", action="store_true",
+                            help="Rescore every seeker's skills matches, not just the changed ones.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Seekers rescored per transaction.")
+
+    def handle(self, *args, **opts):
+        if opts["only"] in (None, "nearby"):
+            start = time.perf_counter()
+            seekers, rows = refresh_all_nearby()
+            self.stdout.write(
+                f"Nearby jobs: {rows} recommendations for {seekers} seekers in {time.perf_counter() - start:.2f}s"
+            )
+        if opts["only"] in (None, "skills"):
+            start = time.perf_counter()
+            stats = refresh_skill_matches(full=opts["full"], batch_size=opts["batch_size"])
+            self.stdout.write(
+                f"Skills matches: {stats['changed_jobs']}/{stats['jobs']} jobs and "
+                f"{stats['changed_seekers']}/{stats['seekers']} seekers changed, "
+                f"{stats['rescored_seekers']} seekers rescored, {stats['rows']} recommendations written "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
@@ -0,0 +1,41 @@
+"""
+Count new applications into the job co-application matrix and refresh the
+"people also applied to" lists shown on job_detail (jobs/similar_jobs.py).
+
+    python manage.py update_similar_jobs              # applications since the last run
+    python manage.py update_similar_jobs --rebuild    # recount every application
+
+Run it periodically (cron), one run at a time.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.similar_jobs import rebuild_similar_jobs, update_similar_jobs
+
+
+class Command(BaseCommand):
+    help = "Update the similar-jobs lists from the applications made since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Applications read per transaction.")
+        parser.add_argument("--rebuild", action="store_true", help="Forget the matrix and recount everything.")
+
+    def handle(self, *args, **opts):
+        verbosity = opts["verbosity"]
+        start = time.perf_counter()
+
+        def progress(run):
+            if verbosity >= 2:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"  {run.applications} applications (up to id {run.last_application_id}), "
+                    f"{run.applications / elapsed:.0f}/s"
+                )
+
+        update = rebuild_similar_jobs if opts["rebuild"] else update_similar_jobs
+        run = update(chunk_size=opts["chunk_size"], progress=progress)
+        self.stdout.write(
+            f"{run.applications} new applications counted, {run.jobs_updated} jobs' similar lists "
+            f"updated in {time.perf_counter() - start:.2f}s"
+        )
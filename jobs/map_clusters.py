@@ -0,0 +1,204 @@
+# jobs/map_clusters.py
+"""
+Server-side clustering for the job map (jobs_map_api).
+
+Every active job with coordinates is counted in the JobMapCell row of its
+geohash prefix at each precision in CLUSTER_PRECISIONS (1 = ~5000 km
+cells ... 5 = ~5 km). A map request then reads the cells for its zoom
+level inside the viewport — at most a few hundred small rows — instead of
+every job:
+
+    zoom 0-2 -> precision 1      zoom 8-9 -> precision 4
+    zoom 3-4 -> precision 2      zoom 10+ -> precision 5
+    zoom 5-7 -> precision 3
+
+and returns individual pins once the viewport holds few enough jobs.
+
+Cells are kept up to date incrementally: `move_job(old, new)` is called
+with a job's (latitude, longitude) before and after a change (None when it
+isn't shown on the map) from the Job signals and the geocoding worker.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Substr
+
+from .geo import decode_geohash_center, encode_geohash, geohash_cell_size
+from .models import Job, JobMapCell
+
+CLUSTER_PRECISIONS = (1, 2, 3, 4, 5)
+
+# (highest zoom, precision): cells roughly 32-128 px wide on screen
+_ZOOM_PRECISION = ((2, 1), (4, 2), (7, 3), (9, 4))
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return CLUSTER_PRECISIONS[-1]
+
+
+def map_point(job):
+    """(lat, lng) if `job` is shown on the map, else None."""
+    if job.is_active and job.latitude is not None and job.longitude is not None:
+        return job.latitude, job.longitude
+    return None
+
+
+# ===============================================================
+# Incremental maintenance
+# ===============================================================
+def _apply(point, sign):
+    """Add (sign=1) or remove (sign=-1) one job at `point` in every precision."""
+    lat, lng = point
+    geohash = encode_geohash(lat, lng, CLUSTER_PRECISIONS[-1])
+    cells = [geohash[:p] for p in CLUSTER_PRECISIONS]
+    deltas = {
+        "job_count": F("job_count") + sign,
+        "lat_sum": F("lat_sum") + sign * lat,
+        "lng_sum": F("lng_sum") + sign * lng,
+    }
+    updated = JobMapCell.objects.filter(cell__in=cells).update(**deltas)
+    if sign < 0:
+        JobMapCell.objects.filter(cell__in=cells, job_count__lte=0).delete()
+        return
+    if updated == len(cells):
+        return
+
+    existing = set(JobMapCell.objects.filter(cell__in=cells).values_list("cell", flat=True))
+    for cell in cells:
+        if cell in existing:
+            continue
+        center_lat, center_lng = decode_geohash_center(cell)
+        try:
+            with transaction.atomic():
+                JobMapCell.objects.create(
+                    cell=cell, precision=len(cell), center_lat=center_lat, center_lng=center_lng,
+                    job_count=1, lat_sum=lat, lng_sum=lng,
+                )
+        except IntegrityError:
+            # Created concurrently since we looked: count ourselves in
+            JobMapCell.objects.filter(cell=cell).update(**deltas)
+
+
+def move_job(old_point, new_point):
+    """Update the cells for a job that moved from `old_point` to `new_point`."""
+    if old_point == new_point:
+        return
+    with transaction.atomic():
+        if old_point is not None:
+            _apply(old_point, -1)
+        if new_point is not None:
+            _apply(new_point, 1)
+
+
+def add_points(points):
+    """
+    Count many new jobs at `points` in at once (bulk imports): the points
+    are summed per cell first, so each touched cell is written once.
+    """
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for lat, lng in points:
+        geohash = encode_geohash(lat, lng, CLUSTER_PRECISIONS[-1])
+        for precision in CLUSTER_PRECISIONS:
+            total = totals[geohash[:precision]]
+            total[0] += 1
+            total[1] += lat
+            total[2] += lng
+    if not totals:
+        return
+    with transaction.atomic():
+        existing = set()
+        cells = list(totals)
+        for start in range(0, len(cells), 500):
+            existing.update(
+                JobMapCell.objects.filter(cell__in=cells[start:start + 500]).values_list("cell", flat=True)
+            )
+        for cell in existing:
+            n, lat_sum, lng_sum = totals[cell]
+            JobMapCell.objects.filter(cell=cell).update(
+                job_count=F("job_count") + n,
+                lat_sum=F("lat_sum") + lat_sum,
+                lng_sum=F("lng_sum") + lng_sum,
+            )
+        new_cells = []
+        for cell, (n, lat_sum, lng_sum) in totals.items():
+            if cell in existing:
+                continue
+            center_lat, center_lng = decode_geohash_center(cell)
+            new_cells.append(JobMapCell(
+                cell=cell, precision=len(cell), center_lat=center_lat, center_lng=center_lng,
+                job_count=n, lat_sum=lat_sum, lng_sum=lng_sum,
+            ))
+        JobMapCell.objects.bulk_create(new_cells)
+
+
+def rebuild_cells():
+    """Recompute every cell from the jobs table (one GROUP BY per precision)."""
+    with transaction.atomic():
+        JobMapCell.objects.all().delete()
+        for precision in CLUSTER_PRECISIONS:
+            rows = (
+                Job.objects
+                .filter(is_active=True, latitude__isnull=False, longitude__isnull=False)
+                .exclude(geohash="")
+                .annotate(cell=Substr("geohash", 1, precision))
+                .values("cell")
+                .annotate(n=Count("id"), lat_sum=Sum("latitude"), lng_sum=Sum("longitude"))
+                .order_by()
+            )
+            batch = []
+            for row in rows:
+                center_lat, center_lng = decode_geohash_center(row["cell"])
+                batch.append(JobMapCell(
+                    cell=row["cell"], precision=precision, center_lat=center_lat, center_lng=center_lng,
+                    job_count=row["n"], lat_sum=row["lat_sum"], lng_sum=row["lng_sum"],
+                ))
+            JobMapCell.objects.bulk_create(batch, batch_size=1000)
+        return JobMapCell.objects.filter(precision=CLUSTER_PRECISIONS[-1]).count()
+
+
+# ===============================================================
+# Viewport queries
+# ===============================================================
+def viewport_cells(south, west, north, east, precision):
+    """
+    Non-empty cells of `precision` overlapping the viewport. West > east
+    means the viewport crosses the antimeridian.
+    """
+    cell_lat, cell_lng = geohash_cell_size(precision)
+    # A cell overlaps the viewport iff its center is within half a cell of it
+    south, north = south - cell_lat / 2, north + cell_lat / 2
+    q = Q(precision=precision, center_lat__gte=south, center_lat__lte=north)
+    if west <= east and east - west + cell_lng < 360:
+        q &= Q(center_lng__gte=west - cell_lng / 2, center_lng__lte=east + cell_lng / 2)
+    elif west > east:
+        q &= Q(center_lng__gte=west - cell_lng / 2) | Q(center_lng__lte=east + cell_lng / 2)
+    return JobMapCell.objects.filter(q)
+
+
+def viewport_clusters(south, west, north, east, zoom):
+    """
+    Clusters for the viewport at `zoom`: a list of
+    {"cell", "count", "lat", "lng"} (lat/lng = centroid of the jobs in it).
+    """
+    clusters = []
+    for cell in viewport_cells(south, west, north, east, precision_for_zoom(zoom)):
+        if cell.job_count <= 0:
+            continue
+        lat, lng = cell.centroid
+        clusters.append({
+            "cell": cell.cell,
+            "count": cell.job_count,
+            "lat": round(lat, 5),
+            "lng": round(lng, 5),
+        })
+    return clusters
+
+
+def max_pins():
+    """Viewports holding at most this many jobs get individual pins."""
+    return getattr(settings, "JOB_MAP_MAX_PINS", 300)
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+from jobs.geo import encode_geohash
+
+
+def backfill_geohash(apps, schema_editor):
+    """Fill the new geohash column for jobs that already have coordinates."""
+    Job = apps.get_model("jobs", "Job")
+    qs = (
+        Job.objects
+        .exclude(latitude__isnull=True)
+        .exclude(longitude__isnull=True)
+        .only("id", "latitude", "longitude")
+        .order_by("id")
+    )
+    batch = []
+    for job in qs.iterator(chunk_size=1000):
+        job.geohash = encode_geohash(job.latitude, job.longitude)
+        batch.append(job)
+        if len(batch) >= 1000:
+            Job.objects.bulk_update(batch, ["geohash"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_geohash_job_job_lat_lng_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
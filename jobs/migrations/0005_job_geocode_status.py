@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:23
+
+from django.db import migrations, models
+
+
+def set_initial_geocode_status(apps, schema_editor):
+    """Jobs with coordinates are done; jobs with only an address get queued."""
+    Job = apps.get_model("jobs", "Job")
+    Job.objects.exclude(latitude__isnull=True).exclude(longitude__isnull=True).update(geocode_status="ok")
+    (
+        Job.objects
+        .filter(geocode_status="")
+        .exclude(location="")
+        .update(geocode_status="pending")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_backfill_job_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='geocode_status',
+            field=models.CharField(blank=True, choices=[('', 'No address'), ('pending', 'Pending geocode'), ('ok', 'Geocoded'), ('failed', 'Geocoding failed')], db_index=True, default='', editable=False, max_length=10),
+        ),
+        migrations.RunPython(set_initial_geocode_status, migrations.RunPython.noop),
+    ]
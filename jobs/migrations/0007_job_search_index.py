@@ -0,0 +1,32 @@
+from django.db import migrations
+
+FTS_TABLE = "jobs_job_fts"
+COLUMNS = "title, company, description, requirements"
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 index for jobs/search.py (SQLite only), filled from existing jobs."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{COLUMNS}, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE} (rowid, {COLUMNS}) SELECT id, {COLUMNS} FROM jobs_job")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_geocodecacheentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
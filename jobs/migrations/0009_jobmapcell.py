@@ -0,0 +1,61 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+from jobs.geo import decode_geohash_center, encode_geohash
+
+CLUSTER_PRECISIONS = (1, 2, 3, 4, 5)
+
+
+def build_cells(apps, schema_editor):
+    """Count existing active, geocoded jobs into their map cells."""
+    Job = apps.get_model("jobs", "Job")
+    JobMapCell = apps.get_model("jobs", "JobMapCell")
+    cells = {}
+    qs = (
+        Job.objects
+        .filter(is_active=True, latitude__isnull=False, longitude__isnull=False)
+        .values_list("latitude", "longitude")
+    )
+    for lat, lng in qs.iterator(chunk_size=2000):
+        geohash = encode_geohash(lat, lng, CLUSTER_PRECISIONS[-1])
+        for precision in CLUSTER_PRECISIONS:
+            totals = cells.setdefault(geohash[:precision], [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += lat
+            totals[2] += lng
+    batch = []
+    for cell, (count, lat_sum, lng_sum) in cells.items():
+        center_lat, center_lng = decode_geohash_center(cell)
+        batch.append(JobMapCell(
+            cell=cell, precision=len(cell), center_lat=center_lat, center_lng=center_lng,
+            job_count=count, lat_sum=lat_sum, lng_sum=lng_sum,
+        ))
+    JobMapCell.objects.bulk_create(batch, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMapCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell', models.CharField(max_length=12, unique=True)),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('center_lat', models.FloatField()),
+                ('center_lng', models.FloatField()),
+                ('job_count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0)),
+                ('lng_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['precision', 'center_lat', 'center_lng'], name='jobmapcell_viewport_idx')],
+            },
+        ),
+        migrations.RunPython(build_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from jobs.locations import location_key
+
+
+def backfill_location_key(apps, schema_editor):
+    """Fill the new location_key column for existing jobs, 1000 at a time."""
+    Job = apps.get_model("jobs", "Job")
+    qs = (
+        Job.objects
+        .exclude(city="")
+        .only("id", "city", "state", "country")
+        .order_by("id")
+    )
+    batch = []
+    for job in qs.iterator(chunk_size=1000):
+        job.location_key = location_key(job.city, job.state, job.country)
+        batch.append(job)
+        if len(batch) >= 1000:
+            Job.objects.bulk_update(batch, ["location_key"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["location_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_location_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_location_key, migrations.RunPython.noop),
+    ]
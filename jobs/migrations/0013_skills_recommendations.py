@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_jobrecommendation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobrecommendation',
+            name='kind',
+            field=models.CharField(choices=[('nearby', 'Nearest jobs'), ('skills', 'Best skills match')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='TextVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('job', 'Job posting'), ('seeker', 'Job seeker skills')], max_length=10)),
+                ('object_id', models.PositiveIntegerField()),
+                ('digest', models.CharField(max_length=40)),
+                ('terms', models.JSONField(default=dict)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
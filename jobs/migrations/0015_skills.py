@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from jobs.skills import COMMON_SKILLS, Vocabulary, link_jobs
+
+
+def seed_and_link_jobs(apps, schema_editor):
+    """Seed the skill vocabulary and link existing jobs to their skills."""
+    Skill = apps.get_model("jobs", "Skill")
+    Vocabulary(Skill).add(COMMON_SKILLS)
+    link_jobs(Skill, apps.get_model("jobs", "Job"), apps.get_model("jobs", "JobSkill"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_similar_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='jobs.job')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_links', to='jobs.skill')),
+            ],
+            options={
+                'unique_together': {('skill', 'job')},
+            },
+        ),
+        migrations.RunPython(seed_and_link_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,104 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+from jobs.funnel import DECISION_STAGES, rebuild_funnels
+
+
+def backfill_history(apps, schema_editor):
+    """
+    Existing applications have no history yet: log each as having entered
+    its current stage (and decision) when it was submitted, then build the
+    rollups from that.
+    """
+    Job = apps.get_model("jobs", "Job")
+    Application = apps.get_model("jobs", "Application")
+    Event = apps.get_model("jobs", "ApplicationStatusEvent")
+    Application.objects.update(status_changed_at=F("applied_at"))
+
+    events = []
+    rows = Application.objects.order_by("id").values_list("id", "job_id", "status", "final_decision", "applied_at")
+    for app_id, job_id, status, decision, applied_at in rows.iterator(chunk_size=2000):
+        events.append(Event(application_id=app_id, job_id=job_id, field="status",
+                            old_value="", new_value=status, created_at=applied_at))
+        if decision in DECISION_STAGES:
+            events.append(Event(application_id=app_id, job_id=job_id, field="final_decision",
+                                old_value="", new_value=decision, created_at=applied_at))
+        if len(events) >= 2000:
+            Event.objects.bulk_create(events)
+            events = []
+    Event.objects.bulk_create(events)
+
+    rebuild_funnels(Job, Application, Event,
+                    apps.get_model("jobs", "FunnelRollup"), apps.get_model("jobs", "FunnelStageDuration"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_skills'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='status_changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='FunnelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=20)),
+                ('current', models.IntegerField(default=0)),
+                ('entered', models.PositiveIntegerField(default=0)),
+                ('exited', models.PositiveIntegerField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to='jobs.job')),
+                ('recruiter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='funnel_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FunnelStageDuration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rollup', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='durations', to='jobs.funnelrollup')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ApplicationStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('status', 'Status'), ('final_decision', 'Final decision')], max_length=20)),
+                ('old_value', models.CharField(blank=True, max_length=20)),
+                ('new_value', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('application', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='status_events', to='jobs.application')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['application', 'id'], name='statusevent_app_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='funnelrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('job__isnull', False)), fields=('job', 'stage'), name='funnelrollup_job_stage'),
+        ),
+        migrations.AddConstraint(
+            model_name='funnelrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('job__isnull', True)), fields=('recruiter', 'stage'), name='funnelrollup_recruiter_stage'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='funnelstageduration',
+            unique_together={('rollup', 'bucket')},
+        ),
+        migrations.RunPython(backfill_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+from jobs.application_counts import reconcile_counts
+
+
+def count_applications(apps, schema_editor):
+    """Fill the new counters from the existing applications."""
+    reconcile_counts(chunk_size=2000, job_model=apps.get_model("jobs", "Job"),
+                     application_model=apps.get_model("jobs", "Application"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_status_events_and_funnels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='applications_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applied_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='closed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='hired_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='interview_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='rejected_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='review_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingNearbyJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.job')),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_pending_nearby_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='similarjobsrun',
+            name='changed_job_ids',
+            field=models.JSONField(default=list),
+        ),
+    ]
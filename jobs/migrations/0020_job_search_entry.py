@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:04
+
+import django.db.models.deletion
+import jobs.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_similarjobsrun_changed_job_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchEntry',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='jobs.job')),
+                ('document', jobs.search.SearchDocumentField(db_column='jobs_job_fts')),
+            ],
+            options={
+                'db_table': 'jobs_job_fts',
+                'managed': False,
+            },
+        ),
+    ]
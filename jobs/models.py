@@ -1,8 +1,47 @@
 from django.db import models
+from django.db.models import Value
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.conf import settings
 from django.urls import reverse
-import requests
-import urllib.parse
+from django.utils import timezone
+
+from .geo import HaversineMiles, encode_geohash, radius_prefilter
+from .locations import location_key
+from .search import FTS_TABLE, SearchDocumentField
+
+
+# ==============================
+# Job QuerySet (spatial + text search)
+# ==============================
+class JobQuerySet(models.QuerySet):
+    def within_radius(self, lat, lng, miles):
+        """
+        Jobs within `miles` of (lat, lng), nearest first, with a
+        `distance_miles` annotation computed by the database.
+
+        The geohash/bounding-box prefilter keeps the distance computation to
+        nearby rows, and because filtering, ordering and slicing all happen
+        in SQL, `qs.within_radius(...)[:50]` only materializes 50 jobs.
+        """
+        return (
+            radius_prefilter(self, lat, lng, miles)
+            .annotate(distance_miles=HaversineMiles("latitude", "longitude", Value(lat), Value(lng)))
+            .filter(distance_miles__lte=miles)
+            .order_by("distance_miles", "id")
+        )
+
+    def search(self, query="", **fields):
+        """
+        Full-text search (FTS5 + BM25 on SQLite, see jobs/search.py):
+        `query` matches any text column, `title=...` / `requirements=...`
+        etc. only that column. When the index is used the result is
+        ordered best match first, with a `search_rank` column (lower is
+        more relevant).
+        """
+        from .search import search_queryset
+        return search_queryset(self, query, **fields)
+
 
 class Job(models.Model):
     # ==============================
@@ -22,6 +61,23 @@ class Job(models.Model):
         (TEMP,      "Temporary"),
     ]
 
+    # ==============================
+    # Geocoding Status Choices
+    # ==============================
+    # Geocoding runs in the background (`manage.py geocode_jobs`):
+    # save() only flags the job as pending.
+    GEOCODE_NONE    = ""          # no address to geocode
+    GEOCODE_PENDING = "pending"
+    GEOCODE_OK      = "ok"
+    GEOCODE_FAILED  = "failed"
+
+    GEOCODE_STATUSES = [
+        (GEOCODE_NONE,    "No address"),
+        (GEOCODE_PENDING, "Pending geocode"),
+        (GEOCODE_OK,      "Geocoded"),
+        (GEOCODE_FAILED,  "Geocoding failed"),
+    ]
+
     # ==============================
     # Core Job Information
     # ==============================
@@ -52,6 +108,20 @@ class Job(models.Model):
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
 
+    # Grid cell of (latitude, longitude) used by radius search (see jobs/geo.py).
+    # Kept in sync by save(); blank when the job has no coordinates.
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
+
+    # Normalized "country|state|city" (see jobs/locations.py); kept in sync by
+    # save() and matched by equality, e.g. for "new job near you" notifications
+    location_key = models.CharField(max_length=255, blank=True, db_index=True, editable=False)
+
+    # Where this job is in the background geocoding pipeline (see jobs/geocoding.py)
+    geocode_status = models.CharField(
+        max_length=10, choices=GEOCODE_STATUSES, default=GEOCODE_NONE,
+        blank=True, db_index=True, editable=False,
+    )
+
     # ==============================
     # Additional Job Info
     # ==============================
@@ -66,10 +136,30 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # ==============================
+    # Application Counters
+    # ==============================
+    # Denormalized from Application and kept exact by its signals and the
+    # batch Kanban moves (see jobs/application_counts.py)
+    applications_count = models.IntegerField(default=0, editable=False)
+    applied_count = models.IntegerField(default=0, editable=False)
+    review_count = models.IntegerField(default=0, editable=False)
+    interview_count = models.IntegerField(default=0, editable=False)
+    closed_count = models.IntegerField(default=0, editable=False)
+    hired_count = models.IntegerField(default=0, editable=False)
+    rejected_count = models.IntegerField(default=0, editable=False)
+
+    objects = JobQuerySet.as_manager()
 
-    
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Bounding-box prefilter for radius search
+            models.Index(fields=["latitude", "longitude"], name="job_lat_lng_idx"),
+            # job_list keyset pagination: ORDER BY created_at DESC, id DESC
+            # (is_active is left out: SQLite can't seek on a bare boolean term)
+            models.Index(fields=["created_at", "id"], name="job_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} @ {self.company or '—'}"
@@ -81,59 +171,39 @@ class Job(models.Model):
     # ==============================
     # Google Maps Geocoding
     # ==============================
-    def geocode_address(self, address):
+    @staticmethod
+    def geocode_address(address):
         """
-        Convert a human‑readable address into latitude/longitude using
-        Google Maps Geocoding API, with a **fallback** strategy for
-        tricky/ambiguous addresses.
-
-        Strategy:
-        1) Try the full address as-is.
-        2) If that fails, retry with a **simplified** query composed of the
-           last two comma-separated parts (e.g., "City, State"), which
-           often succeeds when street-level data is incomplete or uses
-           abbreviations like "Rd" vs "Road".
+        Convert a human‑readable address into (latitude, longitude), or
+        (None, None) when it can't be located.
+
+        Lookups go through the geocode cache (in-process LRU + the
+        GeocodeCacheEntry table, misses included) before calling the
+        Google Maps Geocoding API — see jobs/geocoding.py.
         """
-        # --- 1) First attempt: full address ---
-        encoded = urllib.parse.quote(address.strip())
-        url = (
-            f"https://maps.googleapis.com/maps/api/geocode/json?address={encoded}"
-            f"&key={settings.GOOGLE_MAPS_API_KEY}"
-        )
-        resp = requests.get(url).json()
-
-        if resp.get("status") == "OK" and resp.get("results"):
-            loc = resp["results"][0]["geometry"]["location"]
-            return loc["lat"], loc["lng"]
-
-        # --- 2) Fallback attempt: try a simplified query ---
-        # Example: "4 Birch Rd, New Milford, CT, 06776, USA" -> "New Milford, CT"
-        parts = [p.strip() for p in address.split(",") if p.strip()]
-        if len(parts) >= 2:
-            simplified = ", ".join(parts[-2:])
-            encoded_simple = urllib.parse.quote(simplified)
-            retry_url = (
-                f"https://maps.googleapis.com/maps/api/geocode/json?address={encoded_simple}"
-                f"&key={settings.GOOGLE_MAPS_API_KEY}"
-            )
-            retry_resp = requests.get(retry_url).json()
-            if retry_resp.get("status") == "OK" and retry_resp.get("results"):
-                loc = retry_resp["results"][0]["geometry"]["location"]
-                return loc["lat"], loc["lng"]
-
-        # Nothing worked
-        return None, None
+        from .geocoding import geocode
+        return geocode(address)
 
     # ==============================
     # Save Override
     # ==============================
     def save(self, *args, **kwargs):
+        """Override Django's save() to keep the derived location fields in sync (`normalize_location`)."""
+        self.normalize_location()
+        super().save(*args, **kwargs)
+
+    def normalize_location(self):
         """
-        Override Django's save() to:
+        Everything save() derives from the address before writing (bulk
+        inserts skip save(), so jobs/importer.py calls this itself):
         - Normalize each address component (strip extra whitespace).
         - Build a clean, display-friendly `location` string from parts.
-        - Geocode to fill `latitude`/`longitude` when missing *or* when
-          any address component changes.
+        - Flag the job for (re)geocoding when `latitude`/`longitude` are
+          missing *or* any address component changes. The actual API call
+          happens in the background worker (`manage.py geocode_jobs`), so
+          saving never waits on Google.
+        - Refresh the `geohash` grid cell used by radius search.
+        - Refresh the normalized `location_key`.
         """
         # --- Normalize address fields to reduce geocoding failures ---
         def _clean(s):
@@ -173,14 +243,19 @@ class Job(models.Model):
             # Address changed: refresh coordinates
             must_geocode = True
 
-        # Perform geocoding if needed
+        # Queue geocoding if needed (resolved by jobs.geocoding.resolve_pending_jobs)
         if must_geocode and self.location:
-            lat, lng = self.geocode_address(self.location)
-            if lat is not None and lng is not None:
-                self.latitude = lat
-                self.longitude = lng
-        # Save record normally
-        super().save(*args, **kwargs)
+            self.geocode_status = self.GEOCODE_PENDING
+        elif not self.location:
+            self.geocode_status = self.GEOCODE_NONE
+
+        # Keep the spatial index cell in sync with the coordinates
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = ""
+
+        self.location_key = location_key(self.city, self.state, self.country)
 
 
 # ==============================
@@ -215,6 +290,8 @@ class Application(models.Model):
     )
 
     applied_at = models.DateTimeField(auto_now_add=True)
+    # When `status` last changed: the start of the current stay in its stage (jobs/funnel.py)
+    status_changed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("job", "applicant")
@@ -222,3 +299,558 @@ class Application(models.Model):
 
     def __str__(self):
         return f"{self.applicant} → {self.job}"
+
+
+# ==============================
+# Signals: keep the search index in sync
+# ==============================
+@receiver(post_save, sender=Job)
+def index_job_for_search(sender, instance, raw=False, using="default", **kwargs):
+    if raw:
+        return  # loaddata: run `manage.py rebuild_search_index` afterwards
+    from .search import index_job
+    index_job(instance, using=using)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_search(sender, instance, using="default", **kwargs):
+    from .search import remove_job
+    remove_job(instance.pk, using=using)
+
+
+# ==============================
+# Signals: keep the map clusters in sync
+# ==============================
+@receiver(pre_save, sender=Job)
+def remember_map_point(sender, instance, raw=False, **kwargs):
+    """Where the job was on the map before this save (None if it wasn't)."""
+    instance._map_point_before = None
+    if raw or instance.pk is None:
+        return
+    old = sender.objects.filter(pk=instance.pk).values("is_active", "latitude", "longitude").first()
+    if old and old["is_active"] and old["latitude"] is not None and old["longitude"] is not None:
+        instance._map_point_before = (old["latitude"], old["longitude"])
+
+
+@receiver(post_save, sender=Job)
+def update_map_cells(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: run `manage.py rebuild_map_cells` afterwards
+    from .map_clusters import map_point, move_job
+    move_job(getattr(instance, "_map_point_before", None), map_point(instance))
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_map_cells(sender, instance, **kwargs):
+    from .map_clusters import map_point, move_job
+    move_job(map_point(instance), None)
+
+
+# ==============================
+# Signals: recruiter map cache
+# ==============================
+# The recruiter map payload (jobs/recruiter_pins.py) holds each active,
+# geocoded job and its applicant count: drop it when either can change.
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_recruiter_pins_for_job(sender, instance, **kwargs):
+    from .recruiter_pins import invalidate_recruiter_pins
+    invalidate_recruiter_pins(instance.recruiter_id)
+
+
+def _application_recruiter_id(application):
+    if Application.job.is_cached(application):
+        return application.job.recruiter_id
+    return Job.objects.filter(pk=application.job_id).values_list("recruiter_id", flat=True).first()
+
+
+@receiver(post_save, sender=Application)
+def invalidate_recruiter_pins_for_new_application(sender, instance, created, **kwargs):
+    if not created:
+        return  # status changes don't change the counts
+    from .recruiter_pins import invalidate_recruiter_pins
+    invalidate_recruiter_pins(_application_recruiter_id(instance))
+
+
+@receiver(post_delete, sender=Application)
+def invalidate_recruiter_pins_for_deleted_application(sender, instance, **kwargs):
+    recruiter_id = _application_recruiter_id(instance)
+    if recruiter_id is not None:
+        from .recruiter_pins import invalidate_recruiter_pins
+        invalidate_recruiter_pins(recruiter_id)
+
+
+# ==============================
+# Signals: per-user applied-job ids
+# ==============================
+# Patch the cached sorted id arrays (jobs/applied_jobs.py) instead of
+# dropping them, so the "Applied" badges stay query-free.
+@receiver(post_save, sender=Application)
+def add_to_applied_jobs(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        from .applied_jobs import add_applied_job
+        add_applied_job(instance.applicant_id, instance.job_id)
+
+
+@receiver(post_delete, sender=Application)
+def remove_from_applied_jobs(sender, instance, **kwargs):
+    from .applied_jobs import remove_applied_job
+    remove_applied_job(instance.applicant_id, instance.job_id)
+
+
+# ==============================
+# Signals: precomputed "nearby" recommendations
+# ==============================
+# A job leaving the map drops its rows right away; one entering it is only
+# queued (PendingNearbyJob) for the background worker, so saving a job
+# never pays for the per-seeker fan-out (jobs/recommendations.py). The
+# geocoding worker does the same for the coordinates it writes with .update().
+@receiver(post_save, sender=Job)
+def update_nearby_recommendations(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: run `manage.py refresh_recommendations` afterwards
+    from .map_clusters import map_point
+    from .recommendations import job_point_changed
+    job_point_changed(instance.pk, getattr(instance, "_map_point_before", None), map_point(instance))
+
+
+@receiver(post_save, sender=Application)
+def drop_applied_recommendation(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        from .recommendations import remove_applied
+        remove_applied(instance.applicant_id, instance.job_id)
+
+
+# ==============================
+# Signals: status events and funnel rollups
+# ==============================
+# Every status / final_decision change is logged as an ApplicationStatusEvent
+# and folded into the FunnelRollup counters (jobs/funnel.py). Batch Kanban
+# moves use .update() and record their transitions themselves.
+@receiver(pre_save, sender=Application)
+def remember_application_state(sender, instance, raw=False, **kwargs):
+    instance._state_before = None
+    if raw or instance.pk is None:
+        return
+    instance._state_before = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("status", "final_decision", "status_changed_at").first()
+    )
+    if instance._state_before and instance._state_before[0] != instance.status:
+        instance.status_changed_at = timezone.now()
+
+
+@receiver(post_save, sender=Application)
+def record_status_events(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: run `manage.py rebuild_funnels` afterwards
+    from .funnel import application_created, application_changed
+    if created:
+        application_created(instance, _application_recruiter_id(instance))
+    elif getattr(instance, "_state_before", None):
+        application_changed(instance, _application_recruiter_id(instance), instance._state_before)
+
+
+@receiver(post_delete, sender=Application)
+def remove_from_funnel(sender, instance, **kwargs):
+    recruiter_id = _application_recruiter_id(instance)
+    if recruiter_id is not None:
+        from .funnel import application_removed
+        application_removed(instance, recruiter_id)
+
+
+# ==============================
+# Signals: per-job application counters
+# ==============================
+# Atomic F() updates of the Job counter columns (jobs/application_counts.py);
+# status changes reuse the state remember_application_state read.
+@receiver(post_save, sender=Application)
+def count_application(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: run `manage.py reconcile_application_counts` afterwards
+    from .application_counts import application_changed, application_created
+    if created:
+        application_created(instance)
+    elif getattr(instance, "_state_before", None):
+        application_changed(instance, instance._state_before)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    from .application_counts import application_removed
+    application_removed(instance)
+
+
+# ==============================
+# Signals: skills inverted index
+# ==============================
+@receiver(post_save, sender=Job)
+def index_job_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not {"title", "requirements"} & set(update_fields)):
+        return  # loaddata: run `manage.py rebuild_skills` afterwards
+    from .skills import sync_job_skills
+    sync_job_skills(instance)
+
+
+# ==============================
+# Signals: cached job pages and facet counts
+# ==============================
+# Cached job_list / job_detail responses and facet counts are keyed by the
+# jobs version number (jobs/response_cache.py); any job change retires them all.
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def bump_cached_jobs_version(sender, instance, **kwargs):
+    from .response_cache import bump_jobs_version
+    bump_jobs_version()
+
+
+# ==============================
+# Signals: in-process job index
+# ==============================
+# Keeps this process's columnar job index (jobs/job_index.py), if built,
+# in step with saved and deleted jobs. Must run after bump_cached_jobs_version
+# above: the index adopts the version that bump produced.
+@receiver(post_save, sender=Job)
+def update_job_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from .job_index import refresh_job
+    refresh_job(instance)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_index(sender, instance, **kwargs):
+    from .job_index import forget_job
+    forget_job(instance.pk)
+
+
+# ==============================
+# Full-text index
+# ==============================
+class JobSearchEntry(models.Model):
+    """
+    A row of the FTS5 index (jobs/search.py). The virtual table is created
+    by migration 0007 and kept in sync by the Job signals; this unmanaged
+    model only lets search querysets join it (`search_entry__...`).
+    """
+    job = models.OneToOneField(
+        Job, primary_key=True, db_column="rowid", on_delete=models.DO_NOTHING,
+        db_constraint=False, related_name="search_entry",
+    )
+    document = SearchDocumentField(db_column=FTS_TABLE)
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLE
+
+
+# ==============================
+# Geocode Cache
+# ==============================
+class GeocodeCacheEntry(models.Model):
+    """
+    One geocoding result, keyed by the normalized address string.
+
+    Misses are cached too (latitude/longitude stay NULL) but with a much
+    shorter TTL, so an address Google can't find isn't re-queried on every
+    save. See jobs/geocoding.py for the lookup order and TTL settings.
+    """
+    address_key = models.CharField(max_length=255, unique=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        if self.is_miss:
+            return f"{self.address_key} → (not found)"
+        return f"{self.address_key} → ({self.latitude}, {self.longitude})"
+
+    @property
+    def is_miss(self):
+        return self.latitude is None or self.longitude is None
+
+
+# ==============================
+# Map Clusters
+# ==============================
+class JobMapCell(models.Model):
+    """
+    Pre-aggregated pins for the job map: how many active, geocoded jobs
+    fall in one geohash cell, plus running coordinate sums for the
+    cluster centroid. There is one row per non-empty cell at each
+    precision in jobs.map_clusters.CLUSTER_PRECISIONS, so jobs_map_api
+    never has to touch the jobs table at low zoom.
+
+    Maintained incrementally by the Job signals and the geocoding worker;
+    `manage.py rebuild_map_cells` recomputes it from scratch.
+    """
+    cell = models.CharField(max_length=12, unique=True)
+    precision = models.PositiveSmallIntegerField()
+    # Fixed center of the cell (used for the viewport filter)
+    center_lat = models.FloatField()
+    center_lng = models.FloatField()
+    job_count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0)
+    lng_sum = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["precision", "center_lat", "center_lng"], name="jobmapcell_viewport_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.cell}: {self.job_count} jobs"
+
+    @property
+    def centroid(self):
+        return self.lat_sum / self.job_count, self.lng_sum / self.job_count
+
+
+# ==============================
+# Precomputed Recommendations
+# ==============================
+class JobRecommendation(models.Model):
+    """
+    A job recommended to a job seeker, precomputed so the dashboard reads
+    a few indexed rows instead of scoring jobs on every page view.
+
+    `kind` says which recommender produced it; `score` orders them, lower
+    is better (distance in miles for "nearby", 1 - cosine similarity for
+    "skills"). Maintained
+    incrementally by jobs/recommendations.py; `manage.py
+    refresh_recommendations` recomputes it from scratch.
+    """
+    NEARBY = "nearby"
+    SKILLS = "skills"
+    KINDS = [
+        (NEARBY, "Nearest jobs"),
+        (SKILLS, "Best skills match"),
+    ]
+
+    seeker = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="job_recommendations",
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="recommendations")
+    kind = models.CharField(max_length=20, choices=KINDS)
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("seeker", "job", "kind")
+        indexes = [
+            models.Index(fields=["seeker", "kind", "score"], name="jobrec_seeker_kind_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.job_id} for {self.seeker_id} ({self.score:.2f})"
+
+
+class PendingNearbyJob(models.Model):
+    """
+    A job that appeared on the map (posted, geocoded, reactivated, moved)
+    and still has to be offered to the seekers around it. Job saves only
+    queue it; the background worker (`manage.py geocode_jobs`) does the
+    per-seeker fan-out (jobs/recommendations.py).
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, related_name="+")
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"nearby offer of job {self.job_id}"
+
+
+class TextVector(models.Model):
+    """
+    Weighted term counts of a job posting's or a job seeker's text, the
+    input of the "skills" recommendations (jobs/tfidf.py). `digest`
+    fingerprints the text they were built from, so a refresh only
+    re-tokenizes and rescores what changed.
+    """
+    JOB = "job"
+    SEEKER = "seeker"
+    KINDS = [
+        (JOB, "Job posting"),
+        (SEEKER, "Job seeker skills"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.PositiveIntegerField()   # Job id, or the seeker's user id
+    digest = models.CharField(max_length=40)
+    terms = models.JSONField(default=dict)
+
+    class Meta:
+        unique_together = ("kind", "object_id")
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({len(self.terms)} terms)"
+
+
+# ==============================
+# "People also applied to"
+# ==============================
+class JobCoApplication(models.Model):
+    """
+    One cell of the sparse job-by-job co-application matrix: `count` job
+    seekers applied to both `job` and `other`. Stored in both directions;
+    the diagonal (job == other) holds the job's applicant count. Built
+    incrementally from Application rows by jobs/similar_jobs.py.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    other = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("job", "other")
+
+    def __str__(self):
+        return f"{self.job_id} & {self.other_id}: {self.count}"
+
+
+class SimilarJob(models.Model):
+    """
+    `similar` is one of the top jobs applied to by the people who applied
+    to `job`; `score` is the cosine similarity of the two jobs' applicant
+    sets, higher is better. Read by job_detail with one indexed lookup.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="similar_jobs")
+    similar = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="similar_to")
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "-score"], name="similarjob_job_score_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+class SimilarJobsRun(models.Model):
+    """
+    One batch run of jobs/similar_jobs.py. Applications with an id up to
+    `last_application_id` are counted in the co-application matrix; the
+    latest run's value is where the next one starts. `changed_job_ids` are
+    the jobs whose matrix rows changed but whose lists aren't recomputed
+    yet, saved with the watermark: a run that died before finishing hands
+    them to the next one.
+    """
+    last_application_id = models.BigIntegerField(default=0)
+    changed_job_ids = models.JSONField(default=list)
+    applications = models.PositiveIntegerField(default=0)
+    jobs_updated = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"SimilarJobsRun(up to application {self.last_application_id}, {self.applications} new)"
+
+
+# ==============================
+# Skills
+# ==============================
+class Skill(models.Model):
+    """A canonical skill name ("javascript", "machine learning"); see jobs/skills.py."""
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class JobSkill(models.Model):
+    """Skill -> job link: the jobs side of the skills inverted index, kept in sync on save."""
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="job_links")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="skill_links")
+
+    class Meta:
+        unique_together = ("skill", "job")
+
+    def __str__(self):
+        return f"{self.job_id} → {self.skill_id}"
+
+
+# ==============================
+# Application status history & funnel rollups
+# ==============================
+class ApplicationStatusEvent(models.Model):
+    """
+    One change of an application's `status` or `final_decision`, never
+    updated or deleted with the application (withdrawn applications keep
+    their history). `old_value` is "" for the state an application was
+    created in.
+    """
+    STATUS = "status"
+    FINAL_DECISION = "final_decision"
+    FIELD_CHOICES = [
+        (STATUS, "Status"),
+        (FINAL_DECISION, "Final decision"),
+    ]
+
+    application = models.ForeignKey(
+        Application, on_delete=models.DO_NOTHING, db_constraint=False, related_name="status_events",
+    )
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="status_events")
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    old_value = models.CharField(max_length=20, blank=True)
+    new_value = models.CharField(max_length=20)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["application", "id"], name="statusevent_app_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.application_id} {self.field}: {self.old_value or '-'} → {self.new_value}"
+
+
+class FunnelRollup(models.Model):
+    """
+    Funnel counters of one stage (a status, or "hired" / "rejected") for one
+    job, or for all of a recruiter's jobs when `job` is null: applications
+    `current`ly in it, transitions that `entered` / `exited` it, and the
+    total time of the completed stays. Kept up to date by jobs/funnel.py.
+    """
+    recruiter = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="funnel_rollups")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, null=True, blank=True, related_name="funnel_rollups")
+    stage = models.CharField(max_length=20)
+    current = models.IntegerField(default=0)
+    entered = models.PositiveIntegerField(default=0)
+    exited = models.PositiveIntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "stage"], condition=models.Q(job__isnull=False), name="funnelrollup_job_stage",
+            ),
+            models.UniqueConstraint(
+                fields=["recruiter", "stage"], condition=models.Q(job__isnull=True), name="funnelrollup_recruiter_stage",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id or f'recruiter {self.recruiter_id}'} {self.stage}: {self.current}"
+
+
+class FunnelStageDuration(models.Model):
+    """Histogram of a rollup's completed stays: `count` of them fell in duration `bucket` (jobs/funnel.py)."""
+    rollup = models.ForeignKey(FunnelRollup, on_delete=models.CASCADE, related_name="durations")
+    bucket = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("rollup", "bucket")
+
+    def __str__(self):
+        return f"{self.rollup_id} bucket {self.bucket}: {self.count}"
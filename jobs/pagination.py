@@ -0,0 +1,105 @@
+# jobs/pagination.py
+"""
+Keyset ("seek") pagination with opaque cursors.
+
+Instead of OFFSET — which makes the database walk and discard every
+earlier row, so page 500 costs 500 pages of work — each page remembers the
+sort key of its last row, and the next page asks for rows *after* it:
+
+    ORDER BY created_at DESC, id DESC
+    WHERE created_at < :c OR (created_at = :c AND id < :id)
+    LIMIT :size + 1
+
+With an index on the sort columns every page costs the same, however deep.
+The cursor handed to clients is that key, JSON-encoded and base64url'd;
+it is opaque to them and validated on the way back in.
+"""
+import base64
+import json
+
+from django.db.models import Q
+
+# job_list: newest first; `id` breaks ties between jobs saved in the same instant
+JOB_LIST_ORDERING = ("-created_at", "-id")
+# ...or, for a full-text search, best match first (see jobs/search.py)
+JOB_SEARCH_ORDERING = ("search_rank", "-created_at", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, ordering):
+    """Cursor string -> list of raw key values (one per ordering field)."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor("Cursor does not match this listing")
+    return values
+
+
+def _key_values(queryset, ordering, values):
+    """Convert decoded JSON values back to Python values of each key field."""
+    converted = []
+    for key, value in zip(ordering, values):
+        name = key.lstrip("-")
+        try:
+            if name in queryset.query.annotations:
+                value = queryset.query.annotations[name].output_field.to_python(value)
+            else:
+                value = queryset.model._meta.get_field(name).to_python(value)
+        except Exception as exc:
+            raise InvalidCursor("Malformed cursor") from exc
+        if value is None:
+            raise InvalidCursor("Malformed cursor")
+        converted.append(value)
+    return converted
+
+
+def _after(ordering, values):
+    """Q for "sorts strictly after `values`" under `ordering`."""
+    q = Q()
+    for i, key in enumerate(ordering):
+        name = key.lstrip("-")
+        lookup = "lt" if key.startswith("-") else "gt"
+        step = Q(**{f"{ordering[j].lstrip('-')}": values[j] for j in range(i)})
+        q |= step & Q(**{f"{name}__{lookup}": values[i]})
+    return q
+
+
+def keyset_page(queryset, ordering, cursor=None, size=20):
+    """
+    One page of `queryset` sorted by `ordering` (a tuple of field names,
+    "-" for descending, ending in a unique field).
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    Raises InvalidCursor for a cursor that wasn't produced by this listing.
+    """
+    qs = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, ordering)
+        qs = qs.filter(_after(ordering, _key_values(queryset, ordering, values)))
+
+    items = list(qs[:size + 1])
+    next_cursor = None
+    if len(items) > size:
+        items = items[:size]
+        last = items[-1]
+        next_cursor = encode_cursor([
+            _json_value(getattr(last, key.lstrip("-"))) for key in ordering
+        ])
+    return items, next_cursor
+
+
+def _json_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
@@ -0,0 +1,414 @@
+# jobs/recommendations.py
+"""
+Precomputed job recommendations for job seekers (the JobRecommendation table).
+
+"nearby": the RECOMMENDATIONS_PER_SEEKER nearest active jobs within
+RECOMMENDATION_RADIUS_MILES of the seeker's geocoded address that they
+haven't applied to. Kept current incrementally instead of scanning
+distances on every dashboard view:
+
+- a seeker's address is geocoded    -> recompute that seeker's list,
+- a job appears on the map (posted + geocoded, reactivated, moved)
+                                    -> queue it (PendingNearbyJob); the
+                                       background worker (`manage.py
+                                       geocode_jobs`) offers it to the
+                                       seekers within the radius whose list
+                                       it improves, then trims those lists
+                                       back to size,
+- a job is deactivated or moves     -> drop its rows (deleted jobs cascade),
+- a seeker applies to a job         -> drop that row.
+
+Lists may shrink below size between refreshes (the dashboard only shows a
+few of them); `manage.py refresh_recommendations` rebuilds every list.
+
+"skills": the jobs whose title / requirements / description best match
+the seeker's skills and headline, by TF-IDF cosine similarity
+(jobs/tfidf.py). Scoring text on every save would be too slow, so these
+are refreshed in batches by `manage.py refresh_recommendations`: each run
+rescores only the seekers whose text changed (against every job) and
+offers only the jobs whose text changed to the other seekers.
+Deactivated or deleted jobs lose their rows on the next run; applying
+drops the row right away, as for "nearby".
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Value, Window
+from django.db.models.functions import RowNumber
+
+from accounts.models import JobSeekerProfile
+
+from .geo import HaversineMiles, bbox_q, bounding_box
+from .models import Application, Job, JobRecommendation, PendingNearbyJob, TextVector
+from .tfidf import digest, idf_table, inverted_index, similarities, term_counts, top_k, vectorize
+
+CHUNK_SIZE = 500   # seeker ids per IN (...) list
+
+
+def radius_miles():
+    return getattr(settings, "RECOMMENDATION_RADIUS_MILES", 50)
+
+
+def per_seeker():
+    return getattr(settings, "RECOMMENDATIONS_PER_SEEKER", 10)
+
+
+def min_similarity():
+    return getattr(settings, "RECOMMENDATION_MIN_SIMILARITY", 0.1)
+
+
+def champion_list_size():
+    return getattr(settings, "RECOMMENDATION_CHAMPION_LIST_SIZE", 1000)
+
+
+# ==============================
+# Reading
+# ==============================
+def recommended_jobs(user, limit=3, kind=JobRecommendation.NEARBY, exclude_ids=()):
+    """The user's best `limit` precomputed recommendations of `kind` (one indexed query)."""
+    return list(
+        Job.objects
+        .filter(recommendations__seeker=user, recommendations__kind=kind, is_active=True)
+        .exclude(id__in=exclude_ids)
+        .order_by("recommendations__score", "-created_at")[:limit]
+    )
+
+
+def dashboard_jobs(user, limit=3):
+    """
+    The job seeker dashboard's picks: best skills matches first, topped up
+    with nearby jobs, then with the newest active jobs not applied to yet.
+    """
+    jobs = []
+    for kind in (JobRecommendation.SKILLS, JobRecommendation.NEARBY):
+        if len(jobs) < limit:
+            jobs += recommended_jobs(user, limit - len(jobs), kind, exclude_ids=[j.id for j in jobs])
+    if len(jobs) < limit:
+        jobs += list(
+            Job.objects.filter(is_active=True)
+            .exclude(applications__applicant=user)
+            .exclude(id__in=[j.id for j in jobs])
+            .order_by("-created_at")[:limit - len(jobs)]
+        )
+    return jobs
+
+
+# ==============================
+# Maintenance
+# ==============================
+def refresh_nearby_for_seeker(user_id):
+    """Recompute one seeker's "nearby" list from their geocoded address."""
+    point = (
+        JobSeekerProfile.objects
+        .filter(user_id=user_id, latitude__isnull=False, longitude__isnull=False)
+        .values_list("latitude", "longitude")
+        .first()
+    )
+    rows = []
+    if point:
+        jobs = (
+            Job.objects.filter(is_active=True)
+            .exclude(applications__applicant_id=user_id)
+            .within_radius(point[0], point[1], radius_miles())
+            .values_list("id", "distance_miles")[:per_seeker()]
+        )
+        rows = [JobRecommendation(seeker_id=user_id, job_id=job_id, kind=JobRecommendation.NEARBY, score=distance)
+                for job_id, distance in jobs]
+    with transaction.atomic():
+        JobRecommendation.objects.filter(seeker_id=user_id, kind=JobRecommendation.NEARBY).delete()
+        JobRecommendation.objects.bulk_create(rows)
+    return len(rows)
+
+
+def seekers_near(lat, lng, miles):
+    """(user_id, distance) of geocoded job seekers within `miles` of (lat, lng)."""
+    south, north, west, east = bounding_box(lat, lng, miles)
+    return list(
+        JobSeekerProfile.objects
+        .filter(bbox_q(south, north, west, east))
+        .annotate(distance=HaversineMiles("latitude", "longitude", Value(lat), Value(lng)))
+        .filter(distance__lte=miles)
+        .values_list("user_id", "distance")
+    )
+
+
+def add_nearby_job(job_id, lat, lng):
+    """
+    A job is now on the map at (lat, lng): add it to every nearby seeker's
+    list it belongs in, then trim those lists. Returns the rows added.
+    """
+    return _offer(job_id, JobRecommendation.NEARBY, dict(seekers_near(lat, lng, radius_miles())))
+
+
+def add_nearby_jobs(points):
+    """add_nearby_job for many new jobs ({job_id: (lat, lng)}), looking up each distinct point's seekers once."""
+    seekers = {}
+    added = 0
+    for job_id, point in points.items():
+        if point not in seekers:
+            seekers[point] = dict(seekers_near(*point, radius_miles()))
+        added += _offer(job_id, JobRecommendation.NEARBY, seekers[point])
+    return added
+
+
+def _offer(job_id, kind, scores):
+    """
+    Add `job_id` to the `kind` list of each seeker in `scores` ({user_id:
+    score}) that has room for it or a worse entry, skipping seekers who
+    applied, then trim the full lists back to size. Returns the rows added.
+    """
+    size = per_seeker()
+    candidates = list(scores.items())
+    added = 0
+    for start in range(0, len(candidates), CHUNK_SIZE):
+        chunk = dict(candidates[start:start + CHUNK_SIZE])
+        applied = set(
+            Job.objects.filter(pk=job_id, applications__applicant_id__in=chunk)
+            .values_list("applications__applicant_id", flat=True)
+        )
+        current = {
+            row["seeker_id"]: (row["n"], row["worst"])
+            for row in (
+                JobRecommendation.objects
+                .filter(kind=kind, seeker_id__in=chunk)
+                .values("seeker_id")
+                .annotate(n=Count("id"), worst=Max("score"))
+            )
+        }
+        rows, full = [], []
+        for user_id, score in chunk.items():
+            if user_id in applied:
+                continue
+            n, worst = current.get(user_id, (0, None))
+            if n < size or score < worst:
+                rows.append(JobRecommendation(seeker_id=user_id, job_id=job_id, kind=kind, score=score))
+                if n >= size:
+                    full.append(user_id)
+        with transaction.atomic():
+            JobRecommendation.objects.bulk_create(rows, ignore_conflicts=True)
+            if full:
+                _trim(full, kind, size)
+        added += len(rows)
+    return added
+
+
+def _trim(seeker_ids, kind, size):
+    """Keep only the best `size` rows of `kind` for each of `seeker_ids`."""
+    overflow = (
+        JobRecommendation.objects
+        .filter(kind=kind, seeker_id__in=seeker_ids)
+        .annotate(rank=Window(RowNumber(), partition_by=[F("seeker_id")], order_by=[F("score").asc(), F("id").asc()]))
+        .filter(rank__gt=size)
+        .values_list("id", flat=True)
+    )
+    JobRecommendation.objects.filter(id__in=list(overflow)).delete()
+
+
+def remove_nearby_job(job_id):
+    """The job left the map (deactivated / moved): it's no longer "nearby" anyone."""
+    JobRecommendation.objects.filter(job_id=job_id, kind=JobRecommendation.NEARBY).delete()
+
+
+def remove_applied(user_id, job_id):
+    JobRecommendation.objects.filter(seeker_id=user_id, job_id=job_id).delete()
+
+
+def job_point_changed(job_id, before, after):
+    """
+    Job signals / geocoding worker: the job's map point went from `before`
+    to `after`. Leaving is one DELETE; the offer to the seekers around the
+    new point is queued for `offer_pending_nearby_jobs()`.
+    """
+    if before == after:
+        return
+    if before is not None:
+        remove_nearby_job(job_id)
+    if after is not None:
+        PendingNearbyJob.objects.bulk_create([PendingNearbyJob(job_id=job_id)], ignore_conflicts=True)
+
+
+def offer_pending_nearby_jobs(batch_size=CHUNK_SIZE):
+    """
+    Offer the queued jobs to the seekers around them, `batch_size` per
+    transaction, at the point each job is at *now* (jobs that left the map
+    since are just dropped). Returns (jobs, rows added).
+    """
+    jobs = rows = 0
+    while True:
+        with transaction.atomic():
+            queued = list(PendingNearbyJob.objects.order_by("id").values_list("id", "job_id")[:batch_size])
+            if not queued:
+                break
+            PendingNearbyJob.objects.filter(id__in=[pk for pk, _ in queued]).delete()
+            points = {
+                job_id: (lat, lng)
+                for job_id, lat, lng in Job.objects.filter(
+                    id__in=[job_id for _, job_id in queued], is_active=True,
+                    latitude__isnull=False, longitude__isnull=False,
+                ).values_list("id", "latitude", "longitude")
+            }
+            rows += add_nearby_jobs(points)
+        jobs += len(queued)
+    return jobs, rows
+
+
+def refresh_all_nearby():
+    """Recompute every geocoded seeker's list (queued offers included); returns (seekers, rows)."""
+    PendingNearbyJob.objects.all().delete()
+    JobRecommendation.objects.filter(
+        kind=JobRecommendation.NEARBY, seeker__jobseeker__latitude__isnull=True,
+    ).delete()
+    seekers = rows = 0
+    user_ids = (
+        JobSeekerProfile.objects
+        .filter(latitude__isnull=False, longitude__isnull=False)
+        .order_by("id")
+        .values_list("user_id", flat=True)
+    )
+    for user_id in user_ids.iterator(chunk_size=1000):
+        rows += refresh_nearby_for_seeker(user_id)
+        seekers += 1
+    return seekers, rows
+
+
+# ==============================
+# Skills match (TF-IDF)
+# ==============================
+def _job_fields(title, requirements, description):
+    return [(title, 2), (requirements, 2), (description, 1)]
+
+
+def _seeker_fields(skills, headline):
+    return [(skills, 2), (headline, 1)]
+
+
+def _sync_vectors(kind, sources):
+    """
+    Bring the stored TextVector rows of `kind` in line with `sources`
+    ({object_id: fields}). Only new or changed texts are tokenized; empty
+    ones count as absent. Returns ({object_id: term counts}, changed ids,
+    removed ids).
+    """
+    stored = {
+        object_id: (pk, text_digest, terms)
+        for pk, object_id, text_digest, terms in (
+            TextVector.objects.filter(kind=kind)
+            .values_list("id", "object_id", "digest", "terms")
+            .iterator(chunk_size=2000)
+        )
+    }
+    vectors, changed, new_rows, updated_rows = {}, set(), [], []
+    for object_id, fields in sources.items():
+        text_digest = digest(fields)
+        if object_id in stored and stored[object_id][1] == text_digest:
+            vectors[object_id] = stored.pop(object_id)[2]
+            continue
+        terms = term_counts(fields)
+        if not terms:
+            continue   # left in `stored`: removed below
+        vectors[object_id] = terms
+        changed.add(object_id)
+        if object_id in stored:
+            pk = stored.pop(object_id)[0]
+            updated_rows.append(TextVector(pk=pk, kind=kind, object_id=object_id, digest=text_digest, terms=terms))
+        else:
+            new_rows.append(TextVector(kind=kind, object_id=object_id, digest=text_digest, terms=terms))
+
+    removed = list(stored)
+    with transaction.atomic():
+        TextVector.objects.bulk_create(new_rows, batch_size=CHUNK_SIZE)
+        TextVector.objects.bulk_update(updated_rows, ["digest", "terms"], batch_size=CHUNK_SIZE)
+        for start in range(0, len(removed), CHUNK_SIZE):
+            TextVector.objects.filter(kind=kind, object_id__in=removed[start:start + CHUNK_SIZE]).delete()
+    return vectors, changed, removed
+
+
+def _delete_skill_rows(field, ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        JobRecommendation.objects.filter(
+            kind=JobRecommendation.SKILLS, **{f"{field}__in": ids[start:start + CHUNK_SIZE]},
+        ).delete()
+
+
+def _rescore_seekers(user_ids, seeker_terms, idf, job_postings):
+    """Replace the "skills" lists of `user_ids` with their top matches among all jobs."""
+    applied = defaultdict(set)
+    for user_id, job_id in Application.objects.filter(applicant_id__in=user_ids).values_list("applicant_id", "job_id"):
+        applied[user_id].add(job_id)
+
+    rows = []
+    for user_id in user_ids:
+        vector = vectorize(seeker_terms[user_id], idf)
+        for similarity, job_id in top_k(vector, job_postings, per_seeker(), min_similarity(), applied[user_id]):
+            rows.append(JobRecommendation(
+                seeker_id=user_id, job_id=job_id, kind=JobRecommendation.SKILLS, score=1 - similarity,
+            ))
+    with transaction.atomic():
+        JobRecommendation.objects.filter(kind=JobRecommendation.SKILLS, seeker_id__in=user_ids).delete()
+        JobRecommendation.objects.bulk_create(rows)
+    return len(rows)
+
+
+def refresh_skill_matches(full=False, batch_size=CHUNK_SIZE):
+    """
+    Bring the "skills" recommendations up to date with the current job and
+    profile texts. Seekers whose text changed are rescored against every
+    active job, `batch_size` seekers per transaction, walking only the
+    RECOMMENDATION_CHAMPION_LIST_SIZE best jobs per term; jobs whose text
+    changed are offered to everyone else. `full` rescores every seeker
+    (the idf weights drift as jobs come and go).
+    """
+    jobs = {
+        job_id: _job_fields(title, requirements, description)
+        for job_id, title, requirements, description in (
+            Job.objects.filter(is_active=True)
+            .values_list("id", "title", "requirements", "description")
+            .iterator(chunk_size=2000)
+        )
+    }
+    job_terms, changed_jobs, removed_jobs = _sync_vectors(TextVector.JOB, jobs)
+    del jobs
+    seekers = {
+        user_id: _seeker_fields(skills, headline)
+        for user_id, skills, headline in (
+            JobSeekerProfile.objects.values_list("user_id", "skills", "headline").iterator(chunk_size=2000)
+        )
+    }
+    seeker_terms, changed_seekers, removed_seekers = _sync_vectors(TextVector.SEEKER, seekers)
+    del seekers
+
+    # Scores of removed or rewritten jobs and of seekers without skills are stale
+    _delete_skill_rows("job_id", removed_jobs + sorted(changed_jobs))
+    _delete_skill_rows("seeker_id", removed_seekers)
+
+    idf = idf_table(job_terms.values())
+    job_vectors = {job_id: vectorize(terms, idf) for job_id, terms in job_terms.items()}
+
+    rescore = sorted(seeker_terms) if full else sorted(changed_seekers)
+    rows = 0
+    if rescore:
+        job_postings = inverted_index(job_vectors, limit=champion_list_size())
+        for start in range(0, len(rescore), batch_size):
+            rows += _rescore_seekers(rescore[start:start + batch_size], seeker_terms, idf, job_postings)
+
+    offered = sorted(changed_jobs) if not full else []
+    if offered:
+        skip = set(rescore)
+        seeker_postings = inverted_index({
+            user_id: vectorize(terms, idf) for user_id, terms in seeker_terms.items() if user_id not in skip
+        })
+        for job_id in offered:
+            scores = similarities(job_vectors[job_id], seeker_postings)
+            rows += _offer(job_id, JobRecommendation.SKILLS, {
+                user_id: 1 - similarity for user_id, similarity in scores.items() if similarity >= min_similarity()
+            })
+
+    return {
+        "jobs": len(job_terms),
+        "seekers": len(seeker_terms),
+        "changed_jobs": len(changed_jobs),
+        "changed_seekers": len(changed_seekers),
+        "rescored_seekers": len(rescore),
+        "rows": rows,
+    }
@@ -0,0 +1,78 @@
+# jobs/recruiter_pins.py
+"""
+Data for the recruiter map (recruiter_map page + recruiter_map_api).
+
+One `.values()` query over the recruiter's jobs returns every pin with its
+applicant count (the Job.applications_count counter, no JOIN or GROUP BY;
+see jobs/application_counts.py); the three JSON shapes the page and the
+API need are serialized from it once and cached per recruiter. The Job /
+Application signals (and the geocoding worker, which writes coordinates
+with `.update()`) drop the entry whenever a posting or its applicant count
+changes, so a reload is a single cache read. The worker runs in its own
+process, so this relies on the default cache being shared (CACHES in
+settings: file-based or Redis, never per-process memory).
+"""
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import Job
+
+CACHE_KEY = "recruiter_pins:{}"
+
+
+def _cache_timeout():
+    # Invalidation is explicit; the timeout is only a safety net
+    return getattr(settings, "RECRUITER_MAP_CACHE_TIMEOUT", 60 * 60)
+
+
+def build_recruiter_pins(recruiter_id):
+    """
+    Serialize the recruiter's active, geocoded jobs:
+      "jobs"       – plain pins (map mode 1),
+      "applicants" – pins with an `applicants` count, jobs that have any (mode 2),
+      "all"        – pins with an `applicants` count, every job (API, mode=applicants).
+    Values are JSON strings.
+    """
+    rows = (
+        Job.objects
+        .filter(recruiter_id=recruiter_id, is_active=True,
+                latitude__isnull=False, longitude__isnull=False)
+        .values("id", "title", "company", "location", "latitude", "longitude", "applications_count")
+        .order_by("-created_at", "-id")
+    )
+    pins, counted = [], []
+    for row in rows:
+        pin = {
+            "id": row["id"],
+            "title": row["title"],
+            "company": row["company"],
+            "location": row["location"],
+            "lat": float(row["latitude"]),
+            "lng": float(row["longitude"]),
+            "detailUrl": reverse("jobs:job_detail", args=[row["id"]]),
+        }
+        pins.append(pin)
+        counted.append(dict(pin, applicants=row["applications_count"]))
+
+    return {
+        "jobs": json.dumps(pins),
+        "applicants": json.dumps([p for p in counted if p["applicants"] > 0]),
+        "all": json.dumps(counted),
+    }
+
+
+def recruiter_pins(recruiter_id):
+    """Cached build_recruiter_pins()."""
+    key = CACHE_KEY.format(recruiter_id)
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_recruiter_pins(recruiter_id)
+        cache.set(key, payload, _cache_timeout())
+    return payload
+
+
+def invalidate_recruiter_pins(recruiter_id):
+    cache.delete(CACHE_KEY.format(recruiter_id))
@@ -0,0 +1,93 @@
+# jobs/response_cache.py
+"""
+Caching for the read-mostly job pages (job_list, its JSON API, job_detail).
+
+- Anonymous visitors get whole rendered responses from the cache, keyed by
+  view, URL arguments and normalized GET parameters (`@cache_anonymous`).
+- Logged-in users share the expensive, user-independent part (the jobs on
+  the page, the next cursor) through `cached()`; their own "applied" state
+  is added after the cache lookup.
+
+Every key embeds the jobs version number, which any Job save or delete
+bumps (see the signals in jobs/models.py): one cache write retires every
+cached page, facet count (jobs/facets.py) and listing at once, and the
+orphaned entries simply expire.
+"""
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+JOBS_VERSION_KEY = "jobs:version"
+
+
+def jobs_version():
+    version = cache.get(JOBS_VERSION_KEY)
+    if version is None:
+        cache.add(JOBS_VERSION_KEY, 1, None)
+        version = cache.get(JOBS_VERSION_KEY, 1)
+    return version
+
+
+def bump_jobs_version():
+    """Retire everything cached under the current jobs version."""
+    try:
+        cache.incr(JOBS_VERSION_KEY)
+    except ValueError:
+        cache.add(JOBS_VERSION_KEY, 1, None)
+
+
+def normalized_query(params):
+    """GET parameters in a canonical order, blank values dropped."""
+    items = sorted(
+        (key, value)
+        for key in params
+        for value in params.getlist(key)
+        if value.strip()
+    )
+    return urlencode(items)
+
+
+def cache_key(prefix, *parts):
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f"{prefix}:{jobs_version()}:{digest}"
+
+
+def timeout():
+    return getattr(settings, "JOB_PAGE_CACHE_TIMEOUT", 600)
+
+
+def cached(prefix, parts, compute):
+    """`compute()`, cached under `prefix` + `parts` for the current jobs version."""
+    key = cache_key(prefix, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout())
+    return value
+
+
+def cache_anonymous(view):
+    """
+    Serve GET requests from anonymous users from the cache. Responses that
+    aren't 200, or that embed a CSRF token, are never stored.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        key = cache_key(f"page:{view.__name__}", args, sorted(kwargs.items()), normalized_query(request.GET))
+        response = cache.get(key)
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            if (response.status_code == 200 and not response.streaming
+                    and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")):
+                cache.set(key, response, timeout())
+        return response
+
+    return wrapper
@@ -0,0 +1,202 @@
+# jobs/search.py
+"""
+Full-text search over Job.title / company / description / requirements.
+
+On SQLite the text lives in an FTS5 index (`jobs_job_fts`, rowid = job id,
+created by migration 0007). It's kept in sync by the Job post_save /
+post_delete signals (see jobs/models.py); `manage.py rebuild_search_index`
+recreates it from scratch, e.g. after raw SQL or bulk_create imports.
+Querysets reach it through JobSearchEntry, an unmanaged model over the
+virtual table, so a search is an ordinary ORM join: `match` lookup on its
+hidden table-named column, `bm25()` as an expression.
+
+    Job.objects.search(title="backend dev", requirements="python")
+
+is a normal queryset (chain the salary/remote/visa filters onto it),
+best match first, with a `search_rank` column — BM25, lower is better. `search_job_ids()` returns
+the same ranking as a plain list of ids.
+
+Every word is a prefix match ("dev" finds "developer") and all words must
+match. Other database backends fall back to `icontains`.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Lookup, Q, TextField, Value
+
+FTS_TABLE = "jobs_job_fts"
+FTS_COLUMNS = ("title", "company", "description", "requirements")
+
+# bm25() column weights, in FTS_COLUMNS order: a hit in the title counts
+# ten times as much as one in the description
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_available(using="default"):
+    return connections[using].vendor == "sqlite"
+
+
+# ===============================================================
+# Query building
+# ===============================================================
+def _terms(text):
+    """'Senior  Dev-Ops' -> '"senior"* "dev"* "ops"*' (implicit AND)."""
+    words = _WORD_RE.findall((text or "").lower())
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def build_match(query="", **fields):
+    """
+    FTS5 MATCH expression: `query` against every column, each
+    `column=text` keyword against that column only, all ANDed together.
+    Returns None if there is nothing searchable.
+    """
+    clauses = []
+    terms = _terms(query)
+    if terms:
+        clauses.append(f"({terms})")
+    for column, text in fields.items():
+        if column not in FTS_COLUMNS:
+            raise ValueError(f"Unknown search column: {column}")
+        terms = _terms(text)
+        if terms:
+            clauses.append(f"{{{column}}} : ({terms})")
+    return " AND ".join(clauses) or None
+
+
+def _bm25():
+    return f"bm25({FTS_TABLE}, {', '.join(str(w) for w in COLUMN_WEIGHTS)})"
+
+
+# ===============================================================
+# ORM access to the index
+# ===============================================================
+class SearchDocumentField(TextField):
+    """
+    FTS5's hidden column named after the table (JobSearchEntry.document):
+    the left side of MATCH and the first argument of bm25().
+    """
+
+
+@SearchDocumentField.register_lookup
+class FullTextMatch(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class BM25(Func):
+    """bm25() of the matched row with COLUMN_WEIGHTS; lower is more relevant."""
+    function = "bm25"
+    output_field = FloatField()
+
+    def __init__(self, document):
+        super().__init__(document, *(Value(w) for w in COLUMN_WEIGHTS))
+
+
+# ===============================================================
+# Search API
+# ===============================================================
+def search_queryset(queryset, query="", **fields):
+    """Filter `queryset` to matching jobs, best first (see Job.objects.search)."""
+    if not any((text or "").strip() for text in [query, *fields.values()]):
+        return queryset
+
+    match = build_match(query, **fields) if fts_available(queryset.db) else None
+    if match is None:
+        # No FTS (or only punctuation to search for): plain substring match
+        q = Q()
+        if (query or "").strip():
+            any_column = Q()
+            for column in FTS_COLUMNS:
+                any_column |= Q(**{f"{column}__icontains": query.strip()})
+            q &= any_column
+        for column, text in fields.items():
+            if (text or "").strip():
+                q &= Q(**{f"{column}__icontains": text.strip()})
+        return queryset.filter(q)
+
+    # Join the FTS table (driven by the MATCH, then by primary key) rather
+    # than a `pk IN (SELECT rowid ...)` filter with a correlated bm25()
+    # subquery, which would re-run the MATCH per row (seconds, not
+    # milliseconds, for a common word). search_rank is an annotation, so
+    # keyset pagination can filter on it.
+    return (
+        queryset
+        .filter(search_entry__document__match=match)
+        .annotate(search_rank=BM25(F("search_entry__document")))
+        .order_by("search_rank", "-created_at", "-id")
+    )
+
+
+def search_job_ids(query="", limit=None, using="default", **fields):
+    """Ids of matching jobs (active or not), best match first."""
+    match = build_match(query, **fields)
+    if match is None:
+        return []
+    sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY {_bm25()}, rowid"
+    params = [match]
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+# ===============================================================
+# Index maintenance
+# ===============================================================
+def index_job(job, using="default"):
+    """(Re)index one saved job."""
+    if not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)",
+            [job.pk] + [getattr(job, column) or "" for column in FTS_COLUMNS],
+        )
+
+
+def remove_job(job_id, using="default"):
+    if not fts_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [job_id])
+
+
+def index_jobs_by_id(job_ids, using="default", chunk_size=500):
+    """(Re)index many jobs at once, e.g. after bulk_create."""
+    if not fts_available(using):
+        return
+    job_ids = list(job_ids)
+    columns = ", ".join(FTS_COLUMNS)
+    with connections[using].cursor() as cursor:
+        for i in range(0, len(job_ids), chunk_size):
+            chunk = job_ids[i:i + chunk_size]
+            marks = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({marks})", chunk)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+                f"SELECT id, {columns} FROM jobs_job WHERE id IN ({marks})",
+                chunk,
+            )
+
+
+def rebuild_index(using="default"):
+    """Drop every entry and re-index all jobs in one statement. Returns the count."""
+    if not fts_available(using):
+        return 0
+    columns = ", ".join(FTS_COLUMNS)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM jobs_job")
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
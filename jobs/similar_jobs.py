@@ -0,0 +1,227 @@
+# jobs/similar_jobs.py
+"""
+"People who applied to this job also applied to ..." (item-to-item
+collaborative filtering over Application rows).
+
+The sparse job-by-job co-application matrix lives in JobCoApplication:
+cell (a, b) counts the seekers who applied to both, the diagonal (a, a)
+the seekers who applied to a. A job's similar jobs are the ones with the
+highest cosine similarity of their applicant sets,
+
+    count(a, b) / sqrt(count(a, a) * count(b, b)),
+
+precomputed into SimilarJob so job_detail reads them with one indexed
+query (`similar_jobs()`).
+
+`update_similar_jobs()` (`manage.py update_similar_jobs`, run it from cron,
+one run at a time) only reads the applications made since the previous
+run (SimilarJobsRun is the watermark), a chunk at a time: each new
+application pairs with the same seeker's earlier ones, and the chunk's
+increments are upserted and committed together with the watermark and
+the ids of the jobs whose matrix rows changed, so memory stays bounded by
+the chunk whatever the table size. Then only those jobs get their top
+list recomputed, together with their neighbours: a new applicant changes
+a job's diagonal, which every score against it is divided by. If a run
+dies before that, the next one recomputes them.
+
+Withdrawn (deleted) applications stay counted; `--rebuild` recounts
+everything from scratch.
+"""
+import heapq
+import math
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Application, Job, JobCoApplication, SimilarJob, SimilarJobsRun
+from .response_cache import bump_jobs_version
+
+CHUNK_SIZE = 500      # ids per IN (...) list
+MAX_HISTORY = 200     # earlier applications of the same seeker a new one is paired with
+
+
+def per_job():
+    return getattr(settings, "SIMILAR_JOBS_PER_JOB", 10)
+
+
+def min_coapplicants():
+    return getattr(settings, "SIMILAR_JOBS_MIN_COAPPLICANTS", 2)
+
+
+# ==============================
+# Reading
+# ==============================
+def similar_jobs(job_id, limit=5):
+    """The active jobs most often applied to together with `job_id`, best first."""
+    return list(
+        Job.objects
+        .filter(similar_to__job_id=job_id, is_active=True)
+        .order_by("-similar_to__score", "-created_at")[:limit]
+    )
+
+
+# ==============================
+# Co-application matrix
+# ==============================
+def _co_counts(new):
+    """
+    Matrix increments {(job, other): n} for the applications in `new`,
+    (id, applicant_id, job_id) tuples in id order: each one counts on the
+    diagonal and pairs with the same seeker's earlier applications.
+    """
+    applicants = sorted({applicant_id for _, applicant_id, _ in new})
+    last_id = new[-1][0]
+    history = defaultdict(lambda: ([], []))   # applicant -> (application ids, job ids), by id
+    for start in range(0, len(applicants), CHUNK_SIZE):
+        earlier = (
+            Application.objects
+            .filter(applicant_id__in=applicants[start:start + CHUNK_SIZE], id__lte=last_id)
+            .order_by("id")
+            .values_list("id", "applicant_id", "job_id")
+        )
+        for app_id, applicant_id, job_id in earlier.iterator(chunk_size=2000):
+            ids, jobs = history[applicant_id]
+            ids.append(app_id)
+            jobs.append(job_id)
+
+    counts = Counter()
+    for app_id, applicant_id, job_id in new:
+        counts[job_id, job_id] += 1
+        ids, jobs = history[applicant_id]
+        pos = bisect_left(ids, app_id)
+        for other in jobs[max(0, pos - MAX_HISTORY):pos]:
+            counts[job_id, other] += 1
+            counts[other, job_id] += 1
+    return counts
+
+
+def _add_counts(counts):
+    """Add {(job, other): n} to the matrix: one upsert per cell."""
+    qn = connection.ops.quote_name
+    table = qn(JobCoApplication._meta.db_table)
+    sql = (
+        f"INSERT INTO {table} (job_id, other_id, {qn('count')}) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (job_id, other_id) DO UPDATE SET {qn('count')} = {table}.{qn('count')} + excluded.{qn('count')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(job_id, other, n) for (job_id, other), n in counts.items()])
+
+
+# ==============================
+# Top lists
+# ==============================
+def _applicant_counts(job_ids):
+    """The matrix diagonal for `job_ids`: {job_id: applicants}."""
+    job_ids = list(job_ids)
+    counts = {}
+    for start in range(0, len(job_ids), CHUNK_SIZE):
+        counts.update(
+            JobCoApplication.objects
+            .filter(job_id__in=job_ids[start:start + CHUNK_SIZE], other_id=F("job_id"))
+            .values_list("job_id", "count")
+        )
+    return counts
+
+
+def _neighbours(job_ids):
+    """The jobs whose top lists can include one of `job_ids`: co-applied to often enough."""
+    job_ids = list(job_ids)
+    min_count = min_coapplicants()
+    found = set()
+    for start in range(0, len(job_ids), CHUNK_SIZE):
+        found.update(
+            JobCoApplication.objects
+            .filter(job_id__in=job_ids[start:start + CHUNK_SIZE], count__gte=min_count)
+            .exclude(other_id=F("job_id"))
+            .values_list("other_id", flat=True)
+        )
+    return found
+
+
+def rescore_jobs(job_ids):
+    """Recompute the SimilarJob rows of `job_ids` from their matrix rows. Returns the jobs done."""
+    size = per_job()
+    min_count = min_coapplicants()
+    for start in range(0, len(job_ids), CHUNK_SIZE):
+        chunk = job_ids[start:start + CHUNK_SIZE]
+        rows = defaultdict(dict)
+        cells = JobCoApplication.objects.filter(job_id__in=chunk).values_list("job_id", "other_id", "count")
+        for job_id, other, count in cells.iterator(chunk_size=2000):
+            rows[job_id][other] = count
+        applicants = _applicant_counts({other for row in rows.values() for other in row})
+
+        similar = []
+        for job_id, row in rows.items():
+            n = row.get(job_id)
+            if not n:
+                continue
+            best = heapq.nlargest(size, (
+                (count / math.sqrt(n * applicants[other]), other)
+                for other, count in row.items()
+                if other != job_id and count >= min_count and applicants.get(other)
+            ))
+            similar += [SimilarJob(job_id=job_id, similar_id=other, score=score) for score, other in best]
+        with transaction.atomic():
+            SimilarJob.objects.filter(job_id__in=chunk).delete()
+            SimilarJob.objects.bulk_create(similar)
+    return len(job_ids)
+
+
+# ==============================
+# Batch runs
+# ==============================
+def update_similar_jobs(chunk_size=5000, progress=None):
+    """
+    Count the applications made since the last run into the matrix,
+    `chunk_size` at a time, then recompute the top lists of the jobs whose
+    rows changed and of their neighbours. Returns the finished SimilarJobsRun; `progress(run)` is
+    called after every chunk.
+    """
+    previous = SimilarJobsRun.objects.first()
+    run = SimilarJobsRun.objects.create(
+        last_application_id=previous.last_application_id if previous else 0,
+        # A run that crashed after committing chunks left these lists stale
+        changed_job_ids=previous.changed_job_ids if previous and previous.finished_at is None else [],
+    )
+
+    changed = set(run.changed_job_ids)
+    while True:
+        new = list(
+            Application.objects
+            .filter(id__gt=run.last_application_id)
+            .order_by("id")
+            .values_list("id", "applicant_id", "job_id")[:chunk_size]
+        )
+        if not new:
+            break
+        counts = _co_counts(new)
+        changed.update(job_id for job_id, _ in counts)
+        with transaction.atomic():
+            _add_counts(counts)
+            run.last_application_id = new[-1][0]
+            run.applications += len(new)
+            run.changed_job_ids = sorted(changed)
+            run.save(update_fields=["last_application_id", "applications", "changed_job_ids"])
+        if progress:
+            progress(run)
+
+    run.jobs_updated = rescore_jobs(sorted(changed | _neighbours(changed)))
+    run.changed_job_ids = []
+    run.finished_at = timezone.now()
+    run.save(update_fields=["jobs_updated", "changed_job_ids", "finished_at"])
+    if run.jobs_updated:
+        bump_jobs_version()   # cached job_detail pages show the old lists
+    return run
+
+
+def rebuild_similar_jobs(chunk_size=5000, progress=None):
+    """Forget the matrix and every run, and count all applications again."""
+    with transaction.atomic():
+        SimilarJob.objects.all().delete()
+        JobCoApplication.objects.all().delete()
+        SimilarJobsRun.objects.all().delete()
+    return update_similar_jobs(chunk_size, progress)
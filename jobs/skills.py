@@ -0,0 +1,366 @@
+# jobs/skills.py
+"""
+Normalized skills: the free text of Job.title / requirements and
+JobSeekerProfile.skills turned into canonical Skill rows, linked through
+JobSkill / ProfileSkill (an inverted index, skill -> jobs / profiles), so
+skill filters are indexed joins instead of substring scans.
+
+Extraction:
+- text is split into list items on commas, semicolons, slashes, bullets,
+  line breaks and "and" / "or";
+- each item is tokenized like the TF-IDF text (jobs/tfidf.py keeps "c++",
+  "node.js") and canonicalized: aliases resolved, "js" -> "javascript";
+- an item naming a known skill is that skill; otherwise it contributes the
+  known skills it mentions, longest match first ("5+ years of Python" ->
+  python);
+- where new skills may be declared (a profile's skill list, a job's
+  requirements), a short item mentioning no known skill ("Kafka Streams")
+  joins the vocabulary. Titles and search boxes only use known skills.
+
+Links are kept in sync by the Job and JobSeekerProfile post_save signals.
+`manage.py rebuild_skills` recomputes all of them, e.g. after bulk imports
+or so that older jobs pick up skills added to the vocabulary since.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from accounts.models import JobSeekerProfile, ProfileSkill
+
+from .models import Job, JobSkill, Skill
+from .tfidf import tokenize
+
+MAX_SKILL_WORDS = 3
+MAX_SKILL_LENGTH = 50
+CHUNK_SIZE = 500   # names / ids per IN (...) list
+POSTINGS_READ_LIMIT = 2000   # skill filters use IN-subqueries up to this posting list size, probe longer ones
+
+_ITEM_SPLIT_RE = re.compile(r"[,;/|•·\n\r\t]+|\s+(?:and|or|&)\s+", re.IGNORECASE)
+
+# Words that make a list item a sentence about skills rather than a skill
+NOT_SKILL_WORDS = frozenset("""
+    ability able background degree excellent experience experienced familiarity
+    familiar good great knowledge plus preferred proficiency proficient required
+    skill skills strong understanding working year years
+""".split())
+
+ALIASES = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "cpp": "c++",
+    "c plus plus": "c++",
+    "c sharp": "c#",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "ml": "machine learning",
+    "natural language processing": "nlp",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "google cloud platform": "google cloud",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "html5": "html",
+    "css3": "css",
+}
+
+# Vocabulary every install starts with (migration 0015 seeds it)
+COMMON_SKILLS = (
+    "python", "java", "javascript", "typescript", "go", "rust", "c", "c++", "c#", "ruby", "php",
+    "kotlin", "swift", "scala", "r", "sql", "html", "css", "django", "flask", "fastapi",
+    "spring", "rails", "react", "vue", "angular", "node.js", "express", "graphql", "rest",
+    "postgresql", "mysql", "sqlite", "mongodb", "redis", "elasticsearch", "kafka", "spark",
+    "hadoop", "aws", "azure", "google cloud", "docker", "kubernetes", "terraform", "linux",
+    "git", "machine learning", "deep learning", "nlp", "tensorflow", "pytorch", "pandas",
+    "numpy", "excel", "tableau", "power bi", "figma", "photoshop", "project management",
+    "agile", "scrum", "seo", "salesforce", "accounting", "customer service",
+)
+
+
+# ==============================
+# Text -> skill names (no database)
+# ==============================
+def canonical(words):
+    """Canonical skill name for a token sequence: ['JS'] -> 'javascript'."""
+    name = " ".join(words)
+    return ALIASES.get(name, name)
+
+
+def item_words(text):
+    """The list items of `text`, each as its tokens."""
+    items = []
+    for item in _ITEM_SPLIT_RE.split(text or ""):
+        words = tokenize(item)
+        if words:
+            items.append(words)
+    return items
+
+
+def lookup_names(items):
+    """Every name worth looking up for `items`: their n-grams up to MAX_SKILL_WORDS."""
+    names = set()
+    for words in items:
+        for n in range(1, min(MAX_SKILL_WORDS, len(words)) + 1):
+            for i in range(len(words) - n + 1):
+                names.add(canonical(words[i:i + n]))
+    return names
+
+
+def longest_matches(words, known):
+    """Known skills mentioned in `words`, longest match first, left to right."""
+    found, i = [], 0
+    while i < len(words):
+        for n in range(min(MAX_SKILL_WORDS, len(words) - i), 0, -1):
+            name = canonical(words[i:i + n])
+            if name in known:
+                found.append(name)
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def _declarable(words, name):
+    return (
+        len(words) <= MAX_SKILL_WORDS
+        and len(name) <= MAX_SKILL_LENGTH
+        and not any(w in NOT_SKILL_WORDS or w[0].isdigit() for w in words)
+    )
+
+
+def pick_skills(items, known, declare=False):
+    """
+    (known skill names in `items`, new names they declare) — new names
+    only with `declare`, for items that mention no known skill at all.
+    """
+    found, new = set(), set()
+    for words in items:
+        name = canonical(words)
+        if name in known:
+            found.add(name)
+            continue
+        matches = longest_matches(words, known)
+        found.update(matches)
+        if declare and not matches and _declarable(words, name):
+            new.add(name)
+    return found, new
+
+
+# ==============================
+# Vocabulary (Skill table)
+# ==============================
+class Vocabulary:
+    """
+    Canonical skill name -> Skill id, looked up and extended through
+    `skill_model` (migrations pass their historical model). `preload`
+    reads the whole table once, for rebuilds.
+    """
+
+    def __init__(self, skill_model=Skill, preload=False):
+        self.model = skill_model
+        self.complete = preload
+        self.ids = dict(skill_model.objects.values_list("name", "id")) if preload else {}
+
+    def _fetch(self, names):
+        names = list(names)
+        for start in range(0, len(names), CHUNK_SIZE):
+            self.ids.update(
+                self.model.objects.filter(name__in=names[start:start + CHUNK_SIZE]).values_list("name", "id")
+            )
+
+    def known(self, names):
+        if not self.complete:
+            self._fetch(n for n in names if n not in self.ids)
+        return {n for n in names if n in self.ids}
+
+    def add(self, names):
+        self.model.objects.bulk_create([self.model(name=n) for n in names], ignore_conflicts=True)
+        self._fetch(names)
+
+    def skills_in(self, text, declare=False):
+        """Skill ids for `text`, adding the skills it declares to the vocabulary if `declare`."""
+        items = item_words(text)
+        found, new = pick_skills(items, self.known(lookup_names(items)), declare)
+        if new:
+            self.add(new)
+        return {self.ids[name] for name in found | new}
+
+    def parse_query(self, text):
+        """
+        Skill ids named in a search box, and the items in it that name no
+        known skill, as typed: 'JS, cobol' -> ({<javascript>}, ["cobol"]).
+        """
+        items = [(item.strip(), tokenize(item)) for item in _ITEM_SPLIT_RE.split(text or "")]
+        items = [(item, words) for item, words in items if words]
+        known = self.known(lookup_names([words for _, words in items]))
+        ids, unknown = set(), []
+        for item, words in items:
+            found, _ = pick_skills([words], known)
+            if not found:
+                unknown.append(item)
+            ids.update(self.ids[name] for name in found)
+        return ids, unknown
+
+
+# ==============================
+# Links
+# ==============================
+def _sync_links(link_model, owner_field, owner_id, skill_ids):
+    current = set(link_model.objects.filter(**{owner_field: owner_id}).values_list("skill_id", flat=True))
+    if current == skill_ids:
+        return
+    with transaction.atomic():
+        link_model.objects.filter(**{owner_field: owner_id}, skill_id__in=current - skill_ids).delete()
+        link_model.objects.bulk_create(
+            [link_model(**{owner_field: owner_id}, skill_id=skill_id) for skill_id in skill_ids - current],
+            ignore_conflicts=True,
+        )
+
+
+def job_skill_ids(vocabulary, title, requirements):
+    return vocabulary.skills_in(requirements, declare=True) | vocabulary.skills_in(title)
+
+
+def sync_job_skills(job):
+    """Job post_save: relink the job to the skills in its title and requirements."""
+    _sync_links(JobSkill, "job_id", job.pk, job_skill_ids(Vocabulary(), job.title, job.requirements))
+
+
+def sync_profile_skills(profile):
+    """JobSeekerProfile post_save: relink the profile to the skills it lists."""
+    _sync_links(ProfileSkill, "profile_id", profile.pk, Vocabulary().skills_in(profile.skills, declare=True))
+
+
+def link_new_jobs(jobs, vocabulary=None):
+    """Link jobs inserted with bulk_create (no post_save signal ran) to their skills."""
+    vocabulary = vocabulary or Vocabulary()
+    JobSkill.objects.bulk_create(
+        [JobSkill(job_id=job.pk, skill_id=s) for job in jobs for s in job_skill_ids(vocabulary, job.title, job.requirements)],
+        ignore_conflicts=True,
+    )
+
+
+def _relink_all(rows, link_model, owner_field, skill_ids_for, chunk_size=1000):
+    """Replace the links of every (owner_id, *texts) in `rows`, chunk by chunk. Returns links written."""
+    written = 0
+    owners, links = [], []
+
+    def flush():
+        with transaction.atomic():
+            link_model.objects.filter(**{f"{owner_field}__in": owners}).delete()
+            link_model.objects.bulk_create(links, batch_size=chunk_size)
+
+    for owner_id, *texts in rows.iterator(chunk_size=chunk_size):
+        owners.append(owner_id)
+        links += [link_model(**{owner_field: owner_id}, skill_id=s) for s in skill_ids_for(*texts)]
+        if len(owners) >= chunk_size:
+            flush()
+            written += len(links)
+            owners, links = [], []
+    if owners:
+        flush()
+        written += len(links)
+    return written
+
+
+def link_profiles(skill_model, profile_model, link_model):
+    """Relink every profile; model classes are parameters so migrations can pass theirs."""
+    vocabulary = Vocabulary(skill_model, preload=True)
+    rows = profile_model.objects.order_by("id").values_list("id", "skills")
+    return _relink_all(rows, link_model, "profile_id", lambda skills: vocabulary.skills_in(skills, declare=True))
+
+
+def link_jobs(skill_model, job_model, link_model):
+    """Relink every job; model classes are parameters so migrations can pass theirs."""
+    vocabulary = Vocabulary(skill_model, preload=True)
+    rows = job_model.objects.order_by("id").values_list("id", "title", "requirements")
+    return _relink_all(rows, link_model, "job_id", lambda title, req: job_skill_ids(vocabulary, title, req))
+
+
+def rebuild_skills():
+    """Recompute every job's and profile's skill links; returns (profile links, job links)."""
+    return (
+        link_profiles(Skill, JobSeekerProfile, ProfileSkill),
+        link_jobs(Skill, Job, JobSkill),
+    )
+
+
+# ==============================
+# Filters
+# ==============================
+def _known_skills_q(link_model, owner_field, ids, match_all):
+    """
+    Small posting lists filter through a `pk IN (SELECT owner ...)` subquery
+    on the (skill, owner) index; large ones become per-row EXISTS probes of
+    it, so a common skill doesn't make the database collect and sort
+    thousands of ids just to show the newest page.
+    """
+    sizes = dict(
+        link_model.objects.filter(skill_id__in=ids)
+        .values_list("skill_id")
+        .annotate(n=Count("pk"))
+    )
+
+    def posted(skill_ids):
+        return Q(pk__in=link_model.objects.filter(skill_id__in=skill_ids).values(owner_field))
+
+    def probe(skill_id):
+        return Q(Exists(link_model.objects.filter(skill_id=skill_id, **{owner_field: OuterRef("pk")})))
+
+    if not match_all:
+        if sum(sizes.values()) <= POSTINGS_READ_LIMIT:
+            return posted(ids)
+        q = Q(pk__in=[])
+        for skill_id in sizes:
+            q |= probe(skill_id)
+        return q
+
+    if len(sizes) < len(ids):
+        return Q(pk__in=[])   # one of the skills has no jobs / profiles
+    rarest, *others = sorted(sizes, key=sizes.get)
+    q = posted([rarest]) if sizes[rarest] <= POSTINGS_READ_LIMIT else probe(rarest)
+    for skill_id in others:
+        q &= probe(skill_id)
+    return q
+
+
+def _skill_q(link_model, owner_field, text_field, text, match_all):
+    """
+    Known skills go through the index; items naming no known skill fall
+    back to a substring match on the owner's free text (`text_field`).
+    """
+    ids, unknown = Vocabulary().parse_query(text)
+    parts = [_known_skills_q(link_model, owner_field, ids, match_all)] if ids else []
+    parts += [Q(**{f"{text_field}__icontains": item}) for item in unknown]
+    if not parts:
+        return Q(pk__in=[])
+    q = parts[0]
+    for part in parts[1:]:
+        q = q & part if match_all else q | part
+    return q
+
+
+def jobs_with_skills_q(text, match_all=True):
+    """
+    Q for jobs having all (or, `match_all=False`, any) of the skills named in
+    `text`; items that aren't known skills are looked for in the requirements.
+    """
+    return _skill_q(JobSkill, "job_id", "requirements", text, match_all)
+
+
+def profiles_with_skills_q(text, match_all=True):
+    """Q for profiles having all (or any) of the skills named in `text` (unknown ones: in the skills text)."""
+    return _skill_q(ProfileSkill, "profile_id", "skills", text, match_all)
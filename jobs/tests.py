@@ -1,3 +1,1530 @@
-from django.test import TestCase
+import io
+import json
+import math
+import random
+import subprocess
+import sys
+from unittest import mock
 
-# Create your tests here.
+import requests
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import JobSeekerProfile, User
+from messaging.fanout import run_pending_fanouts
+from messaging.models import JobNotification, JobNotificationFanout
+from .application_counts import COUNTER_FIELDS, reconcile_counts
+from .importer import import_jobs
+from .gazetteer import Gazetteer, build_index, city_key, get_gazetteer
+from .facets import compute_facets, filtered_jobs, job_facets, normalize_filters
+from .funnel import funnel_summary, rebuild_funnels
+from .applied_jobs import applied_job_ids, has_applied
+from .geo import (
+    EARTH_RADIUS_MILES, bounding_box, covering_geohashes, decode_geohash_center, encode_geohash, geohash_cell_size,
+    haversine_distance,
+)
+from .job_index import get_job_index, reset_job_index
+from .kanban import move_applications
+from .response_cache import bump_jobs_version, jobs_version
+from .locations import location_key
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .geocoding_client import CircuitBreaker, CircuitOpenError, GeocodingClient, GeocodingError
+from .geocoding import (
+    _write_result, clear_memory_cache, geocode, normalize_address, resolve_addresses, resolve_pending_jobs,
+    resolve_pending_profiles,
+)
+from .map_clusters import rebuild_cells
+from .models import (
+    Application, ApplicationStatusEvent, FunnelRollup, GeocodeCacheEntry, Job, JobCoApplication, JobMapCell, JobRecommendation,
+    SimilarJob,
+)
+from .recommendations import (
+    dashboard_jobs, offer_pending_nearby_jobs, recommended_jobs, refresh_all_nearby, refresh_skill_matches,
+)
+from .recruiter_pins import build_recruiter_pins, recruiter_pins
+from .search import search_job_ids
+from .similar_jobs import rebuild_similar_jobs, similar_jobs, update_similar_jobs
+from .skills import rebuild_skills
+from .tfidf import idf_table, tokenize, top_k, inverted_index, vectorize
+
+
+class FakeGeocoder:
+    """Local stand-in for the Google geocoder: a dict of address -> (lat, lng)."""
+
+    def __init__(self, known):
+        self.known = known
+        self.calls = []
+
+    def __call__(self, address):
+        self.calls.append(address)
+        return self.known.get(address, (None, None))
+
+
+def destination(lat, lng, bearing, miles):
+    """The point `miles` from (lat, lng) along `bearing` (degrees), on the haversine sphere."""
+    d = miles / EARTH_RADIUS_MILES
+    lat1, lng1, theta = math.radians(lat), math.radians(lng), math.radians(bearing)
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(theta))
+    lng2 = lng1 + math.atan2(math.sin(theta) * math.sin(d) * math.cos(lat1),
+                             math.cos(d) - math.sin(lat1) * math.sin(lat2))
+    return math.degrees(lat2), (math.degrees(lng2) + 540) % 360 - 180
+
+
+def points_around(lat, lng, miles, n=400, seed=0):
+    """Random points in and just outside the circle, the rim densely sampled."""
+    rng = random.Random(seed)
+    points = [destination(lat, lng, rng.uniform(0, 360), miles * rng.uniform(0, 1.2)) for _ in range(n)]
+    points += [destination(lat, lng, b / 2, miles * 0.999) for b in range(720)]
+    return points
+
+
+# (lat, lng, miles): ordinary, high-latitude, near the pole, huge, across ±180°
+RADIUS_CASES = [
+    (33.749, -84.388, 50),
+    (60.0, 10.0, 500),
+    (75.0, -170.0, 500),
+    (85.0, 0.0, 100),
+    (45.0, 179.0, 2000),
+    (-60.0, 0.0, 500),
+]
+
+
+class BoundingBoxTests(SimpleTestCase):
+    def in_box(self, box, lat, lng):
+        south, north, west, east = box
+        in_lng = west <= lng <= east if west <= east else (lng >= west or lng <= east)
+        return south <= lat <= north and in_lng
+
+    def test_box_holds_every_point_in_the_circle(self):
+        for lat, lng, miles in RADIUS_CASES:
+            box = bounding_box(lat, lng, miles)
+            missed = [
+                (p_lat, p_lng) for p_lat, p_lng in points_around(lat, lng, miles)
+                if haversine_distance(lat, lng, p_lat, p_lng) <= miles and not self.in_box(box, p_lat, p_lng)
+            ]
+            self.assertEqual(missed, [], f"bbox misses around {(lat, lng, miles)}")
+
+    def test_box_is_tight_away_from_the_poles(self):
+        # The box's east edge is the circle's easternmost point, not `miles` along the parallel
+        south, north, west, east = bounding_box(60.0, 10.0, 500)
+        rim = max(destination(60.0, 10.0, b / 10, 500)[1] for b in range(900))
+        self.assertAlmostEqual(east, rim, delta=0.01)
+        self.assertEqual(bounding_box(85.0, 0.0, 400)[2:], (-180.0, 180.0))   # reaches the pole
+
+    def test_covering_cells_hold_every_point_in_the_circle(self):
+        for lat, lng, miles in RADIUS_CASES:
+            precision = 5 if miles <= 50 else 2
+            cells = set(covering_geohashes(*bounding_box(lat, lng, miles), precision=precision, max_cells=10**6))
+            missed = [
+                (p_lat, p_lng) for p_lat, p_lng in points_around(lat, lng, miles)
+                if haversine_distance(lat, lng, p_lat, p_lng) <= miles
+                and encode_geohash(p_lat, p_lng, precision) not in cells
+            ]
+            self.assertEqual(missed, [], f"cells miss around {(lat, lng, miles)}")
+
+    def test_geohash_round_trip(self):
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")   # the reference example
+        lat, lng = decode_geohash_center(encode_geohash(33.749, -84.388))
+        cell_lat, cell_lng = geohash_cell_size()
+        self.assertLessEqual(abs(lat - 33.749), cell_lat / 2)
+        self.assertLessEqual(abs(lng + 84.388), cell_lng / 2)
+        self.assertIsNone(covering_geohashes(*bounding_box(33.749, -84.388, 500)))   # too many cells
+
+
+class WithinRadiusTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+
+    def make_jobs(self, points):
+        return [
+            Job.objects.create(recruiter=self.recruiter, title="Dev", description="d", latitude=lat, longitude=lng)
+            for lat, lng in points
+        ]
+
+    def test_matches_brute_force_distances(self):
+        for i, (lat, lng, miles) in enumerate(RADIUS_CASES):
+            Job.objects.all().delete()
+            jobs = self.make_jobs(points_around(lat, lng, miles, n=40, seed=i)[:40] + [
+                destination(lat, lng, bearing, miles * 0.999) for bearing in (0, 60, 90, 120, 180, 270)
+            ])
+            expected = sorted(
+                (haversine_distance(lat, lng, job.latitude, job.longitude), job.id) for job in jobs
+                if haversine_distance(lat, lng, job.latitude, job.longitude) <= miles
+            )
+            found = list(Job.objects.within_radius(lat, lng, miles))
+            self.assertEqual([job.id for job in found], [job_id for _, job_id in expected], (lat, lng, miles))
+            for job, (distance, _) in zip(found, expected):
+                self.assertAlmostEqual(job.distance_miles, distance, places=6)
+
+    def test_limit_and_missing_coordinates(self):
+        near, middle, far = self.make_jobs([(33.76, -84.39), (33.9, -84.4), (34.5, -84.4)])
+        self.make_jobs([(None, None), (33.749, None)])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(list(Job.objects.within_radius(33.749, -84.388, 100)[:2]), [near, middle])
+        self.assertEqual(len(queries), 1)
+        self.assertIn("HAVERSINE_MILES", queries[0]["sql"])   # the registered SQLite function
+        self.assertIn("LIMIT 2", queries[0]["sql"])
+        self.assertEqual(Job.objects.within_radius(33.749, -84.388, 100).count(), 3)
+        self.assertEqual(list(Job.objects.filter(pk=far.pk).within_radius(33.749, -84.388, 20)), [])
+
+
+@override_settings(GEOCODER_BACKEND="google")
+class BackgroundGeocodingTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+
+    def make_job(self, **kwargs):
+        fields = {"title": "Dev", "description": "d", "city": "Atlanta", "state": "GA", "country": "USA"}
+        fields.update(kwargs)
+        return Job.objects.create(recruiter=self.recruiter, **fields)
+
+    def test_save_queues_job_without_calling_the_api(self):
+        with mock.patch("jobs.geocoding.google_geocode") as http_get:
+            job = self.make_job()
+        http_get.assert_not_called()
+        self.assertEqual(job.geocode_status, Job.GEOCODE_PENDING)
+        self.assertIsNone(job.latitude)
+
+    def test_job_without_address_is_not_queued(self):
+        job = self.make_job(city="", state="", country="")
+        self.assertEqual(job.geocode_status, Job.GEOCODE_NONE)
+
+    def test_worker_writes_coordinates_and_geohash(self):
+        job = self.make_job()
+        geocoder = FakeGeocoder({"Atlanta, GA, USA": (33.749, -84.388)})
+
+        stats = resolve_pending_jobs(geocoder=geocoder)
+
+        job.refresh_from_db()
+        self.assertEqual(stats["geocoded"], 1)
+        self.assertEqual(job.geocode_status, Job.GEOCODE_OK)
+        self.assertEqual((job.latitude, job.longitude), (33.749, -84.388))
+        self.assertEqual(job.geohash, encode_geohash(33.749, -84.388))
+
+    def test_shared_addresses_are_geocoded_once(self):
+        for _ in range(3):
+            self.make_job()
+        geocoder = FakeGeocoder({"Atlanta, GA, USA": (33.749, -84.388)})
+
+        stats = resolve_pending_jobs(geocoder=geocoder, batch_size=2)
+
+        self.assertEqual(stats["geocoded"], 3)
+        self.assertEqual(len(geocoder.calls), 1)  # later batches hit the cache
+
+    def test_unknown_address_is_marked_failed(self):
+        job = self.make_job(city="Nowhere")
+        resolve_pending_jobs(geocoder=FakeGeocoder({}))
+        job.refresh_from_db()
+        self.assertEqual(job.geocode_status, Job.GEOCODE_FAILED)
+
+    def test_failed_lookup_after_address_change_clears_the_old_point(self):
+        job = self.make_job()
+        resolve_pending_jobs(geocoder=FakeGeocoder({"Atlanta, GA, USA": (33.749, -84.388)}))
+        self.assertTrue(JobMapCell.objects.exists())
+
+        job.refresh_from_db()
+        job.city = "Nowhere"
+        job.save()
+        self.assertEqual(job.geocode_status, Job.GEOCODE_PENDING)
+        stats = resolve_pending_jobs(geocoder=FakeGeocoder({}))
+
+        job.refresh_from_db()
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual((job.geocode_status, job.latitude, job.longitude, job.geohash),
+                         (Job.GEOCODE_FAILED, None, None, ""))
+        self.assertFalse(JobMapCell.objects.exists())
+
+    def test_geocoder_errors_leave_job_pending(self):
+        job = self.make_job()
+
+        def broken(address):
+            raise ConnectionError("maps api down")
+
+        with self.assertLogs("jobs.geocoding", level="ERROR"):
+            stats = resolve_pending_jobs(geocoder=broken)
+        job.refresh_from_db()
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(job.geocode_status, Job.GEOCODE_PENDING)
+
+    def test_address_edited_during_lookup_stays_pending(self):
+        job = self.make_job()
+        # The recruiter changes the address while the old one is being looked up
+        Job.objects.filter(pk=job.pk).update(location="Boston, MA, USA")
+
+        outcome = _write_result(job.pk, "Atlanta, GA, USA", 33.749, -84.388)
+
+        job.refresh_from_db()
+        self.assertEqual(outcome, "skipped")
+        self.assertEqual(job.geocode_status, Job.GEOCODE_PENDING)
+        self.assertIsNone(job.latitude)
+
+
+@override_settings(GEOCODER_BACKEND="google")
+class GeocodeCacheTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+
+    def test_address_key_is_normalized(self):
+        self.assertEqual(normalize_address("  Atlanta ,GA,   USA "), "atlanta, ga, usa")
+
+    def test_hits_are_served_from_cache(self):
+        geocoder = FakeGeocoder({"Atlanta, GA": (33.749, -84.388)})
+        self.assertEqual(geocode("Atlanta, GA", provider=geocoder), (33.749, -84.388))
+        self.assertEqual(geocode("atlanta,  ga", provider=geocoder), (33.749, -84.388))
+        self.assertEqual(len(geocoder.calls), 1)
+
+        # A fresh process (empty LRU) still gets it from the table
+        clear_memory_cache()
+        self.assertEqual(geocode("Atlanta, GA", provider=geocoder), (33.749, -84.388))
+        self.assertEqual(len(geocoder.calls), 1)
+
+    @override_settings(GEOCODER_BACKEND="google")
+    def test_batch_resolve_uses_the_cache_and_leaves_out_errors(self):
+        geocoder = FakeGeocoder({"Atlanta, GA": (33.749, -84.388)})
+        geocode("Atlanta, GA", provider=geocoder)
+
+        def flaky(address):
+            if address == "Down, ZZ":
+                raise GeocodingError("down")
+            return geocoder(address)
+
+        stats = {"offline": 0, "cached": 0, "api_calls": 0}
+        results = resolve_addresses(["Atlanta, GA", "Nowhere, ZZ", "Down, ZZ"], flaky, stats=stats)
+        self.assertEqual(results, {"Atlanta, GA": (33.749, -84.388), "Nowhere, ZZ": (None, None)})
+        self.assertEqual(stats, {"offline": 0, "cached": 1, "api_calls": 2})
+
+    def test_misses_are_cached_until_their_ttl_expires(self):
+        geocoder = FakeGeocoder({})
+        self.assertEqual(geocode("Nowhere, ZZ", provider=geocoder), (None, None))
+        self.assertEqual(geocode("Nowhere, ZZ", provider=geocoder), (None, None))
+        self.assertEqual(len(geocoder.calls), 1)
+
+        GeocodeCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        clear_memory_cache()
+        geocode("Nowhere, ZZ", provider=geocoder)
+        self.assertEqual(len(geocoder.calls), 2)
+
+    def test_pipeline_reuses_cached_failures(self):
+        recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        Job.objects.create(recruiter=recruiter, title="a", description="d", city="Nowhere")
+        geocoder = FakeGeocoder({})
+        resolve_pending_jobs(geocoder=geocoder)
+
+        job = Job.objects.create(recruiter=recruiter, title="b", description="d", city="Nowhere")
+        stats = resolve_pending_jobs(geocoder=geocoder)
+
+        job.refresh_from_db()
+        self.assertEqual(job.geocode_status, Job.GEOCODE_FAILED)
+        self.assertEqual(stats["api_calls"], 0)
+        self.assertEqual(len(geocoder.calls), 1)
+
+
+class GazetteerTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+        self.gazetteer = get_gazetteer()
+
+    def test_city_state_and_zip_lookups(self):
+        atlanta = self.gazetteer.lookup(city="Atlanta", state="Georgia", country="United States")
+        self.assertEqual(atlanta, self.gazetteer.lookup(city=" atlanta ", state="GA", country="USA"))
+        self.assertAlmostEqual(atlanta[0], 33.749, places=3)
+        self.assertIsNotNone(self.gazetteer.lookup(zip_code="30332"))
+        self.assertIsNone(self.gazetteer.lookup(city="Atlantis", state="GA"))
+
+    def test_one_line_addresses(self):
+        self.assertEqual(
+            self.gazetteer.lookup_address("Atlanta, GA, 30332, USA"),
+            self.gazetteer.lookup(zip_code="30332"),
+        )
+        self.assertIsNotNone(self.gazetteer.lookup_address("London, UK"))
+        self.assertIsNotNone(self.gazetteer.lookup_address("Los Angeles, CA"))
+
+    def test_index_round_trip(self):
+        index = Gazetteer(build_index([(city_key("Testville", "TX"), 30.5, -97.25)]))
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.lookup(city="Testville", state="Texas"), (30.5, -97.25))
+
+    @override_settings(GEOCODER_BACKEND="gazetteer_only")
+    def test_offline_backend_never_calls_the_provider(self):
+        recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        job = Job.objects.create(recruiter=recruiter, title="a", description="d",
+                                 street_address="1 Main St", city="Atlanta", state="GA", country="USA")
+        geocoder = FakeGeocoder({})
+
+        stats = resolve_pending_jobs(geocoder=geocoder)
+
+        job.refresh_from_db()
+        self.assertEqual(geocoder.calls, [])
+        self.assertEqual(stats["offline"], 1)
+        self.assertEqual(job.geocode_status, Job.GEOCODE_OK)
+
+    @override_settings(GEOCODER_BACKEND="gazetteer_first", GOOGLE_MAPS_API_KEY="test-key")
+    def test_street_addresses_use_the_provider_with_centroid_fallback(self):
+        geocoder = FakeGeocoder({"1 Main St, Atlanta, GA": (33.7501, -84.3901)})
+        self.assertEqual(geocode("1 Main St, Atlanta, GA", provider=geocoder), (33.7501, -84.3901))
+        self.assertEqual(geocode("Atlanta, GA", provider=geocoder),
+                         self.gazetteer.lookup(city="Atlanta", state="GA"))
+        # Street unknown to the provider: city centroid
+        self.assertEqual(geocode("9 Nowhere Ln, Atlanta, GA", provider=geocoder),
+                         self.gazetteer.lookup(city="Atlanta", state="GA"))
+        self.assertEqual(len(geocoder.calls), 2)
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self.payload
+
+
+class GeocodingClientTests(TestCase):
+    def make_client(self, *responses, threshold=2):
+        session = mock.Mock()
+        session.get.side_effect = list(responses)
+        self.now = 0.0
+        breaker = CircuitBreaker(failure_threshold=threshold, reset_timeout=30, clock=lambda: self.now)
+        return GeocodingClient("test-key", session=session, breaker=breaker)
+
+    def test_simplified_query_reuses_the_session_with_timeouts(self):
+        client = self.make_client(
+            FakeResponse({"status": "ZERO_RESULTS", "results": []}),
+            FakeResponse({"status": "OK", "results": [{"geometry": {"location": {"lat": 41.5, "lng": -73.4}}}]}),
+        )
+        self.assertEqual(client.geocode("4 Birch Rd, New Milford, CT"), (41.5, -73.4))
+
+        calls = client.session.get.call_args_list
+        self.assertEqual([c.kwargs["params"]["address"] for c in calls], ["4 Birch Rd, New Milford, CT", "New Milford, CT"])
+        self.assertTrue(all(c.kwargs["timeout"] == client.timeout for c in calls))
+        stats = client.stats()
+        self.assertEqual((stats["requests"], stats["ok"], stats["zero_results"]), (2, 1, 1))
+
+    def test_breaker_opens_after_repeated_failures_and_recovers(self):
+        client = self.make_client(
+            requests.Timeout("read timed out"),
+            FakeResponse({"status": "UNKNOWN_ERROR"}),
+            FakeResponse({"status": "ZERO_RESULTS"}),
+        )
+        for _ in range(2):
+            with self.assertRaises(GeocodingError):
+                client.geocode("Atlanta")
+        with self.assertRaises(CircuitOpenError):
+            client.geocode("Atlanta")
+        self.assertEqual(client.session.get.call_count, 2)
+        self.assertEqual(client.stats()["short_circuited"], 1)
+
+        self.now += 31      # reset timeout elapsed: one trial request closes it
+        self.assertEqual(client.geocode("Atlanta"), (None, None))
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_malformed_bodies_count_as_failures(self):
+        client = self.make_client(
+            FakeResponse(["not", "an", "object"]),
+            FakeResponse("a string"),
+            FakeResponse({"status": "OK", "results": [{"geometry": {}}]}),
+            FakeResponse({"status": "OK", "results": [{"geometry": {"location": {"lat": 33.7, "lng": -84.4}}}]}),
+            threshold=1,
+        )
+        with self.assertRaises(GeocodingError):
+            client.geocode("Atlanta")
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        # A bad body on the half-open trial reopens the breaker instead of wedging it
+        for _ in range(2):
+            self.now += 31
+            with self.assertRaises(GeocodingError):
+                client.geocode("Atlanta")
+            self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        self.now += 31
+        self.assertEqual(client.geocode("Atlanta"), (33.7, -84.4))
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(client.stats()["errors"], 3)
+
+    @override_settings(GEOCODER_BACKEND="google")
+    def test_provider_outage_is_not_cached_as_a_miss(self):
+        clear_memory_cache()
+
+        def unavailable(address):
+            raise GeocodingError("down")
+
+        self.assertEqual(geocode("Atlanta, GA", provider=unavailable), (None, None))
+        self.assertFalse(GeocodeCacheEntry.objects.exists())
+
+
+class JobSearchTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+
+    def make_job(self, **kwargs):
+        fields = {"title": "Analyst", "description": "d"}
+        fields.update(kwargs)
+        return Job.objects.create(recruiter=self.recruiter, **fields)
+
+    def test_index_follows_save_and_delete(self):
+        job = self.make_job(title="Backend Developer", requirements="Python, Django")
+        self.assertEqual(search_job_ids(title="develop"), [job.id])
+        self.assertEqual(search_job_ids(requirements="django"), [job.id])
+
+        job.title = "Data Engineer"
+        job.save()
+        self.assertEqual(search_job_ids(title="developer"), [])
+        self.assertEqual(search_job_ids(title="engineer"), [job.id])
+
+        job.delete()
+        self.assertEqual(search_job_ids(title="engineer"), [])
+
+    def test_title_matches_rank_above_description_matches(self):
+        in_description = self.make_job(title="Analyst", description="Work with our python team")
+        in_title = self.make_job(title="Python Developer", description="Build services")
+        self.assertEqual(search_job_ids("python"), [in_title.id, in_description.id])
+        self.assertEqual(list(Job.objects.search("python")), [in_title, in_description])
+
+    def test_search_intersects_with_other_filters(self):
+        remote = self.make_job(title="Python Developer", remote=True)
+        self.make_job(title="Python Developer", remote=False)
+        self.make_job(title="Nurse", remote=True)
+        qs = Job.objects.filter(remote=True).search(title="python")
+        self.assertEqual(list(qs), [remote])
+
+    def test_punctuation_only_query_falls_back_to_substring_match(self):
+        job = self.make_job(title="C++ Engineer", requirements="c++")
+        self.assertEqual(list(Job.objects.search(requirements="++")), [job])
+
+
+@override_settings(JOB_LIST_PAGE_SIZE=3)
+class JobListPaginationTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.jobs = [
+            Job.objects.create(recruiter=self.recruiter, title=f"Python Developer {i}", description="d")
+            for i in range(7)
+        ]
+        # Several jobs share a timestamp: the id tie-breaker must keep pages exact
+        same_instant = timezone.now()
+        Job.objects.filter(id__in=[j.id for j in self.jobs[2:5]]).update(created_at=same_instant)
+
+    def walk(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, **({"cursor": cursor} if cursor else {}))
+            data = self.client.get("/jobs/api/jobs/", query).json()
+            ids += [row["id"] for row in data["jobs"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                return ids
+
+    def test_api_pages_cover_every_job_once_newest_first(self):
+        expected = list(Job.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(self.walk(), expected)
+
+    def test_search_results_paginate_in_rank_order(self):
+        self.jobs[6].title = "Nurse"
+        self.jobs[6].save()
+        expected = [j.id for j in Job.objects.search(title="python")]
+        self.assertEqual(self.walk(title="python"), expected)
+        self.assertEqual(len(expected), 6)
+
+    def job_list_context(self, **params):
+        """Context job_list renders with (without rendering the site templates)."""
+        with mock.patch("jobs.views.render", return_value=HttpResponse()) as render:
+            self.client.get("/jobs/", params)
+        return render.call_args.args[2]
+
+    def test_html_page_links_to_the_next_cursor(self):
+        context = self.job_list_context()
+        self.assertEqual(len(context["all_jobs"]), 3)
+        self.assertIn("cursor=", context["next_query"])
+
+        context = self.job_list_context(cursor=context["next_cursor"])
+        self.assertEqual([j.id for j in context["all_jobs"]], self.walk()[3:6])
+
+    def test_bad_cursor_is_rejected(self):
+        self.assertEqual(self.client.get("/jobs/api/jobs/", {"cursor": "garbage!"}).status_code, 400)
+        self.assertEqual(len(self.job_list_context(cursor="garbage!")["all_jobs"]), 3)
+
+
+@override_settings(JOB_INDEX_ENABLED=True)
+class JobIndexPaginationTests(JobListPaginationTests):
+    """The same pages, served from the in-memory job index."""
+
+    def setUp(self):
+        reset_job_index()
+        super().setUp()
+
+    def tearDown(self):
+        reset_job_index()
+
+
+class JobMapClusterTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.client.force_login(self.recruiter)
+
+    def make_job(self, lat, lng, **kwargs):
+        return Job.objects.create(recruiter=self.recruiter, title="Dev", description="d",
+                                  latitude=lat, longitude=lng, **kwargs)
+
+    def cells(self):
+        return {c.cell: (c.job_count, round(c.lat_sum, 6), round(c.lng_sum, 6))
+                for c in JobMapCell.objects.all()}
+
+    def test_cells_follow_job_changes(self):
+        atlanta = self.make_job(33.749, -84.388)
+        self.make_job(33.70, -84.40)
+        self.assertEqual(JobMapCell.objects.get(cell=encode_geohash(33.749, -84.388, 2)).job_count, 2)
+
+        atlanta.latitude, atlanta.longitude = 51.5072, -0.1276   # moved to London
+        atlanta.save()
+        self.assertEqual(JobMapCell.objects.get(cell=encode_geohash(33.749, -84.388, 2)).job_count, 1)
+        self.assertEqual(JobMapCell.objects.get(cell=encode_geohash(51.5072, -0.1276, 2)).job_count, 1)
+
+        atlanta.is_active = False
+        atlanta.save()
+        self.assertFalse(JobMapCell.objects.filter(cell=encode_geohash(51.5072, -0.1276, 1)).exists())
+
+        incremental = self.cells()
+        rebuild_cells()
+        self.assertEqual(self.cells(), incremental)
+
+        Job.objects.all().delete()
+        self.assertFalse(JobMapCell.objects.exists())
+
+    def test_geocoding_worker_updates_cells(self):
+        job = self.make_job(None, None, city="Atlanta", state="GA")
+        _write_result(job.id, job.location, 33.749, -84.388)
+        self.assertEqual(JobMapCell.objects.get(cell=encode_geohash(33.749, -84.388, 5)).job_count, 1)
+
+    @override_settings(JOB_MAP_MAX_PINS=2)
+    def test_viewport_returns_clusters_then_pins(self):
+        for i in range(3):
+            self.make_job(33.7 + i * 0.01, -84.4)
+        self.make_job(40.7, -74.0)   # New York, outside the Atlanta viewport
+        world = {"south": -85, "west": -180, "north": 85, "east": 180, "zoom": 2}
+        data = self.client.get("/jobs/api/jobs-map/", world).json()
+        self.assertEqual(data["mode"], "clusters")
+        self.assertEqual(sum(c["count"] for c in data["clusters"]), 4)
+
+        atlanta = {"south": 33.69, "west": -84.41, "north": 33.715, "east": -84.39, "zoom": 14}
+        data = self.client.get("/jobs/api/jobs-map/", atlanta).json()
+        self.assertEqual(data["mode"], "pins")
+        self.assertEqual(len(data["jobs"]), 2)
+
+        pacific = {"south": -10, "west": 170, "north": 10, "east": -170, "zoom": 5}
+        self.assertEqual(self.client.get("/jobs/api/jobs-map/", pacific).json(), {"mode": "pins", "jobs": []})
+        self.assertEqual(self.client.get("/jobs/api/jobs-map/", {"zoom": 3}).status_code, 400)
+
+
+class RecruiterMapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        self.job = Job.objects.create(recruiter=self.recruiter, title="Dev", description="d",
+                                      latitude=33.749, longitude=-84.388)
+        Job.objects.create(recruiter=self.recruiter, title="Ops", description="d",
+                           latitude=40.7, longitude=-74.0)
+        Job.objects.create(recruiter=self.recruiter, title="Not geocoded", description="d")
+        self.client.force_login(self.recruiter)
+
+    def api(self, mode):
+        return self.client.get("/jobs/api/recruiter-map/", {"mode": mode}).json()["jobs"]
+
+    def test_payload_is_cached_until_an_application_arrives(self):
+        self.assertEqual([p["applicants"] for p in self.api("applicants")], [0, 0])
+        with self.assertNumQueries(0):
+            recruiter_pins(self.recruiter.id)
+
+        Application.objects.create(job=self.job, applicant=self.seeker)
+        counts = {p["id"]: p["applicants"] for p in self.api("applicants")}
+        self.assertEqual(counts[self.job.id], 1)
+        self.assertEqual(json.loads(recruiter_pins(self.recruiter.id)["applicants"])[0]["id"], self.job.id)
+
+    def test_job_changes_invalidate_the_payload(self):
+        self.assertEqual(len(self.api("jobs")), 2)
+        self.job.is_active = False
+        self.job.save()
+        self.assertEqual([p["title"] for p in self.api("jobs")], ["Ops"])
+        self.assertNotIn("applicants", self.api("jobs")[0])
+
+
+    def test_invalidation_from_another_process_is_seen(self):
+        self.assertEqual(len(self.api("jobs")), 2)
+        # What the geocoding worker does: write coordinates with .update(), then drop the pins
+        Job.objects.filter(title="Not geocoded").update(latitude=34.0, longitude=-84.0)
+        subprocess.run(
+            [sys.executable, "-c", "import django; django.setup(); "
+             f"from jobs.recruiter_pins import invalidate_recruiter_pins; invalidate_recruiter_pins({self.recruiter.id})"],
+            cwd=settings.BASE_DIR, check=True,
+        )
+        self.assertEqual(len(self.api("jobs")), 3)
+
+class JobNotificationFanoutTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.seekers = [User.objects.create(username=f"s{i}", role=User.JOB_SEEKER) for i in range(5)]
+        spellings = [("Atlanta", "GA", "USA"), (" atlanta", "Georgia", "United States"), ("ATLANTA", "ga.", "us")]
+        for i, seeker in enumerate(self.seekers):
+            profile = seeker.jobseeker
+            profile.city, profile.state, profile.country = spellings[i % len(spellings)]
+            profile.is_public = i != 4
+            profile.save()
+        other = User.objects.create(username="elsewhere", role=User.JOB_SEEKER).jobseeker
+        other.city, other.state, other.country = "Atlanta", "TX", "USA"
+        other.save()
+        self.client.force_login(self.recruiter)
+
+    def post_job(self):
+        self.client.post("/jobs/new/", {
+            "title": "Dev", "company": "Acme", "city": "Atlanta", "state": "GA", "country": "USA",
+            "employment_type": Job.FULL_TIME, "description": "d", "is_active": "on",
+        })
+        return Job.objects.get(title="Dev")
+
+    def test_posting_only_queues_the_fanout(self):
+        job = self.post_job()
+        self.assertEqual(JobNotification.objects.count(), 0)
+        self.assertEqual(JobNotificationFanout.objects.get(job=job).status, JobNotificationFanout.PENDING)
+
+        progress = []
+        [result] = run_pending_fanouts(chunk_size=2, progress=lambda job_id, n: progress.append(n))
+        self.assertEqual(result["notified"], 4)
+        self.assertEqual(progress, [2, 4])
+        self.assertEqual(
+            set(JobNotification.objects.filter(job=job).values_list("user_id", flat=True)),
+            {u.id for u in self.seekers[:4]},
+        )
+        self.assertEqual(JobNotification.objects.first().text, "New job near you: Dev at Acme in Atlanta")
+        self.assertEqual(JobNotificationFanout.objects.get(job=job).status, JobNotificationFanout.DONE)
+        self.assertEqual(run_pending_fanouts(), [])
+
+    def test_location_key_normalizes_spellings(self):
+        self.assertEqual(
+            set(JobSeekerProfile.objects.filter(user__in=self.seekers).values_list("location_key", flat=True)),
+            {"us|ga|atlanta"},
+        )
+        self.assertEqual(location_key("St. Louis", "Missouri", "U.S.A."), "us|mo|saint louis")
+        self.assertEqual(location_key("Atlanta", "", "USA"), "")
+
+    def test_interrupted_fanout_resumes_after_the_watermark(self):
+        job = self.post_job()
+        first = JobSeekerProfile.objects.filter(user=self.seekers[0]).get()
+        JobNotification.objects.create(user=self.seekers[0], job=job, text="already sent")
+        JobNotificationFanout.objects.filter(job=job).update(last_profile_id=first.id, notified=1)
+
+        [result] = run_pending_fanouts(chunk_size=10)
+        self.assertEqual(result["notified"], 3)
+        self.assertEqual(JobNotificationFanout.objects.get(job=job).notified, 4)
+        self.assertEqual(JobNotification.objects.filter(job=job).count(), 4)
+
+
+class JobFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        for title, remote, visa, etype, max_salary in [
+            ("Python Developer", True, True, Job.FULL_TIME, 120000),
+            ("Python Engineer", False, True, Job.FULL_TIME, 80000),
+            ("Java Developer", True, False, Job.FULL_TIME, 160000),
+            ("Nurse", False, False, Job.PART_TIME, None),
+        ]:
+            Job.objects.create(recruiter=self.recruiter, title=title, description="d", remote=remote,
+                               visa_sponsorship=visa, employment_type=etype, max_salary=max_salary)
+
+    def counts(self, facets, name):
+        return {opt["value"]: opt["count"] for opt in facets[name]}
+
+    def test_all_facets_come_from_one_query(self):
+        filters = normalize_filters({"title": "developer", "remote": "true"})
+        with self.assertNumQueries(1):
+            facets = compute_facets(filters)
+        self.assertEqual(facets["total"], 2)
+        # The remote facet ignores its own filter...
+        self.assertEqual(self.counts(facets, "remote"), {"true": 2, "false": 0})
+        self.assertEqual([o["selected"] for o in facets["remote"]], [True, False])
+        # ...the others apply it
+        self.assertEqual(self.counts(facets, "visa"), {"true": 1, "false": 1})
+        self.assertEqual(self.counts(facets, "salary_min")["100000"], 2)
+        self.assertEqual(self.counts(facets, "employment_type")[Job.FULL_TIME], 2)
+
+        facets = compute_facets(normalize_filters({"salary_min": "100000"}))
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(self.counts(facets, "salary_min"), {"50000": 3, "100000": 2, "150000": 1, "200000": 0})
+
+    def test_results_are_cached_per_normalized_filters(self):
+        self.assertEqual(normalize_filters({"title": "  Python ", "salary_min": "abc", "visa": ""}),
+                         {"title": "python"})
+        first = job_facets({"title": "python"})
+        with self.assertNumQueries(0):
+            self.assertEqual(job_facets({"title": " PYTHON", "salary_min": "abc"}), first)
+
+        Job.objects.create(recruiter=self.recruiter, title="Python Intern", description="d")
+        self.assertEqual(job_facets({"title": "python"})["total"], first["total"] + 1)
+
+    def test_non_finite_salaries_are_ignored(self):
+        for value in ("nan", "NaN", "sNaN", "Infinity", "-inf"):
+            self.assertEqual(normalize_filters({"salary_min": value, "salary_max": value}), {})
+            with mock.patch("jobs.views.render", return_value=HttpResponse()):
+                self.assertEqual(self.client.get("/jobs/", {"salary_min": value}).status_code, 200)
+            self.assertEqual(self.client.get("/jobs/api/jobs/", {"salary_max": value}).status_code, 200)
+
+
+@override_settings(JOB_INDEX_ENABLED=True, JOB_LIST_PAGE_SIZE=50)
+class JobIndexTests(TestCase):
+    def setUp(self):
+        reset_job_index()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        for i in range(40):
+            Job.objects.create(
+                recruiter=self.recruiter, title=f"Job {i}", description="d",
+                remote=i % 2 == 0, visa_sponsorship=i % 3 == 0,
+                employment_type=[Job.FULL_TIME, Job.PART_TIME, Job.CONTRACT][i % 3],
+                min_salary=None if i % 5 == 0 else 40000 + 2500 * i,
+                max_salary=None if i % 5 == 0 else 60000 + 2500 * i,
+                is_active=i % 7 != 0,
+            )
+
+    def tearDown(self):
+        reset_job_index()
+
+    def assertMatchesDatabase(self, params):
+        expected = list(filtered_jobs(normalize_filters(params)).values_list("id", flat=True))
+        ids = get_job_index().page_ids(normalize_filters(params), size=100)
+        self.assertEqual(ids, expected, params)
+
+    def test_filter_combinations_match_the_database(self):
+        for params in [{}, {"remote": "true"}, {"remote": "false", "visa": "true"},
+                       {"employment_type": Job.PART_TIME}, {"salary_min": "100000"},
+                       {"salary_max": "70000", "remote": "true"},
+                       {"salary_min": "90000", "salary_max": "120000", "visa": "false"},
+                       {"salary_min": "1000000"}]:
+            self.assertMatchesDatabase(params)
+
+    def test_signals_keep_the_index_current(self):
+        index = get_job_index()
+        job = Job.objects.filter(is_active=True).first()
+        job.max_salary = 999999
+        job.save()
+        self.assertEqual(index.page_ids({"salary_min": 500000}), [job.id])
+
+        job.is_active = False
+        job.save()
+        new = Job.objects.create(recruiter=self.recruiter, title="New", description="d", max_salary=700000)
+        self.assertEqual(index.page_ids({"salary_min": 500000}), [new.id])
+        new.delete()
+        self.assertEqual(index.page_ids({"salary_min": 500000}), [])
+        self.assertIs(get_job_index(), index)
+        self.assertMatchesDatabase({"remote": "true"})
+
+    def test_geocoding_worker_updates_the_index(self):
+        index = get_job_index()
+        job = Job.objects.create(recruiter=self.recruiter, title="New", description="d", city="Atlanta", state="GA")
+        self.assertEqual(_write_result(job.id, job.location, 33.749, -84.388), "geocoded")
+        pos = index.position(job.id)
+        self.assertEqual((index.columns["latitude"][pos], index.columns["longitude"][pos]), (33.749, -84.388))
+
+    def test_writes_from_other_processes_rebuild_the_index(self):
+        index = get_job_index()
+        job = Job.objects.filter(is_active=True).first()
+        # Another process: writes without this process's signals, then bumps the shared version
+        Job.objects.filter(pk=job.pk).update(max_salary=999999)
+        self.assertEqual(get_job_index().page_ids({"salary_min": 500000}), [])  # nothing bumped yet
+        bump_jobs_version()
+        rebuilt = get_job_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertEqual(rebuilt.page_ids({"salary_min": 500000}), [job.id])
+        self.assertIs(get_job_index(), rebuilt)
+
+    def test_page_hydrates_only_the_visible_jobs(self):
+        get_job_index()
+        with self.assertNumQueries(1):
+            jobs, cursor = get_job_index().page({"remote": True}, size=5)
+        self.assertEqual(len(jobs), 5)
+        self.assertIsNotNone(cursor)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        self.jobs = [Job.objects.create(recruiter=self.recruiter, title=f"Dev {i}", description="d")
+                     for i in range(3)]
+
+    def get(self, url, params=None):
+        with mock.patch("jobs.views.render", return_value=HttpResponse("page")) as render:
+            response = self.client.get(url, params or {})
+        return response, render
+
+    def test_anonymous_pages_are_cached_until_a_job_changes(self):
+        self.get("/jobs/", {"remote": "true", "title": ""})
+        with self.assertNumQueries(0):
+            response, render = self.get("/jobs/", {"title": "", "remote": "true"})
+        self.assertEqual(response.content, b"page")
+        render.assert_not_called()
+
+        detail = f"/jobs/{self.jobs[0].pk}/"
+        self.get(detail)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.get(detail)[1].called)
+
+        self.jobs[1].title = "Renamed"
+        self.jobs[1].save()
+        self.assertTrue(self.get("/jobs/", {"remote": "true"})[1].called)
+        self.assertTrue(self.get(detail)[1].called)
+
+    def test_geocoding_worker_expires_cached_pages(self):
+        job = Job.objects.create(recruiter=self.recruiter, title="Dev", description="d", city="Atlanta", state="GA")
+        detail = f"/jobs/{job.pk}/"
+        self.get(detail)
+        self.assertFalse(self.get(detail)[1].called)
+        _write_result(job.id, job.location, 33.749, -84.388)
+        self.assertTrue(self.get(detail)[1].called)
+
+    def test_version_bumps_from_another_process_are_seen(self):
+        version = jobs_version()
+        subprocess.run(
+            [sys.executable, "-c", "import django; django.setup(); "
+             "from jobs.response_cache import bump_jobs_version; bump_jobs_version()"],
+            cwd=settings.BASE_DIR, check=True,
+        )
+        self.assertNotEqual(jobs_version(), version)
+
+    def test_signed_in_users_share_the_listing_but_not_applied_state(self):
+        self.get("/jobs/")  # warms the shared listing
+        Application.objects.create(job=self.jobs[2], applicant=self.seeker)
+        self.client.force_login(self.seeker)
+
+        _, render = self.get("/jobs/")
+        applied = {job.id: job.applied for job in render.call_args.args[2]["all_jobs"]}
+        self.assertEqual(applied, {self.jobs[0].id: False, self.jobs[1].id: False, self.jobs[2].id: True})
+
+        _, render = self.get(f"/jobs/{self.jobs[2].pk}/")
+        self.assertTrue(render.call_args.args[2]["applied"])
+
+
+class AppliedJobsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        self.jobs = [Job.objects.create(recruiter=self.recruiter, title=f"Dev {i}", description="d")
+                     for i in range(4)]
+        Application.objects.create(job=self.jobs[3], applicant=self.seeker)
+        self.client.force_login(self.seeker)
+
+    def test_applied_ids_are_cached_and_kept_current(self):
+        self.assertEqual(list(applied_job_ids(self.seeker.id)), [self.jobs[3].id])
+        with self.assertNumQueries(0):
+            self.assertTrue(has_applied(self.seeker.id, self.jobs[3].id))
+            self.assertFalse(has_applied(self.seeker.id, self.jobs[0].id))
+
+        Application.objects.create(job=self.jobs[0], applicant=self.seeker)
+        Application.objects.filter(job=self.jobs[3]).delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(list(applied_job_ids(self.seeker.id)), [self.jobs[0].id])
+
+    def test_views_use_the_cached_ids(self):
+        applied_job_ids(self.seeker.id)
+        with mock.patch("jobs.views.render", return_value=HttpResponse()) as render:
+            self.client.get(f"/jobs/{self.jobs[3].pk}/")
+            self.assertTrue(render.call_args.args[2]["applied"])
+
+            self.client.get(f"/jobs/{self.jobs[3].pk}/apply/")
+            self.assertIn("error", render.call_args.args[2])
+
+        self.client.post(f"/jobs/{self.jobs[1].pk}/apply/", {"note": "hi"})
+        self.assertTrue(has_applied(self.seeker.id, self.jobs[1].id))
+
+
+@override_settings(GEOCODER_BACKEND="google", RECOMMENDATIONS_PER_SEEKER=2, RECOMMENDATION_RADIUS_MILES=50)
+class NearbyRecommendationTests(TestCase):
+    def setUp(self):
+        clear_memory_cache()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        # Miles north of downtown Atlanta (33.749, -84.388): ~0.7 per 0.01°
+        self.jobs = {
+            name: Job.objects.create(recruiter=self.recruiter, title=name, description="d",
+                                     latitude=33.749 + offset, longitude=-84.388)
+            for name, offset in [("near", 0.02), ("mid", 0.1), ("far", 0.3), ("other city", 8.0)]
+        }
+        offer_pending_nearby_jobs()
+
+    def geocode_seeker(self):
+        profile = self.seeker.jobseeker
+        profile.city, profile.state, profile.country = "Atlanta", "GA", "USA"
+        profile.save()
+        self.assertEqual(profile.geocode_status, profile.GEOCODE_PENDING)
+        stats = resolve_pending_profiles(geocoder=FakeGeocoder({"Atlanta, GA, USA": (33.749, -84.388)}))
+        self.assertEqual(stats["geocoded"], 1)
+
+    def titles(self):
+        return [job.title for job in recommended_jobs(self.seeker, limit=5)]
+
+    def test_lists_follow_profiles_jobs_and_applications(self):
+        self.assertEqual(self.titles(), [])
+        self.geocode_seeker()
+        self.assertEqual(self.titles(), ["near", "mid"])
+
+        closest = Job.objects.create(recruiter=self.recruiter, title="closest", description="d",
+                                     latitude=33.75, longitude=-84.388)
+        self.assertEqual(self.titles(), ["near", "mid"])   # only queued by the save
+        self.assertEqual(offer_pending_nearby_jobs(), (1, 1))
+        self.assertEqual(self.titles(), ["closest", "near"])
+
+        closest.is_active = False
+        closest.save()
+        self.assertEqual(self.titles(), ["near"])
+
+        Application.objects.create(job=self.jobs["near"], applicant=self.seeker)
+        self.assertEqual(self.titles(), [])
+
+        self.assertEqual(refresh_all_nearby(), (1, 2))
+        self.assertEqual(self.titles(), ["mid", "far"])
+
+    def test_jobs_geocoded_in_the_background_are_offered(self):
+        self.geocode_seeker()
+        job = Job.objects.create(recruiter=self.recruiter, title="pending", description="d",
+                                 city="Atlanta", state="GA", country="USA")
+        _write_result(job.id, job.location, 33.7491, -84.388)
+        job.refresh_from_db()
+        job.is_active = False   # left the map again before the worker got to it
+        job.save()
+        job.is_active = True
+        job.save()
+        self.assertEqual(offer_pending_nearby_jobs(), (1, 1))
+        self.assertEqual(self.titles(), ["pending", "near"])
+        self.assertEqual(offer_pending_nearby_jobs(), (0, 0))
+
+    def test_dashboard_reads_the_precomputed_list(self):
+        self.geocode_seeker()
+        self.client.force_login(self.seeker)
+        with mock.patch("jobs.views.render", return_value=HttpResponse()) as render:
+            self.client.get("/jobs/dashboard/")
+        # Topped up with the newest job
+        self.assertEqual([j.title for j in render.call_args.args[2]["recommended_jobs"]], ["near", "mid", "other city"])
+
+
+@override_settings(RECOMMENDATIONS_PER_SEEKER=2, RECOMMENDATION_MIN_SIMILARITY=0.05)
+class SkillRecommendationTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.backend = self.job("Backend Developer", "Python, Django and PostgreSQL")
+        self.designer = self.job("Product Designer", "Figma, user research")
+        self.analyst = self.job("Data Analyst", "SQL, Excel and Python")
+        self.dev = self.seeker("dev", "python, django, rest apis")
+        self.ux = self.seeker("ux", "Figma; prototyping")
+
+    def job(self, title, requirements):
+        return Job.objects.create(recruiter=self.recruiter, title=title, requirements=requirements,
+                                  description="Join our team.")
+
+    def seeker(self, username, skills):
+        user = User.objects.create(username=username, role=User.JOB_SEEKER)
+        user.jobseeker.skills = skills
+        user.jobseeker.save()
+        return user
+
+    def titles(self, user):
+        return [job.title for job in recommended_jobs(user, limit=5, kind=JobRecommendation.SKILLS)]
+
+    def test_tokenize_keeps_skill_punctuation(self):
+        self.assertEqual(tokenize("C++, C# and Node.js."), ["c++", "c#", "node.js"])
+
+    def test_top_k_ranks_by_cosine_similarity(self):
+        docs = {1: {"python": 2, "django": 2}, 2: {"python": 1, "excel": 3}, 3: {"figma": 1}}
+        idf = idf_table(docs.values())
+        postings = inverted_index({doc_id: vectorize(terms, idf) for doc_id, terms in docs.items()})
+        matches = top_k(vectorize({"python": 1, "django": 1}, idf), postings, k=5)
+        self.assertEqual([doc_id for _, doc_id in matches], [1, 2])
+        self.assertAlmostEqual(matches[0][0], 1.0)
+
+    def test_refresh_rescores_only_what_changed(self):
+        stats = refresh_skill_matches()
+        self.assertEqual((stats["changed_jobs"], stats["changed_seekers"]), (3, 2))
+        self.assertEqual(self.titles(self.dev), ["Backend Developer", "Data Analyst"])
+        self.assertEqual(self.titles(self.ux), ["Product Designer"])
+
+        stats = refresh_skill_matches()
+        self.assertEqual((stats["changed_jobs"], stats["changed_seekers"], stats["rows"]), (0, 0, 0))
+        self.assertEqual(self.titles(self.dev), ["Backend Developer", "Data Analyst"])
+
+        # A new job is offered to the seekers it suits, displacing worse matches
+        self.job("Django Engineer", "Python and Django, REST APIs")
+        self.ux.jobseeker.skills = "Excel, SQL"
+        self.ux.jobseeker.save()
+        stats = refresh_skill_matches()
+        self.assertEqual((stats["changed_jobs"], stats["changed_seekers"], stats["rescored_seekers"]), (1, 1, 1))
+        self.assertEqual(self.titles(self.dev), ["Django Engineer", "Backend Developer"])
+        self.assertEqual(self.titles(self.ux), ["Data Analyst"])
+
+        # Deactivated jobs and applications leave the lists
+        self.backend.is_active = False
+        self.backend.save()
+        refresh_skill_matches()
+        self.assertFalse(JobRecommendation.objects.filter(job=self.backend).exists())
+        Application.objects.create(job=self.analyst, applicant=self.ux)
+        self.assertEqual(self.titles(self.ux), [])
+
+        refresh_skill_matches(full=True)
+        self.assertEqual(self.titles(self.dev), ["Django Engineer", "Data Analyst"])
+
+    def test_dashboards_prefer_skills_matches(self):
+        refresh_skill_matches()
+        self.assertEqual([j.title for j in dashboard_jobs(self.ux)], ["Product Designer", "Data Analyst", "Backend Developer"])
+
+        for url, target in [("/jobs/dashboard/", "jobs.views.render"), ("/accounts/dashboard/jobseeker/", "accounts.views.render")]:
+            self.client.force_login(self.dev)
+            with mock.patch(target, return_value=HttpResponse()) as render:
+                self.client.get(url)
+            self.assertEqual([j.title for j in render.call_args.args[2]["recommended_jobs"]],
+                             ["Backend Developer", "Data Analyst", "Product Designer"])
+
+
+@override_settings(SIMILAR_JOBS_MIN_COAPPLICANTS=2)
+class SimilarJobsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.a, self.b, self.c, self.d = (
+            Job.objects.create(recruiter=recruiter, title=title, description="d") for title in "abcd"
+        )
+        self.seekers = [User.objects.create(username=f"s{i}", role=User.JOB_SEEKER) for i in range(4)]
+
+    def apply(self, seeker, *jobs):
+        for job in jobs:
+            Application.objects.create(job=job, applicant=seeker)
+
+    def matrix(self):
+        return set(JobCoApplication.objects.values_list("job_id", "other_id", "count"))
+
+    def test_batches_count_only_new_applications(self):
+        s1, s2, s3, s4 = self.seekers
+        self.apply(s1, self.a, self.b)
+        self.apply(s2, self.a, self.b, self.c)
+        self.apply(s3, self.c, self.a)
+
+        run = update_similar_jobs(chunk_size=2)
+        self.assertEqual((run.applications, run.jobs_updated), (7, 3))
+        self.assertEqual([j.title for j in similar_jobs(self.a.id)], ["c", "b"])   # tie: newest first
+        self.assertEqual(similar_jobs(self.b.id), [self.a])   # b & c: one seeker only
+
+        run = update_similar_jobs()
+        self.assertEqual((run.applications, run.jobs_updated), (0, 0))
+
+        self.apply(s4, self.b, self.c, self.d)
+        run = update_similar_jobs(chunk_size=2)
+        self.assertEqual((run.applications, run.jobs_updated), (3, 4))   # b, c, d and their neighbour a
+        self.assertEqual(set(similar_jobs(self.b.id)), {self.a, self.c})
+        self.assertEqual(similar_jobs(self.d.id), [])
+
+        # Incremental runs add up to the same matrix as one full count
+        incremental = self.matrix()
+        rebuild_similar_jobs()
+        self.assertEqual(self.matrix(), incremental)
+        self.assertIn((self.b.id, self.c.id, 2), incremental)
+        self.assertIn((self.a.id, self.a.id, 3), incremental)
+
+    def test_neighbours_of_changed_jobs_are_rescored(self):
+        for seeker in self.seekers[:2]:
+            self.apply(seeker, self.a, self.b)
+        update_similar_jobs()
+        self.assertEqual(SimilarJob.objects.get(job=self.b).score, 1.0)
+
+        # A third seeker applies to a alone: only a's row changes, but b's score against a drops
+        self.apply(self.seekers[2], self.a)
+        self.assertEqual(update_similar_jobs().jobs_updated, 2)
+        self.assertAlmostEqual(SimilarJob.objects.get(job=self.b).score, 2 / math.sqrt(2 * 3))
+
+    def test_crashed_run_is_rescored_by_the_next(self):
+        for seeker in self.seekers[:2]:
+            self.apply(seeker, self.a, self.b)
+        with mock.patch("jobs.similar_jobs.rescore_jobs", side_effect=RuntimeError("killed")):
+            with self.assertRaises(RuntimeError):
+                update_similar_jobs(chunk_size=1)
+        self.assertEqual(similar_jobs(self.a.id), [])   # counted, but the lists weren't written
+
+        run = update_similar_jobs()
+        self.assertEqual((run.applications, run.jobs_updated, run.changed_job_ids), (0, 2, []))
+        self.assertEqual(similar_jobs(self.a.id), [self.b])
+        self.assertEqual(update_similar_jobs().jobs_updated, 0)
+
+    def test_job_detail_lists_similar_jobs(self):
+        for seeker in self.seekers[:2]:
+            self.apply(seeker, self.a, self.b)
+        update_similar_jobs()
+        self.b.is_active = False
+        self.b.save()
+        self.apply(self.seekers[2], self.a, self.c)
+        self.apply(self.seekers[3], self.a, self.c)
+        update_similar_jobs()
+
+        with mock.patch("jobs.views.render", return_value=HttpResponse()) as render:
+            self.client.get(f"/jobs/{self.a.id}/")
+        self.assertEqual(render.call_args.args[2]["similar_jobs"], [self.c])
+
+
+class SkillIndexTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+
+    def job(self, title, requirements):
+        return Job.objects.create(recruiter=self.recruiter, title=title, requirements=requirements, description="d")
+
+    def skills(self, owner):
+        return sorted(owner.skill_links.values_list("skill__name", flat=True))
+
+    def filtered(self, **params):
+        return sorted(job.title for job in filtered_jobs(normalize_filters(params)))
+
+    def test_skills_are_extracted_and_canonicalized(self):
+        job = self.job("Senior Python Developer", "5+ years of JS experience; ReactJS and Apache Airflow")
+        self.assertEqual(self.skills(job), ["apache airflow", "javascript", "python", "react"])
+
+        seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        profile = seeker.jobseeker
+        profile.skills = "py, ML / apache airflow, Public speaking"
+        profile.save()
+        self.assertEqual(self.skills(profile), ["apache airflow", "machine learning", "public speaking", "python"])
+
+        job.requirements = "Go, k8s"
+        job.save()
+        self.assertEqual(self.skills(job), ["go", "kubernetes", "python"])
+
+        links = (self.skills(job), self.skills(profile))
+        rebuild_skills()
+        self.assertEqual((self.skills(job), self.skills(profile)), links)
+
+    def test_job_list_skill_filters_all_or_any(self):
+        self.job("Backend", "Python, Django")
+        self.job("Scripting", "Python")
+        self.job("Frontend", "React")
+        self.assertEqual(self.filtered(skills="py django"), ["Backend"])
+        self.assertEqual(self.filtered(skills="python, react", skills_mode="any"), ["Backend", "Frontend", "Scripting"])
+        self.assertEqual(self.filtered(skills="python, cobol"), [])
+        self.assertEqual(self.filtered(skills="python, cobol", skills_mode="any"), ["Backend", "Scripting"])
+        self.assertEqual(compute_facets(normalize_filters({"skills": "python"}))["total"], 2)
+
+    def test_candidate_list_skill_filters(self):
+        for name, skills in [("ana", "JavaScript, SQL"), ("ben", "js"), ("cy", "SQL")]:
+            user = User.objects.create(username=name, role=User.JOB_SEEKER)
+            user.jobseeker.skills = skills
+            user.jobseeker.is_public = True
+            user.jobseeker.save()
+        self.client.force_login(self.recruiter)
+
+        def names(query):
+            with mock.patch("accounts.views.render", return_value=HttpResponse()) as render:
+                self.client.get(f"/accounts/candidates/?{query}")
+            return sorted(p.user.username for p in render.call_args.args[2]["candidates"])
+
+        self.assertEqual(names("skills=javascript,sql"), ["ana"])
+        self.assertEqual(names("skills=js,sql&skills_mode=any"), ["ana", "ben", "cy"])
+
+    def test_unknown_skills_fall_back_to_substring_matches(self):
+        # Sentences rather than skill names: "fortran" never joins the vocabulary
+        for name, skills in [("ana", "SQL, 5 years of Fortran 77"), ("ben", "Fortran experience"), ("cy", "SQL")]:
+            user = User.objects.create(username=name, role=User.JOB_SEEKER)
+            user.jobseeker.skills = skills
+            user.jobseeker.is_public = True
+            user.jobseeker.save()
+        self.job("Legacy", "Strong Fortran 77 experience")
+        self.job("Data", "SQL")
+        self.client.force_login(self.recruiter)
+
+        def names(query):
+            with mock.patch("accounts.views.render", return_value=HttpResponse()) as render:
+                self.client.get(f"/accounts/candidates/?{query}")
+            return sorted(p.user.username for p in render.call_args.args[2]["candidates"])
+
+        self.assertEqual(names("skills=fortran"), ["ana", "ben"])
+        self.assertEqual(names("skills=sql,fortran"), ["ana"])
+        self.assertEqual(names("skills=cobol,sql&skills_mode=any"), ["ana", "cy"])
+        self.assertEqual(self.filtered(skills="fortran 77"), ["Legacy"])
+        self.assertEqual(self.filtered(skills="fortran, sql"), [])
+
+
+@override_settings(GEOCODER_BACKEND="google")
+class JobImportTests(TestCase):
+    CSV = (
+        "Title,Description,Company,City,State,Country,Requirements,Remote\n"
+        "Backend Dev,APIs,Acme,Atlanta,GA,USA,\"Python, Django\",yes\n"
+        ",APIs,Acme,Atlanta,GA,USA,,no\n"
+        "Data Engineer,Pipelines,Acme,Atlanta,GA,USA,SQL,no\n"
+        "Designer,UI,Acme,Nowhere,ZZ,USA,Figma,\n"
+    )
+
+    def setUp(self):
+        clear_memory_cache()
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.geocoder = FakeGeocoder({"Atlanta, GA, USA": (33.749, -84.388)})
+
+    def test_csv_import_matches_one_by_one_saves(self):
+        stats = import_jobs(io.StringIO(self.CSV), self.recruiter, chunk_size=2, geocoder=self.geocoder)
+
+        self.assertEqual((stats["rows"], stats["created"], stats["invalid"]), (4, 3, 1))
+        self.assertEqual(stats["errors"][0][0], 3)   # the row without a title
+        self.assertEqual(sorted(self.geocoder.calls), ["Atlanta, GA, USA", "Nowhere, ZZ, USA"])
+        self.assertEqual((stats["geocoded"], stats["failed"], stats["pending"]), (2, 1, 0))
+        self.assertGreater(stats["rows_per_second"], 0)
+
+        backend = Job.objects.get(title="Backend Dev")
+        self.assertTrue(backend.remote)
+        self.assertEqual(backend.geocode_status, Job.GEOCODE_OK)
+        self.assertEqual(backend.geohash, encode_geohash(33.749, -84.388))
+        self.assertEqual(backend.location_key, location_key("Atlanta", "GA", "USA"))
+        self.assertEqual(Job.objects.get(title="Designer").geocode_status, Job.GEOCODE_FAILED)
+        self.assertEqual(sorted(backend.skill_links.values_list("skill__name", flat=True)), ["django", "python"])
+        self.assertEqual(search_job_ids("engineer"), [Job.objects.get(title="Data Engineer").pk])
+        self.assertEqual(JobNotificationFanout.objects.count(), 3)
+
+        cells = {c.cell: c.job_count for c in JobMapCell.objects.all()}
+        self.assertEqual(cells[encode_geohash(33.749, -84.388, 5)], 2)
+        rebuild_cells()
+        self.assertEqual({c.cell: c.job_count for c in JobMapCell.objects.all()}, cells)
+
+    def test_jsonl_import_reports_bad_lines_and_keeps_errored_lookups_pending(self):
+        lines = [
+            json.dumps({"title": "Dev", "description": "d", "city": "Atlanta", "state": "GA",
+                        "country": "USA", "is_active": "false"}),
+            "{not json",
+            "",
+            json.dumps(["a", "list"]),
+        ]
+
+        def broken(address):
+            raise ConnectionError("maps api down")
+
+        with self.assertLogs("jobs.geocoding", level="ERROR"):
+            stats = import_jobs(io.StringIO("\n".join(lines)), self.recruiter, fmt="jsonl", geocoder=broken)
+
+        self.assertEqual((stats["rows"], stats["created"], stats["invalid"]), (3, 1, 2))
+        self.assertEqual([line for line, _ in stats["errors"]], [2, 4])
+        job = Job.objects.get()
+        self.assertFalse(job.is_active)
+        self.assertEqual(job.geocode_status, Job.GEOCODE_PENDING)   # left for geocode_jobs
+
+    def test_recruiter_upload(self):
+        self.client.force_login(self.recruiter)
+        upload = SimpleUploadedFile("openings.csv", self.CSV.encode(), content_type="text/csv")
+        with mock.patch("jobs.importer.google_geocode", self.geocoder), \
+                mock.patch("jobs.views.render", return_value=HttpResponse()) as render:
+            self.client.post("/jobs/import/", {"file": upload})
+        self.assertEqual(render.call_args.args[2]["stats"]["created"], 3)
+        self.assertEqual(Job.objects.filter(recruiter=self.recruiter).count(), 3)
+
+        seeker = User.objects.create(username="seeker", role=User.JOB_SEEKER)
+        self.client.force_login(seeker)
+        self.assertEqual(self.client.get("/jobs/import/").status_code, 403)
+
+
+@override_settings(APPLICANT_KANBAN_PAGE_SIZE=2)
+class ApplicantKanbanTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        other = User.objects.create(username="other", role=User.RECRUITER)
+        job = Job.objects.create(recruiter=self.recruiter, title="Dev", description="d")
+        other_job = Job.objects.create(recruiter=other, title="Ops", description="d")
+        for i, status in enumerate(["applied", "applied", "applied", "review", "closed"]):
+            seeker = User.objects.create(username=f"s{i}", role=User.JOB_SEEKER)
+            Application.objects.create(job=job, applicant=seeker, status=status)
+            Application.objects.create(job=other_job, applicant=seeker)
+        self.client.force_login(self.recruiter)
+
+    def api(self, **params):
+        return self.client.get("/accounts/dashboard/recruiter/manage_applicants/api/", params)
+
+    def test_board_renders_counts_and_first_pages(self):
+        with mock.patch("accounts.views.render", return_value=HttpResponse()) as render:
+            self.client.get("/accounts/dashboard/recruiter/manage_applicants/")
+        columns = render.call_args.args[2]["columns"]
+        self.assertEqual([(c["status"], c["count"], len(c["applications"])) for c in columns],
+                         [("applied", 3, 2), ("review", 1, 1), ("closed", 1, 1)])
+        self.assertIsNotNone(columns[0]["next_cursor"])
+        self.assertIsNone(columns[1]["next_cursor"])
+        self.assertEqual(self.api().json(), {"counts": {"applied": 3, "review": 1, "closed": 1}})
+
+    def test_column_pages_cover_the_column_once(self):
+        seen, cursor = [], None
+        while True:
+            data = self.api(status="applied", **({"cursor": cursor} if cursor else {})).json()
+            seen += [card["applicant"] for card in data["cards"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, ["s2", "s1", "s0"])   # newest application first
+        self.assertEqual(self.api(status="hired").status_code, 400)
+        self.assertEqual(self.api(status="applied", cursor="garbage").status_code, 400)
+
+        self.client.force_login(User.objects.get(username="s0"))
+        self.assertEqual(self.api().status_code, 403)
+
+    def move(self, changes):
+        return self.client.post("/accounts/recruiter/applicants/update-status/",
+                                json.dumps({"changes": changes}), content_type="application/json")
+
+    def test_batch_move_is_all_or_nothing(self):
+        apps = {a.applicant.username: a for a in Application.objects.filter(job__recruiter=self.recruiter)}
+        changes = [
+            {"id": apps["s0"].id, "status": "review", "expected_status": "applied"},
+            {"id": apps["s1"].id, "status": "review", "expected_status": "applied"},
+            {"id": apps["s4"].id, "final_decision": "hired", "expected_final_decision": "none"},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(move_applications(self.recruiter.id, changes), 3)
+        statements = [q["sql"] for q in queries.captured_queries if '"jobs_application"' in q["sql"]]
+        self.assertEqual(len(statements), 3)   # ownership + state read, one UPDATE per kind of move
+        self.assertEqual(self.api().json()["counts"], {"applied": 1, "review": 3, "closed": 1})
+        self.assertEqual(Application.objects.get(pk=apps["s4"].id).final_decision, "hired")
+
+        # s0 is in review now: the stale move is refused and s2's isn't applied either
+        response = self.move([
+            {"id": apps["s2"].id, "status": "closed", "expected_status": "applied"},
+            {"id": apps["s0"].id, "status": "closed", "expected_status": "applied"},
+        ])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["conflicts"],
+                         [{"id": apps["s0"].id, "status": "review", "final_decision": "none"}])
+        self.assertEqual(Application.objects.get(pk=apps["s2"].id).status, "applied")
+
+        foreign = Application.objects.exclude(job__recruiter=self.recruiter).first()
+        self.assertEqual(self.move([{"id": foreign.id, "status": "closed"}]).status_code, 400)
+        self.assertEqual(foreign.status, Application.objects.get(pk=foreign.id).status)
+        self.assertEqual(self.move([{"id": apps["s2"].id, "status": "hired"}]).status_code, 400)
+
+    def test_hired_column_moves(self):
+        # What the board sends for a drop on the Hired column, and for a drag back out of it
+        app = Application.objects.get(job__recruiter=self.recruiter, status="review")
+        response = self.move([{"id": app.id, "status": "closed", "final_decision": "hired",
+                               "expected_status": "review"}])
+        self.assertEqual(response.status_code, 200)
+        app.refresh_from_db()
+        self.assertEqual((app.status, app.final_decision), ("closed", "hired"))
+        self.assertEqual(Job.objects.get(pk=app.job_id).hired_count, 1)
+
+        response = self.move([{"id": app.id, "status": "review", "expected_status": "closed",
+                               "expected_final_decision": "hired"}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Application.objects.get(pk=app.id).status, "review")
+
+
+class FunnelTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.job = Job.objects.create(recruiter=self.recruiter, title="Dev", description="d")
+        self.apps = [
+            Application.objects.create(job=self.job, applicant=User.objects.create(username=f"s{i}", role=User.JOB_SEEKER))
+            for i in range(4)
+        ]
+
+    def stages(self, job_id=None):
+        return {row["stage"]: row for row in funnel_summary(self.recruiter.id, job_id)["stages"]}
+
+    def rollups(self):
+        return list(
+            FunnelRollup.objects.order_by("job_id", "stage").values_list("job_id", "stage", "current", "entered", "exited")
+        )
+
+    def test_moves_are_logged_and_rolled_up(self):
+        app = self.apps[0]
+        Application.objects.filter(pk=app.pk).update(status_changed_at=timezone.now() - timedelta(hours=5))
+        app.refresh_from_db()
+        app.status = "review"
+        app.save()
+        move_applications(self.recruiter.id, [
+            {"id": self.apps[1].id, "status": "review"},
+            {"id": self.apps[2].id, "status": "closed", "final_decision": "rejected"},
+        ])
+        self.apps[3].delete()
+
+        self.assertEqual(
+            list(ApplicationStatusEvent.objects.filter(application=app).values_list("field", "old_value", "new_value")),
+            [("status", "", "applied"), ("status", "applied", "review")],
+        )
+        for stages in (self.stages(), self.stages(self.job.id)):
+            self.assertEqual(stages["applied"]["entered"], 4)
+            self.assertEqual(stages["applied"]["current"], 0)
+            self.assertEqual(stages["review"]["current"], 2)
+            self.assertEqual(stages["review"]["conversion"], 50)
+            self.assertEqual(stages["rejected"]["current"], 1)
+        # applied -> review after 5 hours, twice after moments: the median stay is under an hour
+        self.assertLess(self.stages()["applied"]["median_seconds"], 3600)
+
+        summary = funnel_summary(self.recruiter.id)
+        self.assertEqual((summary["applications"], summary["rejected"], summary["reject_rate"]), (3, 1, 33))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        move_applications(self.recruiter.id, [{"id": self.apps[0].id, "status": "closed", "final_decision": "hired"}])
+        self.apps[1].delete()
+        incremental = self.rollups()
+        FunnelRollup.objects.update(current=0, entered=0)
+        self.assertEqual(rebuild_funnels(), len(incremental))
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_dashboard_shows_the_funnel(self):
+        self.client.force_login(self.recruiter)
+        with mock.patch("accounts.views.render", return_value=HttpResponse()) as render:
+            self.client.get("/accounts/dashboard/recruiter/")
+        context = render.call_args.args[2]
+        self.assertEqual(context["funnel"]["applications"], 4)
+        self.assertEqual(context["jobs"][0].applications_count, 4)
+
+
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        self.recruiter = User.objects.create(username="rec", role=User.RECRUITER)
+        self.job = Job.objects.create(recruiter=self.recruiter, title="Dev", description="d",
+                                      latitude=33.7, longitude=-84.4)
+        self.other = Job.objects.create(recruiter=self.recruiter, title="Ops", description="d")
+        self.apps = [
+            Application.objects.create(job=self.job, applicant=User.objects.create(username=f"s{i}", role=User.JOB_SEEKER))
+            for i in range(4)
+        ]
+
+    def counts(self, job):
+        return Job.objects.values(*COUNTER_FIELDS).get(pk=job.pk)
+
+    def test_counters_follow_saves_moves_and_withdrawals(self):
+        app = self.apps[0]
+        app.status = "review"
+        app.save()
+        move_applications(self.recruiter.id, [
+            {"id": self.apps[1].id, "status": "closed", "final_decision": "hired"},
+            {"id": self.apps[2].id, "status": "review"},
+        ])
+        self.apps[3].delete()
+        Application.objects.create(job=self.other, applicant=self.apps[3].applicant)
+
+        self.assertEqual(self.counts(self.job), {
+            "applications_count": 3, "applied_count": 0, "review_count": 2, "interview_count": 0,
+            "closed_count": 1, "hired_count": 1, "rejected_count": 0,
+        })
+        self.assertEqual(self.counts(self.other)["applied_count"], 1)
+        self.assertEqual(reconcile_counts(), (2, 0))
+
+    def test_reconcile_repairs_drift(self):
+        Job.objects.filter(pk=self.job.pk).update(applications_count=99, review_count=-1)
+        Application.objects.filter(pk=self.apps[0].pk).update(status="closed")   # skips the signals
+        self.assertEqual(reconcile_counts(chunk_size=1), (2, 1))
+        counts = self.counts(self.job)
+        self.assertEqual((counts["applications_count"], counts["applied_count"], counts["closed_count"]), (4, 3, 1))
+
+    def test_recruiter_map_reads_the_counter(self):
+        with self.assertNumQueries(1):
+            pins = json.loads(build_recruiter_pins(self.recruiter.id)["all"])
+        self.assertEqual([(pin["id"], pin["applicants"]) for pin in pins], [(self.job.id, 4)])
@@ -0,0 +1,103 @@
+# jobs/tfidf.py
+"""
+TF-IDF vectors for matching job seekers' skills against job postings, in
+plain Python (no NumPy/SciPy dependency):
+
+- a document is a list of (text, weight) fields, turned into weighted term
+  counts by `term_counts()` — these are what gets stored (TextVector),
+- `idf_table()` derives the inverse document frequencies from the job
+  postings, `vectorize()` makes an L2-normalized sparse vector
+  ({term: weight}) from counts,
+- `inverted_index()` lays a set of vectors out column-major
+  ({term: [(id, weight), ...]}, like a CSC matrix) so one vector is
+  scored against all of them by walking only its own terms
+  (`similarities()` / `top_k()`): a sparse row-times-matrix product.
+  Posting lists can be cut to their highest-weight entries ("champion
+  lists"), which bounds the cost of very common terms at the price of an
+  approximate top-k.
+
+Used by the "skills" recommendations in jobs/recommendations.py.
+"""
+import hashlib
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+# Words plus the punctuation that matters in skills: "c++", "c#", "node.js"
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+STOP_WORDS = frozenset("""
+    a about an and are as at be by can for from has have in into is it its
+    of on or our that the their this to we will with within you your
+""".split())
+
+
+def tokenize(text):
+    """'Python, Django & Node.js' -> ['python', 'django', 'node.js']"""
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOP_WORDS]
+
+
+def term_counts(fields):
+    """[(text, weight), ...] -> {term: weighted count}"""
+    counts = Counter()
+    for text, weight in fields:
+        for term in tokenize(text):
+            counts[term] += weight
+    return dict(counts)
+
+
+def digest(fields):
+    """Fingerprint of the texts in `fields`: unchanged text, unchanged vector."""
+    return hashlib.sha1("\x1f".join(text or "" for text, _ in fields).encode()).hexdigest()
+
+
+def idf_table(documents):
+    """Smoothed idf, log((1 + n) / (1 + df)) + 1, over an iterable of term-count dicts."""
+    n = 0
+    df = Counter()
+    for counts in documents:
+        n += 1
+        df.update(counts.keys())
+    return {term: math.log((1 + n) / (1 + d)) + 1 for term, d in df.items()}
+
+
+def vectorize(counts, idf):
+    """
+    Sublinear tf (1 + log count) times idf, L2-normalized. Terms outside
+    `idf` (no job mentions them) can't match anything and are dropped.
+    """
+    vector = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items() if term in idf}
+    norm = math.sqrt(sum(w * w for w in vector.values()))
+    return {term: w / norm for term, w in vector.items()} if norm else {}
+
+
+def inverted_index(vectors, limit=None):
+    """{id: vector} -> {term: [(id, weight), ...]}, each list cut to its `limit` heaviest entries."""
+    postings = defaultdict(list)
+    for doc_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((doc_id, weight))
+    if limit:
+        for term, entries in postings.items():
+            if len(entries) > limit:
+                postings[term] = heapq.nlargest(limit, entries, key=lambda entry: entry[1])
+    return postings
+
+
+def similarities(vector, postings):
+    """Cosine similarity of `vector` with every indexed vector it shares a term with: {id: cosine}."""
+    scores = defaultdict(float)
+    for term, weight in vector.items():
+        for doc_id, doc_weight in postings.get(term, ()):
+            scores[doc_id] += weight * doc_weight
+    return scores
+
+
+def top_k(vector, postings, k, min_similarity=0.0, exclude=()):
+    """The `k` best (cosine, id) pairs at or above `min_similarity`, best first."""
+    scores = similarities(vector, postings)
+    return heapq.nlargest(k, (
+        (score, doc_id) for doc_id, score in scores.items()
+        if score >= min_similarity and doc_id not in exclude
+    ))
@@ -8,11 +8,13 @@ urlpatterns = [
     path("", views.job_list, name="job_list"),
     path("mine/", views.jobs_my_list, name="my_list"),
     path("new/", views.jobs_create, name="create"),
+    path("import/", views.jobs_import, name="import"),
     path("<int:pk>/edit/", views.jobs_edit, name="edit"),
     path("<int:pk>/apply/", views.apply_to_job, name="apply_job"),
     path("<int:pk>/", views.job_detail, name="job_detail"),
     path("delete/<int:pk>/", views.delete_job, name="delete_job"),
     path("map/", views.job_map, name="job_map"),
+    path("api/jobs/", views.job_list_api, name="job_list_api"),
     path("api/jobs-map/", views.jobs_map_api, name="jobs_map_api"),
     path("dashboard/", views.jobseeker_dashboard, name="jobseeker_dashboard"),
     path("map/recruiter/", views.recruiter_map, name="recruiter_map"),
@@ -3,37 +3,32 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.conf import settings
-from django.db.models import Count
-import math
-import json
+from django.urls import reverse
 
 from .models import Job, Application
 from accounts.models import User
-from .forms import JobForm
+from .forms import JobForm, JobImportForm
+from .importer import JobImportError, import_jobs
+from .facets import filtered_jobs, job_facets, normalize_filters
+from .geo import bbox_q
+from .job_index import get_job_index
+from .map_clusters import max_pins, viewport_clusters
+from .recommendations import dashboard_jobs
+from .recruiter_pins import recruiter_pins
+from .response_cache import cache_anonymous, cached, normalized_query
+from .similar_jobs import similar_jobs
+from .pagination import JOB_LIST_ORDERING, JOB_SEARCH_ORDERING, InvalidCursor, keyset_page
 from .decorators import recruiter_required
-from accounts.models import JobSeekerProfile
-from messaging.models import JobNotification
+from .applied_jobs import applied_job_ids, contains, has_applied
+from messaging.fanout import queue_job_notifications
 
 
-from django.http import JsonResponse, HttpResponseForbidden
+import io
 
+from django.http import HttpResponse, JsonResponse
 
-# ===============================================================
-# Haversine Distance Helper
-# ===============================================================
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great-circle distance between two points 
-    on the Earth's surface (in miles) using the Haversine formula.
-    """
-    R = 3958.8  # Earth’s radius in miles
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-    c = 2 * math.asin(math.sqrt(a))
-    return R * c
-
+# How many "Jobs Near You" results we render / return at most
+NEARBY_JOBS_LIMIT = 50
 
 # ===============================================================
 # Recruiter CRUD Views
@@ -50,42 +45,31 @@ def jobs_create(request):
         # ---------------------------------------------
         # NEW: Notify nearby job seekers about this job
         # ---------------------------------------------
-        # Define "near" as same city + state + country
-        if job.city and job.state and job.country:
-            nearby_seekers = JobSeekerProfile.objects.filter(
-                is_public=True,
-                city__iexact=job.city,
-                state__iexact=job.state,
-                country__iexact=job.country,
-            ).select_related("user")
-
-            notifications = []
-            for profile in nearby_seekers:
-                if profile.user == request.user:
-                    continue  # don't notify the posting recruiter
-                text = f"New job near you: {job.title}"
-                if job.company:
-                    text += f" at {job.company}"
-                if job.city:
-                    text += f" in {job.city}"
-
-                notifications.append(
-                    JobNotification(
-                        user=profile.user,
-                        job=job,
-                        text=text,
-                    )
-                )
-
-            if notifications:
-                # unique_together(user, job) will prevent duplicates over time
-                JobNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+        # Only queued here; `manage.py send_job_notifications` creates the
+        # notifications in the background (see messaging/fanout.py)
+        queue_job_notifications(job)
 
         return redirect(job.get_absolute_url())
     
     return render(request, "jobs/job_form.html", {"form": form, "title": "Post a Job"})
 
 
+@login_required
+@recruiter_required
+def jobs_import(request):
+    """Bulk-create jobs from an uploaded CSV / JSONL file (see jobs/importer.py)."""
+    form = JobImportForm(request.POST or None, request.FILES or None)
+    stats = None
+    if request.method == "POST" and form.is_valid():
+        upload = form.cleaned_data["file"]
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            stats = import_jobs(stream, request.user, fmt=form.cleaned_data["format"])
+        except (UnicodeDecodeError, JobImportError) as exc:
+            form.add_error("file", str(exc))
+    return render(request, "jobs/job_import.html", {"form": form, "stats": stats})
+
+
 @login_required
 @recruiter_required
 def jobs_edit(request, pk):
@@ -129,95 +113,148 @@ def jobs_my_list(request):
 # ===============================================================
 # Job List (User Story 2 filters)
 # ===============================================================
-def job_list(request):
-    # --- BASE QUERYSET ---
-    all_jobs_qs = Job.objects.filter(is_active=True).order_by('-created_at')
-
-    # --- FILTERING LOGIC (User Story 2) ---
-    title = request.GET.get('title')
-    skills = request.GET.get('skills')
-    salary_min = request.GET.get('salary_min')
-    salary_max = request.GET.get('salary_max')
-    remote = request.GET.get('remote')
-    visa = request.GET.get('visa')
-
-    # Filter by title
-    if title:
-        all_jobs_qs = all_jobs_qs.filter(title__icontains=title.strip())
-
-    # Filter by skills (search inside requirements)
-    if skills:
-        all_jobs_qs = all_jobs_qs.filter(requirements__icontains=skills.strip())
-
-    # Filter by salary range
-    if salary_min:
-        all_jobs_qs = all_jobs_qs.filter(max_salary__gte=salary_min)
-    if salary_max:
-        all_jobs_qs = all_jobs_qs.filter(min_salary__lte=salary_max)
-
-    # Filter by remote (case-insensitive)
-    if remote is not None and remote != "":
-        remote_val = str(remote).lower() in ['true', '1', 'yes']
-        all_jobs_qs = all_jobs_qs.filter(remote=remote_val)
-
-    # Filter by visa sponsorship (case-insensitive)
-    if visa is not None and visa != "":
-        visa_val = str(visa).lower() in ['true', '1', 'yes']
-        all_jobs_qs = all_jobs_qs.filter(visa_sponsorship=visa_val)
+def _filtered_jobs(params):
+    """Active jobs matching the job_list filter form (title, skills, type, salary, remote, visa)."""
+    # Title goes through the full-text index, best matches first; skills
+    # through the normalized skills index (all of them, or ?skills_mode=any)
+    return filtered_jobs(normalize_filters(params))
+
+
+def _nearby_jobs(all_jobs_qs, params):
+    """The closest NEARBY_JOBS_LIMIT jobs to ?lat=&lng= within ?radius= miles (default 10)."""
+    lat = params.get("lat")
+    lng = params.get("lng")
+    if not (lat and lng):
+        return []
+    try:
+        radius = float(params.get("radius") or 10)
+        # Distance filter, ORDER BY and LIMIT all run in the database
+        return list(all_jobs_qs.within_radius(float(lat), float(lng), radius)[:NEARBY_JOBS_LIMIT])
+    except ValueError:
+        return []
+
+
+def _job_list_page(all_jobs_qs, nearby_jobs, cursor, params):
+    """
+    One keyset page of the "All Available Jobs" section (nearby jobs excluded).
+    Without a text search, the in-memory job index answers the filters when
+    enabled (jobs/job_index.py) and the database only loads the page.
+    """
+    page_size = getattr(settings, "JOB_LIST_PAGE_SIZE", 20)
+    filters = normalize_filters(params)
+    index = get_job_index()
+    if index is not None and index.supports(filters):
+        return index.page(filters, cursor=cursor, exclude_ids=[j.id for j in nearby_jobs], size=page_size)
 
-    # --- APPLIED JOBS FOR CURRENT USER ---
-    applied_ids = set()
-    if request.user.is_authenticated and getattr(request.user, "role", None) == User.JOB_SEEKER:
-        applied_ids = set(Application.objects.filter(applicant=request.user)
-                          .values_list('job_id', flat=True))
+    ordering = JOB_SEARCH_ORDERING if "search_rank" in all_jobs_qs.query.annotations else JOB_LIST_ORDERING
+    if nearby_jobs:
+        all_jobs_qs = all_jobs_qs.exclude(id__in=[j.id for j in nearby_jobs])
+    return keyset_page(all_jobs_qs, ordering, cursor=cursor, size=page_size)
 
-    # --- LOCATION & RADIUS ---
-    lat = request.GET.get("lat")
-    lng = request.GET.get("lng")
-    radius = float(request.GET.get("radius") or 10)
 
-    nearby_jobs = []
-    if lat and lng:
-        try:
-            user_lat = float(lat)
-            user_lng = float(lng)
-            jobs_with_coords = all_jobs_qs.exclude(latitude__isnull=True, longitude__isnull=True)
-
-            for job in jobs_with_coords:
-                dist = haversine_distance(user_lat, user_lng, job.latitude, job.longitude)
-                if dist <= radius:
-                    job.distance_miles = round(dist, 1)
-                    job.applied = job.id in applied_ids
-                    nearby_jobs.append(job)
-            nearby_jobs.sort(key=lambda j: j.distance_miles)
-        except ValueError:
-            pass
+def _mark_applied(user, jobs):
+    """Set `job.applied` for the jobs on screen (from the user's cached applied-job ids)."""
+    applied_ids = ()
+    if jobs and user.is_authenticated and getattr(user, "role", None) == User.JOB_SEEKER:
+        applied_ids = applied_job_ids(user.id)
+    for job in jobs:
+        job.applied = contains(applied_ids, job.id)
+
+
+def _job_list_data(params):
+    """
+    The part of a job_list page that doesn't depend on who is looking:
+    (nearby_jobs, all_jobs, next_cursor). Shared through the cache by every
+    visitor with the same parameters (jobs/response_cache.py).
+    Raises InvalidCursor.
+    """
+    def compute():
+        all_jobs_qs = _filtered_jobs(params)
+        nearby_jobs = _nearby_jobs(all_jobs_qs, params)
+        all_jobs, next_cursor = _job_list_page(all_jobs_qs, nearby_jobs, params.get("cursor"), params)
+        return nearby_jobs, all_jobs, next_cursor
+
+    return cached("job_list", [normalized_query(params)], compute)
 
-    # --- PREPARE “ALL JOBS” SECTION ---
-    nearby_ids = {j.id for j in nearby_jobs}
-    all_jobs = []
-    for job in all_jobs_qs:
-        if job.id in nearby_ids:
-            continue
-        job.applied = job.id in applied_ids
-        all_jobs.append(job)
+
+@cache_anonymous
+def job_list(request):
+    """
+    Job search page. "Jobs Near You" holds at most NEARBY_JOBS_LIMIT jobs;
+    "All Available Jobs" is keyset-paginated (?cursor=...), and further pages
+    are appended by infinite scroll from `job_list_api`.
+
+    Anonymous visitors get the cached page; signed-in users the cached
+    listing plus their own "applied" flags.
+    """
+    # --- FILTERS, LOCATION & ONE PAGE OF “ALL JOBS” ---
+    try:
+        nearby_jobs, all_jobs, next_cursor = _job_list_data(request.GET)
+    except InvalidCursor:
+        params = request.GET.copy()
+        params.pop("cursor", None)
+        nearby_jobs, all_jobs, next_cursor = _job_list_data(params)
+
+    # --- APPLIED JOBS FOR CURRENT USER ---
+    _mark_applied(request.user, nearby_jobs + all_jobs)
+
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_query = params.urlencode()
 
     # --- RENDER ---
     return render(request, "jobs/job_list.html", {
         "nearby_jobs": nearby_jobs,
         "all_jobs": all_jobs,
+        "next_cursor": next_cursor,
+        "next_query": next_query,
+        "facets": job_facets(request.GET),
         "GOOGLE_MAPS_API_KEY": settings.GOOGLE_MAPS_API_KEY,
     })
 
 
+@cache_anonymous
+def job_list_api(request):
+    """
+    JSON pages of the job_list "All Available Jobs" section, for infinite
+    scroll: same filter parameters as job_list plus `cursor` (from the
+    previous page's `next_cursor`). `next_cursor` is null on the last page.
+    """
+    try:
+        _, jobs, next_cursor = _job_list_data(request.GET)
+    except InvalidCursor:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+    _mark_applied(request.user, jobs)
+
+    data = [
+        {
+            "id": j.id,
+            "title": j.title,
+            "company": j.company,
+            "location": j.location,
+            "applied": j.applied,
+            "detailUrl": j.get_absolute_url(),
+            "applyUrl": reverse("jobs:apply_job", args=[j.id]),
+        }
+        for j in jobs
+    ]
+    return JsonResponse({"jobs": data, "next_cursor": next_cursor})
+
+
 # ===============================================================
 # Job Detail and Apply
 # ===============================================================
+@cache_anonymous
 def job_detail(request, pk):
-    job = get_object_or_404(Job, pk=pk, is_active=True)
+    # The job itself is the same for everyone: cached until any job changes
+    job = cached("job_detail", [pk], lambda: get_object_or_404(Job, pk=pk, is_active=True))
+    # "People who applied to this job also applied to", precomputed by update_similar_jobs
+    similar = cached("similar_jobs", [pk], lambda: similar_jobs(pk))
     applied = False
     if request.user.is_authenticated and getattr(request.user, "role", None) == User.JOB_SEEKER:
-        applied = Application.objects.filter(job=job, applicant=request.user).exists()
+        applied = has_applied(request.user.id, job.id)
 
         # If this job was opened via a notification, mark that notification read
         notif_id = request.GET.get("notif_id")
@@ -232,6 +269,7 @@ def job_detail(request, pk):
     return render(request, "jobs/job_detail.html", {
         "job": job,
         "applied": applied,
+        "similar_jobs": similar,
         "GOOGLE_MAPS_API_KEY": settings.GOOGLE_MAPS_API_KEY,
     })
 
@@ -244,7 +282,7 @@ def apply_to_job(request, pk):
     if getattr(request.user, "role", None) != User.JOB_SEEKER:
         raise PermissionDenied("Only job seekers can apply for jobs.")
 
-    if Application.objects.filter(job=job, applicant=request.user).exists():
+    if has_applied(request.user.id, job.id):
         return render(request, "jobs/apply_form.html", {
             "job": job,
             "error": "You have already applied for this job."
@@ -252,7 +290,9 @@ def apply_to_job(request, pk):
 
     if request.method == "POST":
         note = request.POST.get("note", "").strip()
-        Application.objects.create(job=job, applicant=request.user, note=note)
+        # get_or_create: another worker process's cache may not have seen an
+        # application this one has
+        Application.objects.get_or_create(job=job, applicant=request.user, defaults={"note": note})
         return redirect("jobs:job_detail", pk=job.pk)
 
     return render(request, "jobs/apply_form.html", {"job": job})
@@ -269,19 +309,78 @@ def job_map(request):
     })
 
 
+def _map_pin(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": getattr(job, "company", ""),
+        "location": getattr(job, "location", ""),
+        "lat": float(job.latitude),
+        "lng": float(job.longitude),
+        "detailUrl": job.get_absolute_url() if hasattr(job, "get_absolute_url") else f"/jobs/{job.id}/",
+    }
+
+
 @login_required
 def jobs_map_api(request):
-    """Lightweight JSON for pins on the all-jobs map."""
+    """
+    JSON for the all-jobs map.
+
+    - Viewport mode (`south`, `west`, `north`, `east`, `zoom`): returns
+      `{"mode": "clusters", "clusters": [...]}` — job counts and centroids
+      per grid cell, read from the pre-aggregated JobMapCell table — or,
+      once the viewport holds at most JOB_MAP_MAX_PINS jobs,
+      `{"mode": "pins", "jobs": [...]}`. `west > east` means the viewport
+      crosses the antimeridian.
+    - Nearby mode (`lat` & `lng`, optional `radius` miles, default 50, and
+      `limit`, default 50): the nearest jobs, closest first, each with a
+      `distance` in miles — computed, sorted and limited by the database.
+    - Neither: every pin (kept for existing callers; prefer viewport mode).
+    """
     qs = Job.objects.filter(is_active=True).exclude(latitude__isnull=True).exclude(longitude__isnull=True)
-    data = [{
-        "id": j.id,
-        "title": j.title,
-        "company": getattr(j, "company", ""),
-        "location": getattr(j, "location", ""),
-        "lat": float(j.latitude),
-        "lng": float(j.longitude),
-        "detailUrl": j.get_absolute_url() if hasattr(j, "get_absolute_url") else f"/jobs/{j.id}/",
-    } for j in qs]
+
+    if "zoom" in request.GET:
+        try:
+            south, west = float(request.GET["south"]), float(request.GET["west"])
+            north, east = float(request.GET["north"]), float(request.GET["east"])
+            zoom = int(request.GET["zoom"])
+        except (KeyError, ValueError):
+            return JsonResponse({"error": "Invalid south/west/north/east/zoom"}, status=400)
+
+        clusters = viewport_clusters(south, west, north, east, zoom)
+        pins = None
+        if sum(c["count"] for c in clusters) > max_pins():
+            # Edge cells overlap the viewport only partly: count exactly, but
+            # stop reading as soon as there are too many for pins
+            pins = list(
+                qs.filter(bbox_q(south, north, west, east))
+                .only("id", "title", "company", "location", "latitude", "longitude")
+                .order_by()[:max_pins() + 1]
+            )
+            if len(pins) > max_pins():
+                return JsonResponse({"mode": "clusters", "clusters": clusters})
+        if pins is None:
+            pins = qs.filter(bbox_q(south, north, west, east))
+        return JsonResponse({"mode": "pins", "jobs": [_map_pin(j) for j in pins]})
+
+    lat = request.GET.get("lat")
+    lng = request.GET.get("lng")
+    nearby = False
+    if lat and lng:
+        try:
+            radius = float(request.GET.get("radius") or 50)
+            limit = min(int(request.GET.get("limit") or NEARBY_JOBS_LIMIT), NEARBY_JOBS_LIMIT)
+            qs = qs.within_radius(float(lat), float(lng), radius)[:limit]
+            nearby = True
+        except ValueError:
+            return JsonResponse({"error": "Invalid lat/lng/radius/limit"}, status=400)
+
+    data = []
+    for j in qs:
+        item = _map_pin(j)
+        if nearby:
+            item["distance"] = round(j.distance_miles, 1)
+        data.append(item)
     return JsonResponse({"jobs": data})
 
 # ===============================================================
@@ -294,55 +393,13 @@ def recruiter_map(request):
     Map for recruiters:
     - Mode 1: marker for each job posting
     - Mode 2: same markers but with applicant counts
+    Both come from one aggregated query, cached per recruiter (jobs/recruiter_pins.py).
     """
-    user = request.user
-
-    # 1) Jobs belonging to this recruiter that have coordinates
-    jobs_qs = (
-        Job.objects
-        .filter(recruiter=user, is_active=True)
-        .exclude(latitude__isnull=True)
-        .exclude(longitude__isnull=True)
-    )
-
-    # 2) Mode 1 data → plain job pins
-    job_pins = [
-        {
-            "id": j.id,
-            "title": j.title,
-            "company": getattr(j, "company", ""),
-            "location": getattr(j, "location", ""),
-            "lat": float(j.latitude),
-            "lng": float(j.longitude),
-            "detailUrl": j.get_absolute_url() if hasattr(j, "get_absolute_url") else f"/jobs/{j.id}/",
-        }
-        for j in jobs_qs
-    ]
-
-    # 3) Mode 2 → same markers, but annotated with applicant counts
-    jobs_with_counts = (
-        jobs_qs
-        .annotate(app_count=Count("applications"))   # <-- FIXED LINE
-    )
-
-    applicant_pins = [
-        {
-            "id": j.id,
-            "title": j.title,
-            "company": getattr(j, "company", ""),
-            "location": getattr(j, "location", ""),
-            "lat": float(j.latitude),
-            "lng": float(j.longitude),
-            "applicants": j.app_count,
-            "detailUrl": j.get_absolute_url() if hasattr(j, "get_absolute_url") else f"/jobs/{j.id}/",
-        }
-        for j in jobs_with_counts
-        if j.app_count > 0
-    ]
+    payload = recruiter_pins(request.user.id)
 
     return render(request, "jobs/recruiter_map.html", {
-        "jobs_json": json.dumps(job_pins),
-        "applicants_json": json.dumps(applicant_pins),
+        "jobs_json": payload["jobs"],
+        "applicants_json": payload["applicants"],
         "GOOGLE_MAPS_API_KEY": settings.GOOGLE_MAPS_API_KEY,
     })
 
@@ -360,37 +417,10 @@ def recruiter_map_api(request):
       - mode=jobs        → basic job pins
       - mode=applicants  → same pins with applicant counts
     """
-    user = request.user
-    mode = request.GET.get("mode", "jobs")
-
-    # Base queryset: this recruiter's active jobs with coordinates
-    jobs_qs = (
-        Job.objects
-        .filter(recruiter=user, is_active=True)
-        .exclude(latitude__isnull=True)
-        .exclude(longitude__isnull=True)
-    )
-
-    # If we need applicant counts, annotate first
-    if mode == "applicants":
-        jobs_qs = jobs_qs.annotate(app_count=Count("applications"))
-
-    payload = []
-    for j in jobs_qs:
-        item = {
-            "id": j.id,
-            "title": j.title,
-            "company": getattr(j, "company", ""),
-            "location": getattr(j, "location", ""),
-            "lat": float(j.latitude),
-            "lng": float(j.longitude),
-            "detailUrl": j.get_absolute_url() if hasattr(j, "get_absolute_url") else f"/jobs/{j.id}/",
-        }
-        if mode == "applicants":
-            item["applicants"] = getattr(j, "app_count", 0)
-        payload.append(item)
-
-    return JsonResponse({"jobs": payload})
+    payload = recruiter_pins(request.user.id)
+    pins = payload["all"] if request.GET.get("mode", "jobs") == "applicants" else payload["jobs"]
+    # Already serialized: just wrap it
+    return HttpResponse(f'{{"jobs": {pins}}}', content_type="application/json")
 
 
 
@@ -411,16 +441,12 @@ def jobseeker_dashboard(request):
         Application.objects
         .filter(applicant=user)
         .select_related("job")
-        .order_by("-created_at")[:5]
+        .order_by("-applied_at")[:5]
     )
 
-    # Simple recommendation: nearest jobs or recent active jobs
-    recommended_jobs = Job.objects.filter(is_active=True).order_by("-created_at")[:3]
-
-    # Optional: If you later store location in user profile, you can compute actual nearby jobs:
-    # if user.profile.latitude and user.profile.longitude:
-    #     recommended_jobs = Job.objects.filter(is_active=True)[:3]
-    #     # (Apply haversine_distance filtering similar to job_list)
+    # Precomputed skills matches, then nearby jobs, then the newest jobs
+    # not applied to yet (jobs/recommendations.py)
+    recommended_jobs = dashboard_jobs(user)
 
     context = {
         "user": user,
@@ -429,40 +455,3 @@ def jobseeker_dashboard(request):
     }
 
     return render(request, "jobs/jobseeker_dashboard.html", context)
-
-
-# ===============================================================
-# Applicant View Kanban
-# ===============================================================
-
-@login_required
-def recruiter_applicants_kanban(request):
-    if request.user.role != User.RECRUITER:
-        return HttpResponseForbidden("Only recruiters can view this page.")
-
-    applications = Application.objects.filter(job__recruiter=request.user).select_related("applicant", "job")
-
-    return render(request, "accounts/applicants_recruiter_view.html", {
-        "applications": applications,
-    })
-
-
-@login_required
-def update_application_status(request, app_id):
-    if request.method != "POST":
-        return JsonResponse({"error": "POST only"}, status=400)
-
-    app = get_object_or_404(Application, id=app_id)
-
-    if app.job.recruiter != request.user:
-        return JsonResponse({"error": "Not allowed"}, status=403)
-
-    new_status = request.POST.get("status")
-
-    if new_status not in ["applied", "under_review", "interview", "hired"]:
-        return JsonResponse({"error": "Invalid status"}, status=400)
-
-    app.status = new_status
-    app.save()
-
-    return JsonResponse({"success": True})
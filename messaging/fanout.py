@@ -0,0 +1,156 @@
+# messaging/fanout.py
+"""
+Background fan-out of "new job near you" notifications.
+
+`jobs_create` only calls `queue_job_notifications(job)` (one INSERT), so
+posting a job takes the same time whether 3 or 30,000 job seekers live in
+that city. `manage.py send_job_notifications` then, per queued job:
+
+1. claims the JobNotificationFanout row (so two workers never share one),
+2. streams the matching JobSeekerProfile ids with `.iterator()` — keyset
+   on profile id, starting after the saved watermark,
+3. inserts JobNotifications in chunks of `chunk_size`, each chunk in its
+   own short transaction together with the new watermark, so the write
+   lock is only held for one chunk and a crashed run resumes where it
+   stopped (unique (user, job) makes a replayed chunk harmless),
+4. marks the fan-out done.
+"""
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from accounts.models import JobSeekerProfile
+
+from .models import JobNotification, JobNotificationFanout
+
+# A claim not refreshed for this long belongs to a dead worker
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def queue_job_notifications(job):
+    """Schedule notifications for a newly posted job (no-op without a full city/state/country)."""
+    if job.city and job.state and job.country:
+        JobNotificationFanout.objects.get_or_create(job=job)
+
+
+def queue_many_job_notifications(jobs):
+    """`queue_job_notifications` for many new jobs at once (bulk imports): one INSERT."""
+    JobNotificationFanout.objects.bulk_create(
+        [JobNotificationFanout(job=job) for job in jobs if job.city and job.state and job.country],
+        ignore_conflicts=True,
+    )
+
+
+def notification_text(job):
+    text = f"New job near you: {job.title}"
+    if job.company:
+        text += f" at {job.company}"
+    if job.city:
+        text += f" in {job.city}"
+    return text
+
+
+def matching_profiles(job):
+    """
+    Job seekers "near" the job: same city + state + country, compared via the
+    indexed normalized `location_key` ("Georgia" == "GA", "USA" == "US").
+    """
+    if not job.location_key:
+        return JobSeekerProfile.objects.none()
+    return (
+        JobSeekerProfile.objects
+        .filter(location_key=job.location_key, is_public=True)
+        .exclude(user_id=job.recruiter_id)  # don't notify the posting recruiter
+    )
+
+
+def _claim(fanout_id):
+    """Take ownership of a pending fan-out; False if another worker has it."""
+    now = timezone.now()
+    return bool(
+        JobNotificationFanout.objects
+        .filter(pk=fanout_id, status=JobNotificationFanout.PENDING)
+        .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=now - CLAIM_TIMEOUT))
+        .update(claimed_at=now, started_at=Coalesce(F("started_at"), now))
+    )
+
+
+def _write_chunk(fanout_id, job, text, chunk):
+    """Insert one chunk of notifications and advance the watermark, atomically."""
+    with transaction.atomic():
+        JobNotification.objects.bulk_create(
+            [JobNotification(user_id=user_id, job=job, text=text) for _, user_id in chunk],
+            ignore_conflicts=True,
+        )
+        JobNotificationFanout.objects.filter(pk=fanout_id).update(
+            last_profile_id=chunk[-1][0],
+            notified=F("notified") + len(chunk),
+            claimed_at=timezone.now(),
+        )
+
+
+def run_fanout(fanout, chunk_size=500, progress=None):
+    """
+    Send every notification for one claimed fan-out. Returns
+    {"job", "notified", "seconds", "per_second"}; `progress(job_id, notified)`
+    is called after each chunk.
+    """
+    job = fanout.job
+    text = notification_text(job)
+    started = time.monotonic()
+    notified = 0
+
+    profiles = (
+        matching_profiles(job)
+        .filter(id__gt=fanout.last_profile_id)
+        .order_by("id")
+        .values_list("id", "user_id")
+    )
+    chunk = []
+    for row in profiles.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            _write_chunk(fanout.pk, job, text, chunk)
+            notified += len(chunk)
+            chunk = []
+            if progress:
+                progress(job.id, notified)
+    if chunk:
+        _write_chunk(fanout.pk, job, text, chunk)
+        notified += len(chunk)
+        if progress:
+            progress(job.id, notified)
+
+    JobNotificationFanout.objects.filter(pk=fanout.pk).update(
+        status=JobNotificationFanout.DONE,
+        finished_at=timezone.now(),
+        claimed_at=None,
+    )
+    seconds = time.monotonic() - started
+    return {
+        "job": job.id,
+        "notified": notified,
+        "seconds": round(seconds, 3),
+        "per_second": round(notified / seconds) if seconds > 0 else notified,
+    }
+
+
+def run_pending_fanouts(chunk_size=500, limit=None, progress=None):
+    """Process queued fan-outs, oldest first. Returns one stats dict per job."""
+    results = []
+    pending = (
+        JobNotificationFanout.objects
+        .filter(status=JobNotificationFanout.PENDING)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    for fanout_id in list(pending[:limit] if limit else pending):
+        if not _claim(fanout_id):
+            continue
+        fanout = JobNotificationFanout.objects.select_related("job").get(pk=fanout_id)
+        results.append(run_fanout(fanout, chunk_size=chunk_size, progress=progress))
+    return results
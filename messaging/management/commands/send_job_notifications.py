@@ -0,0 +1,44 @@
+"""
+Background worker for "new job near you" notifications queued by jobs_create.
+
+    python manage.py send_job_notifications            # one pass, then exit
+    python manage.py send_job_notifications --loop     # keep polling (e.g. under systemd/supervisor)
+    python manage.py send_job_notifications -v 2       # per-chunk progress
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from messaging.fanout import run_pending_fanouts
+
+
+class Command(BaseCommand):
+    help = "Create queued job notifications in chunked background transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500,
+                            help="Notifications per INSERT transaction.")
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many jobs.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for newly posted jobs.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls with --loop.")
+
+    def handle(self, *args, **opts):
+        progress = None
+        if opts["verbosity"] >= 2:
+            def progress(job_id, notified):
+                self.stdout.write(f"  job {job_id}: {notified} notified so far")
+
+        while True:
+            results = run_pending_fanouts(
+                chunk_size=opts["chunk_size"], limit=opts["limit"], progress=progress,
+            )
+            for r in results:
+                self.stdout.write(
+                    f"job {r['job']}: {r['notified']} notifications in {r['seconds']}s "
+                    f"({r['per_second']}/s)"
+                )
+            if not results and not opts["loop"]:
+                self.stdout.write("No queued notifications.")
+            if not opts["loop"]:
+                break
+            time.sleep(opts["interval"])
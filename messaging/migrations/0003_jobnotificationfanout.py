@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobmapcell'),
+        ('messaging', '0002_jobnotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobNotificationFanout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done')], db_index=True, default='pending', max_length=10)),
+                ('last_profile_id', models.BigIntegerField(default=0)),
+                ('notified', models.PositiveIntegerField(default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification_fanout', to='jobs.job')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
@@ -124,3 +124,48 @@ class JobNotification(models.Model):
 
     def __str__(self):
         return f"JobNotification({self.user.username} -> {self.job.title})"
+
+
+# ---------------------------------------------------------
+# Job Notification fan-out queue
+# ---------------------------------------------------------
+# Posting a job only inserts one of these rows; the
+# "new job near you" notifications themselves are created in
+# the background by `manage.py send_job_notifications`
+# (see messaging/fanout.py), in small chunks, so a posting in
+# a big city never holds the database write lock for long.
+#
+# `last_profile_id` is the keyset watermark: a run that dies
+# half-way resumes after the last profile it committed.
+# ---------------------------------------------------------
+class JobNotificationFanout(models.Model):
+    PENDING = "pending"
+    DONE = "done"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (DONE, "Done"),
+    ]
+
+    job = models.OneToOneField(
+        Job,
+        related_name="notification_fanout",
+        on_delete=models.CASCADE,
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+
+    # Progress
+    last_profile_id = models.BigIntegerField(default=0)
+    notified = models.PositiveIntegerField(default=0)
+
+    # Set while a worker owns this fan-out; refreshed after every chunk
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"JobNotificationFanout(job={self.job_id}, {self.status}, {self.notified} sent)"
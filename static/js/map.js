@@ -1,5 +1,6 @@
 (function () {
-  let map, markers = [], clusterer, jobs = [], selectedId = null;
+  let map, markers = [], clusterMarkers = [], nearbyById = {}, selectedId = null;
+  let viewportRequest = 0, idleTimer = null;
 
   const listEl = document.getElementById('nearbyList');
   const radiusSelect = document.getElementById('radiusSelect');
@@ -20,15 +21,6 @@
     { featureType: "water", stylers: [{ color: "#c9e7ff" }] }
   ];
 
-  // Haversine distance (miles)
-  function distMiles(a, b) {
-    const R = 3958.8, toRad = d => d * Math.PI/180;
-    const dLat = toRad(b.lat - a.lat), dLng = toRad(b.lng - a.lng);
-    const lat1 = toRad(a.lat), lat2 = toRad(b.lat);
-    const x = Math.sin(dLat/2)**2 + Math.cos(lat1)*Math.cos(lat2)*Math.sin(dLng/2)**2;
-    return 2 * R * Math.asin(Math.sqrt(x));
-  }
-
   // Simple brand-colored SVG marker
   function svgPin(active=false) {
     const fill = active ? "#2563eb" : "#ef4444";
@@ -69,15 +61,66 @@
     return markers.find(m => m && m.__jobId === id);
   }
 
-  function fitToMarkers() {
-    const valid = markers.filter(Boolean);
-    if (!valid.length) return;
-    const b = new google.maps.LatLngBounds();
-    valid.forEach(m => b.extend(m.getPosition()));
-    map.fitBounds(b);
+  // Server-side cluster: a sized circle with the job count; click zooms in
+  function createClusterMarker(c) {
+    const size = Math.min(56, 26 + Math.log10(c.count) * 10);
+    const m = new google.maps.Marker({
+      position: { lat: c.lat, lng: c.lng },
+      map,
+      title: `${c.count} jobs`,
+      label: { text: String(c.count), color: "#ffffff", fontSize: "12px", fontWeight: "600" },
+      icon: {
+        path: google.maps.SymbolPath.CIRCLE,
+        scale: size / 2,
+        fillColor: "#2563eb", fillOpacity: 0.85,
+        strokeColor: "#ffffff", strokeWeight: 2
+      }
+    });
+    m.addListener('click', () => {
+      map.panTo(m.getPosition());
+      map.setZoom(map.getZoom() + 2);
+    });
+    return m;
+  }
+
+  function clearMapMarkers() {
+    markers.forEach(m => m.setMap(null));
+    clusterMarkers.forEach(m => m.setMap(null));
+    markers = [];
+    clusterMarkers = [];
+  }
+
+  // Ask the server for what's inside the current viewport: clusters when
+  // zoomed out, individual pins once few enough jobs are in view
+  async function loadViewport() {
+    const bounds = map.getBounds();
+    if (!bounds) return;
+    const ne = bounds.getNorthEast(), sw = bounds.getSouthWest();
+    const params = new URLSearchParams({
+      south: sw.lat(), west: sw.lng(), north: ne.lat(), east: ne.lng(), zoom: map.getZoom()
+    });
+    const requestId = ++viewportRequest;
+    const res = await fetch(`${window.CAREERHUB.jobsApiUrl}?${params}`, { credentials: "same-origin" });
+    if (!res.ok || requestId !== viewportRequest) return;  // a newer pan/zoom superseded this one
+    const data = await res.json();
+
+    clearMapMarkers();
+    if (data.mode === "pins") {
+      markers = (data.jobs || []).map(createMarker);
+      if (selectedId) highlightMarker(selectedId, true);
+    } else {
+      clusterMarkers = (data.clusters || []).map(createClusterMarker);
+    }
+  }
+
+  function scheduleViewportLoad() {
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(loadViewport, 150);
   }
 
   function renderList(nearby) {
+    nearbyById = {};
+    nearby.forEach(x => { nearbyById[x.id] = x; });
     resultCount.textContent = nearby.length;
     listEl.innerHTML = nearby.length ? nearby.map(x => `
       <li class="job-card" data-id="${x.id}">
@@ -124,30 +167,35 @@
       selectedId = id;
       highlightMarker(id, true);
 
-      // pan + zoom
+      // pan + zoom (the pin itself may not be loaded yet: the viewport
+      // request after the move brings it in)
       if (panToMarker) {
         const m = markerForJobId(id);
-        if (m) {
-          map.panTo(m.getPosition());
+        const job = nearbyById[id];
+        const position = m ? m.getPosition() : (job ? { lat: job.lat, lng: job.lng } : null);
+        if (position) {
+          map.panTo(position);
           const targetZoom = 13; // tweak if you want closer/farther
           if (map.getZoom() < targetZoom) map.setZoom(targetZoom);
         }
       }
     }
 
-  function computeNearby(user) {
-    const radius = parseFloat(radiusSelect.value);
-    return jobs
-      .filter(j => j.lat != null && j.lng != null)
-      .map(j => ({ ...j, distance: user ? distMiles(user, {lat:j.lat, lng:j.lng}) : Infinity }))
-      .filter(x => x.distance <= radius)
-      .sort((a,b) => a.distance - b.distance)
-      .slice(0, 50);
+  // Nearest jobs are computed, sorted and limited server-side
+  async function fetchNearby(user) {
+    if (!user) return [];
+    const params = new URLSearchParams({
+      lat: user.lat, lng: user.lng, radius: radiusSelect.value, limit: 50
+    });
+    const res = await fetch(`${window.CAREERHUB.jobsApiUrl}?${params}`, { credentials: "same-origin" });
+    if (!res.ok) return [];
+    const { jobs: items } = await res.json();
+    return items || [];
   }
 
   function locateAndRender() {
-    const render = (user) => {
-      const nearby = computeNearby(user);
+    const render = async (user) => {
+      const nearby = await fetchNearby(user);
       renderList(nearby);
     };
 
@@ -168,20 +216,9 @@
       styles: MAP_STYLE
     });
 
-    // Fetch jobs
-    const res = await fetch(window.CAREERHUB.jobsApiUrl, { credentials: "same-origin" });
-    const { jobs: items } = await res.json();
-    jobs = (items || []).filter(j => j.lat != null && j.lng != null);
-
-    // Build markers
-    markers = jobs.map(createMarker).filter(Boolean);
-
-    // Cluster markers (nicer in dense cities)
-    if (window.markerClusterer) {
-      clusterer = new markerClusterer.MarkerClusterer({ map, markers });
-    }
+    // Pins/clusters for whatever is in view, refreshed after every pan/zoom
+    map.addListener('idle', scheduleViewportLoad);
 
-    fitToMarkers();
     locateAndRender();
 
     refreshBtn?.addEventListener('click', locateAndRender);